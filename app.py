@@ -3,17 +3,19 @@ Sistema de Detección de Señas Básica para Soporte al Cliente
 Aplicación Flask principal para reconocimiento de lenguaje de señas
 """
 
-from flask import Flask, render_template, request, jsonify, session, redirect, url_for
+from flask import Flask, Response, g, render_template, request, jsonify, session, redirect, url_for
 import cv2
 import json
+import math
 import os
-import base64
 import numpy as np
 import hashlib
+import hmac
 import sqlite3
+import threading
+import time
+import uuid
 from datetime import datetime
-from io import BytesIO
-from PIL import Image
 
 def load_env_file(path=".env"):
     try:
@@ -30,8 +32,31 @@ def load_env_file(path=".env"):
         pass
 
 # Importar componentes del sistema
-from src.hand_detector import HandDetector
+from src.hand_detector import HandDetector, extract_hand_region, landmarks_bounding_box
+from src.detector_pool import HandDetectorPool
+from src.stream_state import StreamStateStore, generate_frame_hash
+from src.roi_tracker import HandROITracker
+from src.temporal_stability import TemporalStabilityEngine
+from src.quality_ladder import QualityController, parse_ladder, step_for_skip_rate
+from src.motion_gate import MotionGate
+from src.worker_pool import InferenceWorkerPool
+from src.admission import AdmissionController, AdmissionRejected
+from src.metrics import STAGE_METRIC, metrics, stage_timer
+from src.frame_io import BINARY_IMAGE_MIMETYPES, decode_base64_image, decode_frame, image_dimensions
 from src.asl_alphabet_recognizer_v2 import ASLAlphabetRecognizerV2
+from src.model_registry import ModelRegistry, RegistryError
+from src.inference_batcher import BatchingInferenceService
+from src.landmark_recognizer import LandmarkAlphabetRecognizer
+
+# WebSocket opcional para el stream continuo de frames
+try:
+    from flask_sock import Sock, ConnectionClosed
+    WEBSOCKET_AVAILABLE = True
+except ImportError:
+    print("flask-sock no disponible, solo se usará /detect_gesture por HTTP")
+    Sock = None
+    ConnectionClosed = Exception
+    WEBSOCKET_AVAILABLE = False
 
 # Inicializar aplicación Flask
 load_env_file()
@@ -44,43 +69,460 @@ app.config.update(
     TEMPLATES_AUTO_RELOAD=True
 )
 
-# Inicializar componentes de detección
-try:
-    # Inicializar detector de manos para localizar la mano
-    hand_detector = HandDetector(
+# Stream de frames por WebSocket (una conexión persistente por cámara)
+sock = Sock(app) if WEBSOCKET_AVAILABLE else None
+ws_connections = {'active': 0, 'total': 0}
+ws_connections_lock = threading.Lock()
+
+def create_hand_detector():
+    """Crear un detector de manos en modo video (tracking) para un stream"""
+    return HandDetector(
         static_image_mode=False,
         max_num_hands=1,  # Solo una mano para ASL
         min_detection_confidence=0.5,
         min_tracking_confidence=0.5
     )
-    
-    # USAR EXCLUSIVAMENTE EL NUEVO MODELO ENTRENADO
-    asl_recognizer = ASLAlphabetRecognizerV2(
-        model_path=os.environ.get("MODEL_PATH", "models/asl_quick_model.h5"),
-        class_mapping_path=os.environ.get("CLASS_MAPPING_PATH", "models/class_mapping_quick.json")
+
+# Componentes de detección: MediaPipe y los modelos se cargan en segundo plano
+# (initialize_components) para que las páginas respondan desde el arranque
+hand_detector = None
+asl_recognizer = None
+detector_pool = None
+landmark_recognizer = None
+inference_service = None
+# Reconocedor de los peldaños 'fast' de la escalera de calidad (landmarks)
+fast_recognizer = None
+
+# Motor de reconocimiento: 'cnn' (recorte de imagen) o 'landmarks' (solo 21x3 puntos)
+RECOGNIZER_MODE = os.environ.get('RECOGNIZER_MODE', 'cnn').lower()
+LANDMARK_MODEL_PATH = os.environ.get('LANDMARK_MODEL_PATH', 'models/asl_landmark_model.npz')
+
+# Micro-batching de inferencia para clientes concurrentes
+INFERENCE_BATCHING = str(os.environ.get('INFERENCE_BATCHING', '1')).lower() in ('1', 'true', 'yes')
+
+# Calentamiento al arrancar: lotes sintéticos por cada tamaño de lote y detectores de reserva
+MODEL_WARMUP = str(os.environ.get('MODEL_WARMUP', '1')).lower() in ('1', 'true', 'yes')
+DETECTOR_PREWARM = int(os.environ.get('DETECTOR_PREWARM', 2))
+
+# Estado de la carga en segundo plano: pending, loading, ready o failed
+startup_state = {
+    'status': 'pending',
+    'started_at': None,
+    'ready_at': None,
+    'load_seconds': None,
+    'warmup': None,
+    'error': None
+}
+startup_lock = threading.Lock()
+components_loaded = threading.Event()
+WARMUP_RETRY_SECONDS = 1
+
+def initialize_components():
+    """
+    Cargar MediaPipe, el modelo ASL y los servicios que dependen de ellos
+
+    Se ejecuta una vez en un hilo al arrancar; mientras tanto /readyz responde
+    503 y los endpoints de detección devuelven 'warming_up'.
+    """
+    global hand_detector, asl_recognizer, detector_pool, landmark_recognizer
+    global inference_service, fast_recognizer, RECOGNIZER_MODE
+
+    started_at = time.perf_counter()
+    startup_state['started_at'] = datetime.now().isoformat()
+    startup_state['status'] = 'loading'
+
+    try:
+        # Inicializar detector de manos para localizar la mano
+        detector = create_hand_detector()
+        
+        # USAR EXCLUSIVAMENTE EL NUEVO MODELO ENTRENADO (versión activa del registro o MODEL_PATH)
+        recognizer = create_startup_recognizer()
+        
+        print("Detector de manos inicializado")
+        print("NUEVO modelo ASL cargado con 97.5% de precision")
+        print(f"Letras disponibles: {recognizer.get_available_letters()}")
+        
+    except Exception as e:
+        print(f"Error inicializando componentes: {e}")
+        print("💡 Asegúrate de haber ejecutado 'python quick_train.py' primero")
+        detector = None
+        recognizer = None
+        startup_state['error'] = str(e)
+
+    # Pool de detectores por sesión: cada stream conserva su propio estado de tracking
+    if detector is not None:
+        detector_pool = HandDetectorPool(
+            create_hand_detector,
+            max_size=int(os.environ.get('DETECTOR_POOL_SIZE', 32)),
+            idle_timeout=float(os.environ.get('DETECTOR_IDLE_TIMEOUT', 120))
+        )
+
+    if RECOGNIZER_MODE == 'landmarks':
+        recognizer_by_landmarks = LandmarkAlphabetRecognizer(model_path=LANDMARK_MODEL_PATH)
+        if recognizer_by_landmarks.is_model_loaded():
+            landmark_recognizer = recognizer_by_landmarks
+        else:
+            print("Modelo de landmarks no disponible, usando el CNN")
+            RECOGNIZER_MODE = 'cnn'
+
+    # Los peldaños 'fast' de la escalera clasifican solo con landmarks (sin recorte ni CNN)
+    if landmark_recognizer is not None:
+        fast_recognizer = landmark_recognizer
+    elif quality_controller is not None and any(step.tier == 'fast' for step in quality_controller.ladder):
+        recognizer_by_landmarks = LandmarkAlphabetRecognizer(model_path=LANDMARK_MODEL_PATH)
+        if recognizer_by_landmarks.is_model_loaded():
+            fast_recognizer = recognizer_by_landmarks
+        else:
+            print("Modelo de landmarks no disponible: los peldaños 'fast' usan el CNN")
+    if fast_recognizer is not None and quality_controller is not None:
+        quality_controller.available_tiers.add('fast')
+
+    if INFERENCE_BATCHING and recognizer is not None:
+        inference_service = BatchingInferenceService(
+            recognizer,
+            max_batch_size=int(os.environ.get('INFERENCE_MAX_BATCH_SIZE', 8)),
+            max_wait_ms=float(os.environ.get('INFERENCE_MAX_WAIT_MS', 5))
+        )
+
+    if MODEL_WARMUP:
+        startup_state['warmup'] = warm_up_components(recognizer)
+
+    # Los trabajadores se calientan por su cuenta; mientras tanto se procesa en este proceso
+    if worker_pool is not None:
+        if model_state['active_version'] is not None:
+            worker_pool.load_model(model_state['active_version'], recognizer.model_path,
+                                   recognizer.class_mapping_path)
+        worker_pool.start()
+
+    # Los endpoints comprueban hand_detector/asl_recognizer: se publican al final
+    hand_detector = detector
+    asl_recognizer = recognizer
+
+    model_ready = recognizer is not None and (recognizer.is_model_loaded() or landmark_recognizer is not None)
+    startup_state['load_seconds'] = round(time.perf_counter() - started_at, 3)
+    startup_state['ready_at'] = datetime.now().isoformat()
+    startup_state['status'] = 'ready' if detector_pool is not None and model_ready else 'failed'
+    if startup_state['status'] == 'failed' and not startup_state['error']:
+        startup_state['error'] = 'Detector de manos o modelo ASL no disponible'
+    components_loaded.set()
+    print(f"Componentes de detección: {startup_state['status']} en {startup_state['load_seconds']} s")
+
+def warmup_batch_sizes():
+    """Tamaños de lote que puede formar el micro-batching (solo 1 sin él)"""
+    return list(range(1, inference_service.max_batch_size + 1)) if inference_service else [1]
+
+def warm_up_components(recognizer):
+    """
+    Ejecutar frames sintéticos por MediaPipe y el CNN antes de aceptar peticiones
+
+    El CNN se calienta con cada tamaño de lote que puede formar el micro-batching
+    (1..INFERENCE_MAX_BATCH_SIZE) para que ningún lote nuevo pague el trazado del
+    grafo; el pool deja DETECTOR_PREWARM detectores inicializados para los
+    primeros streams.
+
+    Returns:
+        dict: Duración total y por componente (para el log y /status)
+    """
+    started_at = time.perf_counter()
+    batch_sizes = warmup_batch_sizes()
+    warmup = {'batch_sizes': batch_sizes}
+    try:
+        if recognizer is not None and RECOGNIZER_MODE == 'cnn':
+            warmup['cnn_ms_by_batch_size'] = recognizer.warmup(batch_sizes)
+        if detector_pool is not None:
+            warmup['detector_ms'] = detector_pool.prewarm(DETECTOR_PREWARM, DETECTION_FRAME_SIZE)
+    except Exception as e:
+        print(f"Error en el calentamiento: {e}")
+        warmup['error'] = str(e)
+    warmup['seconds'] = round(time.perf_counter() - started_at, 3)
+    print(f"Calentamiento completado en {warmup['seconds']} s "
+          f"(lotes {batch_sizes[0]}-{batch_sizes[-1]}, {len(warmup.get('detector_ms', []))} detectores de reserva)")
+    return warmup
+
+# Registro de versiones del modelo: carga en segundo plano y cambio en caliente (/admin/models)
+model_registry = ModelRegistry(os.environ.get('MODEL_REGISTRY_DIR', 'models/registry'))
+ADMIN_TOKEN = os.environ.get('ADMIN_TOKEN', '')
+model_state = {
+    'active_version': None,    # None: modelo de MODEL_PATH, fuera del registro
+    'previous_version': None,
+    'loading_version': None,
+    'last_error': None,
+    'swapped_at': None,
+    'last_load_seconds': None
+}
+# Reconocedor anterior en memoria para un rollback instantáneo
+previous_recognizer = None
+model_swap_lock = threading.Lock()
+
+def create_asl_recognizer(version=None):
+    """
+    Crear el reconocedor CNN de una versión del registro (o de MODEL_PATH si version es None)
+
+    Raises:
+        RegistryError: Si la versión no existe, un checksum no coincide o el
+            modelo cargado no corresponde al manifiesto
+    """
+    if version is None:
+        return ASLAlphabetRecognizerV2(
+            model_path=os.environ.get("MODEL_PATH", "models/asl_quick_model.h5"),
+            class_mapping_path=os.environ.get("CLASS_MAPPING_PATH", "models/class_mapping_quick.json")
+        )
+
+    manifest = model_registry.verify(version)
+    recognizer = ASLAlphabetRecognizerV2(
+        model_path=model_registry.model_path(version),
+        class_mapping_path=model_registry.class_mapping_path(version)
     )
-    
-    print("Detector de manos inicializado")
-    print("NUEVO modelo ASL cargado con 97.5% de precision")
-    print(f"Letras disponibles: {asl_recognizer.get_available_letters()}")
-    
-except Exception as e:
-    print(f"Error inicializando componentes: {e}")
-    print("💡 Asegúrate de haber ejecutado 'python quick_train.py' primero")
-    hand_detector = None
-    asl_recognizer = None
+    if not recognizer.is_model_loaded():
+        raise RegistryError(f'No se pudo cargar el modelo de la versión {version}')
+    if list(recognizer.input_size) != manifest['input_size'] or recognizer.class_names != manifest['class_names']:
+        raise RegistryError(f'El modelo de la versión {version} no coincide con su manifiesto')
+    return recognizer
+
+def create_startup_recognizer():
+    """Reconocedor de la versión activa del registro o, si no hay o falla, de MODEL_PATH"""
+    try:
+        active = model_registry.active()
+    except (OSError, ValueError) as e:
+        print(f"No se pudo leer la versión activa del registro: {e}")
+        active = {}
+    model_state['previous_version'] = active.get('previous')
+
+    version = active.get('version')
+    if version:
+        try:
+            recognizer = create_asl_recognizer(version)
+            model_state['active_version'] = version
+            print(f"Versión del modelo: {version}")
+            return recognizer
+        except RegistryError as e:
+            print(f"{e}. Usando MODEL_PATH")
+            model_state['last_error'] = str(e)
+    return create_asl_recognizer()
+
+def swap_recognizer(recognizer, version):
+    """
+    Publicar un reconocedor ya cargado y calentado
+
+    Las peticiones en curso terminan con el reconocedor que ya tenían; las
+    nuevas leen la referencia nueva. El anterior queda en memoria para rollback.
+    """
+    with model_swap_lock:
+        publish_recognizer(recognizer, version)
+    persist_active_version(recognizer, version)
+
+def publish_recognizer(recognizer, version):
+    """Cambiar la referencia del reconocedor activo (con model_swap_lock tomado)"""
+    global asl_recognizer, previous_recognizer
+    previous_recognizer = asl_recognizer
+    model_state['previous_version'] = model_state['active_version']
+    if inference_service is not None:
+        inference_service.swap_recognizer(recognizer)
+    asl_recognizer = recognizer
+    model_state['active_version'] = version
+    model_state['swapped_at'] = datetime.now().isoformat()
+
+def persist_active_version(recognizer, version):
+    """Guardar la versión activa en el registro y llevarla a los trabajadores de inferencia"""
+    try:
+        model_registry.set_active(version, model_state['previous_version'])
+    except (OSError, RegistryError) as e:
+        print(f"No se pudo guardar la versión activa: {e}")
+    if worker_pool is not None:
+        worker_pool.load_model(version or 'MODEL_PATH', recognizer.model_path, recognizer.class_mapping_path)
+    print(f"Modelo activo: {version or 'MODEL_PATH'} (anterior: {model_state['previous_version'] or 'MODEL_PATH'})")
+
+def load_model_version(version):
+    """Cargar, verificar y calentar una versión y cambiarla por la activa (hilo en segundo plano)"""
+    started_at = time.perf_counter()
+    try:
+        recognizer = create_asl_recognizer(version)
+        # Las versiones del registro ya se comprueban en create_asl_recognizer
+        if version is None and not recognizer.is_model_loaded():
+            raise RegistryError('No se pudo cargar el modelo de MODEL_PATH')
+        if MODEL_WARMUP:
+            recognizer.warmup(warmup_batch_sizes())
+        swap_recognizer(recognizer, version)
+        model_state['last_error'] = None
+    except Exception as e:
+        print(f"Error cargando la versión {version} del modelo: {e}")
+        model_state['last_error'] = f'{version}: {e}'
+    finally:
+        model_state['last_load_seconds'] = round(time.perf_counter() - started_at, 3)
+        model_state['loading_version'] = None
+
+def start_model_load(version):
+    """
+    Lanzar la carga de una versión en segundo plano
+
+    Returns:
+        bool: False si ya hay otra carga en curso
+    """
+    with model_swap_lock:
+        if model_state['loading_version'] is not None:
+            return False
+        model_state['loading_version'] = version or 'MODEL_PATH'
+    threading.Thread(target=load_model_version, args=(version,), name='asl-model-swap', daemon=True).start()
+    return True
+
+def rollback_model():
+    """
+    Volver a la versión anterior
+
+    Con una carga en curso no se hace nada: al terminar, esa carga publicaría su
+    versión encima del rollback.
+
+    Returns:
+        str: 'swapped' si el reconocedor anterior seguía en memoria, 'loading'
+            si hay que cargarlo (tras un reinicio), 'busy' si hay una carga en
+            curso o None si no hay anterior
+    """
+    with model_swap_lock:
+        if model_state['loading_version'] is not None:
+            return 'busy'
+        recognizer = previous_recognizer
+        version = model_state['previous_version']
+        if recognizer is not None:
+            publish_recognizer(recognizer, version)
+    if recognizer is not None:
+        persist_active_version(recognizer, version)
+        return 'swapped'
+    if version is not None and start_model_load(version):
+        return 'loading'
+    return None
+
+def model_status():
+    """Versión activa, anterior y carga en curso (para /status, /get_gestures y /admin/models)"""
+    status = dict(model_state)
+    status['model_path'] = asl_recognizer.model_path if asl_recognizer else None
+    status['rollback_available'] = previous_recognizer is not None or model_state['previous_version'] is not None
+    return status
+
+def start_background_initialization():
+    """Lanzar initialize_components en un hilo (solo la primera vez)"""
+    with startup_lock:
+        if startup_state['status'] != 'pending':
+            return
+        startup_state['status'] = 'loading'
+    threading.Thread(target=initialize_components, name='asl-model-loader', daemon=True).start()
+
+def is_warming_up():
+    """True mientras los modelos se están cargando"""
+    if not components_loaded.is_set():
+        start_background_initialization()
+        return True
+    return False
+
+# Pool de procesos de inferencia (0 = detección y reconocimiento en el proceso web)
+INFERENCE_WORKERS = int(os.environ.get('INFERENCE_WORKERS', 0))
 
 # Variables de optimización de rendimiento
-frame_counter = 0
+DETECTION_FRAME_SIZE = (640, 480)  # Tamaño máximo (ancho, alto) de los frames a procesar
+HAND_CROP_MAX_SIZE = (224, 224)  # Tamaño máximo del recorte de /classify_landmarks (entrada del CNN)
 FRAME_SKIP_RATE = int(os.environ.get('FRAME_SKIP_RATE', 3))
 CACHE_DURATION = float(os.environ.get('CACHE_DURATION', 0.1))
-last_detection_result = None
-last_detection_time = 0
-result_cache = {
-    'result': None,
-    'timestamp': 0,
-    'frame_hash': None
-}
+
+# Los trabajadores se lanzan al cargar los componentes (el proceso del reloader no los crea)
+worker_pool = None
+if INFERENCE_WORKERS > 0:
+    if hasattr(os, 'fork'):
+        worker_pool = InferenceWorkerPool(
+            num_workers=INFERENCE_WORKERS,
+            slots_per_worker=int(os.environ.get('INFERENCE_WORKER_SLOTS', 4)),
+            max_frame_shape=(DETECTION_FRAME_SIZE[1], DETECTION_FRAME_SIZE[0], 3),
+            max_sessions_per_worker=int(os.environ.get('DETECTOR_POOL_SIZE', 32))
+        )
+    else:
+        print("INFERENCE_WORKERS requiere un sistema POSIX; se usa el proceso web")
+
+# Control de admisión: frames procesándose a la vez, frames en espera y espera máxima
+# (un frame que espera más que el intervalo de captura del cliente ya está obsoleto)
+admission_controller = AdmissionController(
+    max_concurrent=int(os.environ.get('ADMISSION_MAX_CONCURRENT', 4)),
+    max_queue=int(os.environ.get('ADMISSION_MAX_QUEUE', 8)),
+    deadline_ms=float(os.environ.get('ADMISSION_DEADLINE_MS', 300))
+)
+
+# Escalera de calidad por stream: frames saltados, resolución de MediaPipe y reconocedor
+# según la latencia medida frente a QUALITY_TARGET_MS (QUALITY_LADDER=0: FRAME_SKIP_RATE fijo)
+QUALITY_LADDER = str(os.environ.get('QUALITY_LADDER', '1')).lower() in ('1', 'true', 'yes')
+quality_controller = None
+if QUALITY_LADDER:
+    quality_ladder = parse_ladder(os.environ.get('QUALITY_LADDER_STEPS'))
+    quality_controller = QualityController(
+        ladder=quality_ladder,
+        target_latency_ms=float(os.environ.get('QUALITY_TARGET_MS', 150)),
+        cpu_high=float(os.environ.get('QUALITY_CPU_HIGH', 0.85)),
+        cpu_low=float(os.environ.get('QUALITY_CPU_LOW', 0.6)),
+        # Sin QUALITY_INITIAL_STEP los streams empiezan en el peldaño de FRAME_SKIP_RATE
+        initial_step=int(os.environ.get('QUALITY_INITIAL_STEP') or step_for_skip_rate(quality_ladder, FRAME_SKIP_RATE))
+    )
+
+# Seguimiento de la mano en una ventana recortada (menos píxeles por llamada a MediaPipe).
+# Desactivado por defecto: activarlo solo si scripts/benchmark_replay.py con
+# ROI_TRACKING=1 mejora la latencia frente al tracking de MediaPipe sobre el frame completo
+ROI_TRACKING = str(os.environ.get('ROI_TRACKING', '0')).lower() in ('1', 'true', 'yes')
+ROI_EXPANSION = float(os.environ.get('ROI_EXPANSION', 2.0))
+
+def create_roi_tracker():
+    """Crear la ventana de búsqueda de la mano de un stream"""
+    return HandROITracker(expansion=ROI_EXPANSION)
+
+# Estabilidad temporal de la letra por stream (EMA + votación con histéresis)
+STABILITY_WINDOW = int(os.environ.get('STABILITY_WINDOW', 8))
+
+def create_stability_engine():
+    """Crear el historial de predicciones de un stream"""
+    return TemporalStabilityEngine(window=STABILITY_WINDOW)
+
+# Compuerta de movimiento: con la mano quieta se reutiliza la última predicción del stream
+# en lugar de volver a ejecutar el reconocedor (como mucho MOTION_GATE_MAX_AGE segundos
+# seguidos, o MOTION_GATE_STABLE_MAX_AGE si la letra está estable)
+MOTION_GATE = str(os.environ.get('MOTION_GATE', '1')).lower() in ('1', 'true', 'yes')
+
+def create_motion_gate():
+    """Crear la compuerta de movimiento de un stream"""
+    return MotionGate(
+        threshold=float(os.environ.get('MOTION_GATE_THRESHOLD', 0.05)),
+        max_age=float(os.environ.get('MOTION_GATE_MAX_AGE', 0.3)),
+        stable_max_age=float(os.environ.get('MOTION_GATE_STABLE_MAX_AGE', 1.0))
+    )
+
+# Estado de frame skipping, caché, ROI, estabilidad y compuerta por sesión (no compartido entre clientes)
+stream_store = StreamStateStore(
+    ttl=float(os.environ.get('STREAM_STATE_TTL', 300)),
+    max_streams=int(os.environ.get('STREAM_STATE_MAX_STREAMS', 1000)),
+    hash_max_distance=int(os.environ.get('FRAME_HASH_MAX_DISTANCE', 5)),
+    roi_tracker_factory=create_roi_tracker if ROI_TRACKING else None,
+    stability_factory=create_stability_engine,
+    quality_factory=quality_controller.create_stream_state if quality_controller else None,
+    motion_gate_factory=create_motion_gate if MOTION_GATE else None
+)
+
+# Métricas exportadas en /metrics (además de los histogramas por etapa)
+DETECTION_ENDPOINTS = ('detect_gesture', 'detect_asl_letter', 'classify_landmarks')
+metrics.describe('asl_request_duration_seconds', 'histogram', 'Duración total de las peticiones de detección')
+metrics.describe('asl_frames_total', 'counter', 'Frames recibidos por resultado (processed, cache_hit, skipped, shed)')
+metrics.describe('asl_motion_gate_total', 'counter', 'Consultas a la compuerta de movimiento por resultado (hit, moved, expired, empty)')
+metrics.describe('asl_quality_changes_total', 'counter', 'Cambios de peldaño de calidad de los streams (down, up)')
+metrics.gauge('asl_admission_queue_depth', 'Frames esperando turno de procesamiento',
+              lambda: admission_controller.queue_depth)
+metrics.gauge('asl_admission_in_flight', 'Frames procesándose',
+              lambda: admission_controller.in_flight)
+metrics.gauge('asl_active_streams', 'Streams de cámara con estado en memoria',
+              lambda: len(stream_store))
+def motion_gate_hit_ratio():
+    totals = stream_store.gate_totals()
+    return totals['hits'] / totals['checks'] if totals['checks'] else None
+
+metrics.gauge('asl_motion_gate_hit_ratio', 'Fracción de frames con mano que reutilizaron la predicción anterior',
+              motion_gate_hit_ratio)
+metrics.gauge('asl_websocket_connections', 'Conexiones WebSocket abiertas',
+              lambda: ws_connections['active'])
+metrics.gauge('asl_models_ready', 'Modelos cargados y listos para detectar (1) o cargando/fallidos (0)',
+              lambda: startup_state['status'] == 'ready')
+metrics.gauge('asl_inference_batch_queue_depth', 'Recortes esperando lote del CNN',
+              lambda: inference_service.get_stats()['queue_depth'] if inference_service else None)
 
 def ensure_data_dir():
     try:
@@ -118,94 +560,200 @@ latest_agent_response = {
     'category': ''
 }
 
-def extract_hand_region(frame, landmarks):
+def get_stream_id():
     """
-    Extrae la región de la mano del frame usando los landmarks.
+    Obtener el identificador del stream de cámara de la sesión actual.
+    Se crea la primera vez para que cada cliente tenga su propio estado.
+    """
+    stream_id = session.get('stream_id')
+    if not stream_id:
+        stream_id = uuid.uuid4().hex
+        session['stream_id'] = stream_id
+    return stream_id
+
+def get_request_image():
+    """
+    Obtener la imagen enviada por el cliente.
+    Acepta cuerpo binario (image/jpeg, image/webp, ...), multipart con el campo
+    'image' o el JSON original {"image": "data:image/jpeg;base64,..."}.
     
-    Args:
-        frame: Frame de la imagen
-        landmarks: Lista de landmarks de la mano
-        
     Returns:
-        numpy array: Región recortada de la mano
+        tuple: (bytes o cadena base64, código de error, mensaje de error)
     """
-    try:
-        height, width = frame.shape[:2]
-        
-        # Convertir landmarks normalizados a coordenadas de píxeles
-        x_coords = [int(lm[0] * width) for lm in landmarks]
-        y_coords = [int(lm[1] * height) for lm in landmarks]
-        
-        # Encontrar bounding box de la mano
-        min_x, max_x = min(x_coords), max(x_coords)
-        min_y, max_y = min(y_coords), max(y_coords)
-        
-        # Agregar margen alrededor de la mano (20% extra)
-        margin_x = int((max_x - min_x) * 0.2)
-        margin_y = int((max_y - min_y) * 0.2)
-        
-        # Aplicar margen con límites del frame
-        min_x = max(0, min_x - margin_x)
-        max_x = min(width, max_x + margin_x)
-        min_y = max(0, min_y - margin_y)
-        max_y = min(height, max_y + margin_y)
-        
-        # Extraer región de la mano
-        hand_region = frame[min_y:max_y, min_x:max_x]
-        
-        # Asegurar que la región no esté vacía
-        if hand_region.size == 0:
-            return frame  # Devolver frame completo si hay error
-        
-        return hand_region
-        
-    except Exception as e:
-        print(f"Error extrayendo región de mano: {e}")
-        return frame  # Devolver frame completo si hay error
+    if request.mimetype in BINARY_IMAGE_MIMETYPES:
+        image_bytes = request.get_data(cache=False)
+        if not image_bytes:
+            return None, 'no_image', 'No se recibió imagen en el request'
+        return image_bytes, None, None
+    
+    if request.mimetype == 'multipart/form-data':
+        image_file = request.files.get('image')
+        if image_file is None:
+            return None, 'no_image', 'No se recibió imagen en el request'
+        return image_file.read(), None, None
+    
+    data = request.get_json(silent=True)
+    if not data:
+        return None, 'no_data', 'No se recibieron datos JSON'
+    
+    image_data = data.get('image')
+    if not image_data:
+        return None, 'no_image', 'No se recibió imagen en el request'
+    return image_data, None, None
 
-def generate_frame_hash(frame):
+def decode_gesture_frame(image_payload):
     """
-    Generar hash simple del frame para detectar cambios significativos
-    Usa una versión reducida del frame para mayor eficiencia
+    Decodificar la imagen recibida (bytes o base64) a un frame BGR listo para detección
+    
+    Optimización de rendimiento: los frames mayores que DETECTION_FRAME_SIZE se
+    decodifican a resolución reducida y se ajustan con INTER_AREA conservando el aspecto.
+    
+    Raises:
+        ValueError: Si la imagen no es válida
     """
-    try:
-        # Reducir frame a 32x32 para hash rápido
-        small_frame = cv2.resize(frame, (32, 32))
-        # Convertir a escala de grises
-        gray_frame = cv2.cvtColor(small_frame, cv2.COLOR_BGR2GRAY)
-        # Generar hash MD5
-        frame_bytes = gray_frame.tobytes()
-        return hashlib.md5(frame_bytes).hexdigest()
-    except Exception:
-        return None
+    if isinstance(image_payload, str):
+        image_payload = decode_base64_image(image_payload)
+    return decode_frame(image_payload, max_size=DETECTION_FRAME_SIZE)
 
-def is_cache_valid(current_time, frame_hash):
+def run_asl_inference(hand_region, landmarks=None, top_k=3, aspect_ratio=1.0, handedness=None,
+                      tier='full'):
+    """
+    Ejecutar el reconocedor ASL sobre una mano.
+    En modo 'landmarks' (o en un peldaño de calidad 'fast') clasifica solo con los
+    puntos; en modo 'cnn' usa el recorte y la cola de micro-batching si está habilitada.
+    
+    Args:
+        hand_region: Recorte de la mano (BGR)
+        landmarks: Landmarks normalizados de la mano
+        top_k: Número de predicciones a conservar
+        aspect_ratio: Ancho / alto del frame de los landmarks
+        handedness: Lateralidad de la mano ('Left'/'Right')
+        tier: Reconocedor del peldaño de calidad ('full' o 'fast')
+    
+    Returns:
+        PredictionResult o None si no hay predicción
     """
-    Verificar si el cache es válido basado en tiempo y similitud del frame
+    recognizer_by_landmarks = landmark_recognizer or (fast_recognizer if tier == 'fast' else None)
+    if recognizer_by_landmarks is not None and landmarks is not None:
+        return recognizer_by_landmarks.infer_landmarks(landmarks, top_k=top_k,
+                                                       aspect_ratio=aspect_ratio,
+                                                       handedness=handedness)
+    if inference_service is not None:
+        return inference_service.infer(hand_region, top_k=top_k)
+    return asl_recognizer.infer(hand_region, top_k=top_k)
+
+def recognition_class_names(tier='full'):
+    """Letras indexadas como el vector de probabilidades del reconocedor en uso"""
+    if landmark_recognizer is not None:
+        return landmark_recognizer.class_names
+    if tier == 'fast' and fast_recognizer is not None:
+        return fast_recognizer.class_names
+    return asl_recognizer.class_names if asl_recognizer else []
+
+def gated_prediction(stream, landmarks):
     """
-    global result_cache
+    Predicción anterior del stream si la mano no se movió desde esa inferencia
     
-    # Verificar si el cache existe y no ha expirado
-    time_valid = (current_time - result_cache['timestamp']) < CACHE_DURATION
+    Returns:
+        PredictionResult a reutilizar o None si hay que ejecutar el reconocedor
+    """
+    gate = stream.motion_gate
+    if gate is None:
+        return None
+    with stream.lock:
+        prediction = gate.check(landmarks, stable=stream.stability is not None and stream.stability.is_stable)
+        result = gate.last_result
+    metrics.inc('asl_motion_gate_total', result=result)
+    return prediction
+
+def record_gated_prediction(stream, landmarks, prediction):
+    """Guardar la predicción de una inferencia real como referencia de la compuerta"""
+    if stream.motion_gate is not None:
+        with stream.lock:
+            stream.motion_gate.record(landmarks, prediction)
+
+def update_stability(stream, prediction, tier='full'):
+    """
+    Añadir una predicción nueva al historial del stream
     
-    # Verificar si el frame es similar al anterior
-    frame_similar = (frame_hash and 
-                    result_cache['frame_hash'] and 
-                    frame_hash == result_cache['frame_hash'])
+    Args:
+        stream: StreamState del stream
+        prediction: PredictionResult recién inferido (None: solo consultar el estado; las
+            predicciones reutilizadas por la compuerta no cuentan como votos)
+        tier: Reconocedor que hizo la predicción ('full' o 'fast')
     
-    return time_valid and frame_similar and result_cache['result'] is not None
+    Returns:
+        dict: Estado de estabilidad para la respuesta
+    """
+    if stream.stability is None:
+        return {}
+    with stream.lock:
+        if prediction is None:
+            return stream.stability.get_info()
+        return stream.stability.update(prediction.probabilities, recognition_class_names(tier))
 
-def update_cache(result, timestamp, frame_hash):
+def overload_result(rejection):
     """
-    Actualizar el cache con nuevo resultado
+    Resultado de detección de un frame descartado por sobrecarga
+
+    Todos los endpoints pasan por aquí, así que el frame se cuenta como 'shed' una sola vez.
     """
-    global result_cache
-    result_cache = {
-        'result': result.copy() if result else None,
-        'timestamp': timestamp,
-        'frame_hash': frame_hash
+    metrics.inc('asl_frames_total', result='shed')
+    return {
+        'success': False,
+        'message': f'Servidor ocupado, reintente en {rejection.retry_after_ms} ms',
+        'letter': None,
+        'gesture': None,
+        'confidence': 0.0,
+        'error': 'overloaded',
+        'reason': rejection.reason,
+        'retry_after_ms': rejection.retry_after_ms
+    }
+
+def overload_response(rejection):
+    """
+    Respuesta 429 para un frame descartado por sobrecarga
+
+    Incluye la cabecera Retry-After (segundos) y retry_after_ms en el JSON para
+    que los clientes espacien los frames en lugar de acumular peticiones.
+    """
+    response = jsonify(overload_result(rejection))
+    response.status_code = 429
+    response.headers['Retry-After'] = str(max(1, math.ceil(rejection.retry_after)))
+    return response
+
+def warming_up_result():
+    """Resultado de detección mientras los modelos se están cargando"""
+    return {
+        'success': False,
+        'message': 'Cargando modelos, reintente en unos segundos',
+        'letter': None,
+        'gesture': None,
+        'confidence': 0.0,
+        'error': 'warming_up',
+        'retry_after_ms': WARMUP_RETRY_SECONDS * 1000
     }
 
+def warming_up_response():
+    """Respuesta 503 con Retry-After mientras los modelos se están cargando"""
+    response = jsonify(warming_up_result())
+    response.status_code = 503
+    response.headers['Retry-After'] = str(WARMUP_RETRY_SECONDS)
+    return response
+
+@app.before_request
+def start_request_timer():
+    if request.endpoint in DETECTION_ENDPOINTS:
+        g.request_started_at = time.perf_counter()
+
+@app.after_request
+def record_request_duration(response):
+    started_at = g.pop('request_started_at', None)
+    if started_at is not None:
+        metrics.observe('asl_request_duration_seconds', time.perf_counter() - started_at,
+                        endpoint=request.endpoint, status=str(response.status_code))
+    return response
+
 @app.route('/')
 def index():
     try:
@@ -313,6 +861,12 @@ def auth_guest():
 
 @app.route('/auth/logout', methods=['POST', 'GET'])
 def auth_logout():
+    if session.get('stream_id'):
+        if detector_pool:
+            detector_pool.release(session['stream_id'])
+        if worker_pool:
+            worker_pool.release(session['stream_id'])
+        stream_store.remove(session['stream_id'])
     session.clear()
     return redirect(url_for('landing'))
 
@@ -392,8 +946,11 @@ def teacher_panel():
 def detect_asl_letter():
     """Endpoint para reconocer letras del alfabeto ASL"""
     try:
+        if is_warming_up():
+            return warming_up_response()
+        
         # Verificar que los componentes estén disponibles
-        if not asl_recognizer or not hand_detector:
+        if not asl_recognizer or not detector_pool:
             return jsonify({
                 'success': False,
                 'message': 'Componentes de detección no disponibles',
@@ -402,46 +959,20 @@ def detect_asl_letter():
                 'error': 'components_not_available'
             }), 503
         
-        # Obtener datos del request
-        if not request.json:
+        # Obtener imagen del request (binaria, multipart o JSON base64)
+        image_payload, error, message = get_request_image()
+        if error:
             return jsonify({
                 'success': False,
-                'message': 'No se recibieron datos JSON',
+                'message': message,
                 'letter': None,
                 'confidence': 0.0,
-                'error': 'no_data'
+                'error': error
             }), 400
         
-        # Extraer imagen del request
-        image_data = request.json.get('image')
-        if not image_data:
-            return jsonify({
-                'success': False,
-                'message': 'No se recibió imagen en el request',
-                'letter': None,
-                'confidence': 0.0,
-                'error': 'no_image'
-            }), 400
-        
-        # Decodificar imagen base64
+        # Decodificar imagen directamente a BGR
         try:
-            # Remover prefijo data:image si existe
-            if ',' in image_data:
-                image_data = image_data.split(',')[1]
-            
-            # Decodificar base64
-            image_bytes = base64.b64decode(image_data)
-            
-            # Convertir a imagen PIL
-            pil_image = Image.open(BytesIO(image_bytes))
-            
-            # Convertir a array numpy (OpenCV format)
-            frame = np.array(pil_image)
-            
-            # Convertir RGB a BGR si es necesario
-            if len(frame.shape) == 3 and frame.shape[2] == 3:
-                frame = cv2.cvtColor(frame, cv2.COLOR_RGB2BGR)
-            
+            frame = decode_gesture_frame(image_payload)
         except Exception as e:
             return jsonify({
                 'success': False,
@@ -451,76 +982,449 @@ def detect_asl_letter():
                 'error': 'image_processing_failed'
             }), 400
         
-        # Detectar manos primero
-        detection_result = hand_detector.detect_hands(frame)
+        with admission_controller.admit():
+            response_data = recognize_asl_letter(frame, get_stream_id())
+        with stage_timer('json_serialize'):
+            return jsonify(response_data)
         
-        if not detection_result['hands_detected']:
+    except AdmissionRejected as rejection:
+        return overload_response(rejection)
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'message': f'Error interno en reconocimiento ASL: {str(e)}',
+            'letter': None,
+            'confidence': 0.0,
+            'error': 'internal_error'
+        }), 500
+
+def recognize_asl_letter(frame, stream_id):
+    """
+    Detectar la mano y reconocer la letra de un frame para /detect_asl_letter
+
+    Sin escalera de calidad ni compuerta de movimiento: cada petición es una
+    consulta independiente y se reconoce siempre con el modelo completo.
+    """
+    # Con el pool de procesos, detección y reconocimiento se hacen en el trabajador de la sesión
+    worker_result = None
+    if worker_pool is not None:
+        with stage_timer('inference_worker'):
+            worker_result = worker_pool.analyze(stream_id, frame, top_k=3)
+    
+    if worker_result is not None:
+        analysis = worker_result.analysis
+    else:
+        # Detectar manos y extraer landmarks en una sola pasada de MediaPipe
+        # usando el detector propio de la sesión (tracking por stream)
+        with detector_pool.acquire(stream_id) as detector:
+            analysis = detector.analyze_frame(frame)
+    
+    if not analysis.hands_detected:
+        response_data = {
+            'success': False,
+            'message': 'No se detectaron manos en la imagen',
+            'letter': None,
+            'confidence': 0.0,
+            'error': 'no_hands_detected',
+            'timestamp': datetime.now().isoformat()
+        }
+    else:
+        # Extraer región de la mano y reconocer letra ASL
+        landmarks = analysis.primary_landmarks
+        if landmarks:
+            if worker_result is not None:
+                # El trabajador ya reconoció la letra
+                prediction = worker_result.prediction
+            else:
+                with stage_timer('crop'):
+                    hand_region = extract_hand_region(frame, landmarks)
+                
+                # Una sola inferencia para letra, confianza y top 3
+                prediction = run_asl_inference(
+                    hand_region, landmarks, top_k=3,
+                    aspect_ratio=analysis.frame_shape[1] / analysis.frame_shape[0],
+                    handedness=analysis.handedness[0]
+                )
+            letter, confidence = prediction.as_tuple() if prediction else (None, 0.0)
+            
+            if letter:
+                top_predictions = prediction.top(3)
+                
+                response_data = {
+                    'success': True,
+                    'message': f'Letra ASL reconocida: {letter}',
+                    'letter': letter,
+                    'confidence': confidence,
+                    'top_predictions': [
+                        {'letter': pred_letter, 'confidence': pred_conf}
+                        for pred_letter, pred_conf in top_predictions
+                    ],
+                    'timestamp': datetime.now().isoformat()
+                }
+            else:
+                response_data = {
+                    'success': False,
+                    'message': 'Mano detectada pero letra no reconocida',
+                    'letter': None,
+                    'confidence': 0.0,
+                    'error': 'recognition_failed',
+                    'timestamp': datetime.now().isoformat()
+                }
+        else:
             response_data = {
                 'success': False,
-                'message': 'No se detectaron manos en la imagen',
+                'message': 'No se pudieron extraer landmarks de la mano',
                 'letter': None,
                 'confidence': 0.0,
-                'error': 'no_hands_detected',
+                'error': 'invalid_landmarks',
                 'timestamp': datetime.now().isoformat()
             }
-        else:
-            # Extraer región de la mano y reconocer letra ASL
-            landmarks = hand_detector.get_normalized_landmarks(frame)
+    
+    return response_data
+
+def build_recognition_response(prediction, hand_landmarks, bounding_box, frame_counter, hand_region_size=None,
+                               stability_info=None):
+    """
+    Construir la respuesta de detección a partir de la predicción de una mano
+    
+    Args:
+        prediction: PredictionResult o None
+        hand_landmarks: Landmarks normalizados por mano
+        bounding_box: Bounding box de la mano en píxeles (o None)
+        frame_counter: Número de frame dentro del stream
+        hand_region_size: (ancho, alto) del recorte usado por el CNN (opcional)
+        stability_info: Estado de estabilidad del stream (ver update_stability)
+        
+    Returns:
+        dict: Resultado de la detección
+    """
+    letter, confidence = prediction.as_tuple() if prediction else (None, 0.0)
+    top_predictions = prediction.top(3) if prediction else []
+    stability_info = stability_info or {}
+    
+    # Evaluar resultado SIMPLE
+    if letter and confidence > 0.5:  # Predicciones con 50%+ de confianza
+        response_data = {
+            'success': True,
+            'message': f'Letra ASL detectada: {letter}',
+            'letter': letter,
+            'gesture': letter,
+            'confidence': confidence,
+            'description': f'Letra del alfabeto ASL: {letter}',
+            'category': 'alfabeto_asl',
+            'hands_detected': True,
+            'landmarks': hand_landmarks,
+            'bounding_box': bounding_box,
+            'stability_info': stability_info,
+            'top_predictions': [
+                {'letter': pred_letter, 'confidence': pred_conf}
+                for pred_letter, pred_conf in top_predictions
+            ],
+            'timestamp': datetime.now().isoformat(),
+            'frame_processed': True,
+            'frame_number': frame_counter
+        }
+        if hand_region_size is not None:
+            response_data['hand_region_size'] = {
+                'width': hand_region_size[0],
+                'height': hand_region_size[1]
+            }
+    elif letter and confidence > 0.3:  # Predicción detectada con confianza baja
+        stability_message = stability_info.get('message', 'Analizando estabilidad...')
+        response_data = {
+            'success': False,
+            'message': f'Detectando: {letter} - {stability_message}',
+            'letter': letter,
+            'gesture': None,
+            'confidence': confidence,
+            'description': f'Posible letra ASL: {letter} - Mantenga la posición',
+            'category': 'alfabeto_asl',
+            'hands_detected': True,
+            'landmarks': hand_landmarks,
+            'bounding_box': bounding_box,
+            'stability_info': stability_info,
+            'top_predictions': [
+                {'letter': pred_letter, 'confidence': pred_conf}
+                for pred_letter, pred_conf in top_predictions
+            ],
+            'frame_processed': True,
+            'frame_number': frame_counter,
+            'suggestions': [
+                f'Mantenga la posición de la letra {letter} por 2-3 segundos',
+                'Asegúrese de formar la letra claramente',
+                'Use buena iluminación uniforme'
+            ]
+        }
+    else:
+        response_data = {
+            'success': False,
+            'message': 'Mano detectada pero letra no reconocida',
+            'letter': None,
+            'gesture': None,
+            'confidence': confidence if letter else 0.0,
+            'description': 'Forme una letra ASL clara',
+            'category': 'alfabeto_asl',
+            'hands_detected': True,
+            'landmarks': hand_landmarks,
+            'bounding_box': bounding_box,
+            'stability_info': stability_info,
+            'top_predictions': [
+                {'letter': pred_letter, 'confidence': pred_conf}
+                for pred_letter, pred_conf in top_predictions
+            ] if top_predictions else [],
+            'frame_processed': True,
+            'frame_number': frame_counter,
+            'suggestions': [
+                'Forme claramente una letra del alfabeto ASL',
+                'Mantenga la posición por unos segundos',
+                'Asegúrese de que los dedos estén bien posicionados'
+            ]
+        }
+    
+    return response_data
+
+def update_latest_client_gesture(response_data):
+    """Actualizar último gesto para el panel del agente"""
+    global latest_client_gesture
+    if response_data['success']:
+        # Letra ASL reconocida exitosamente
+        latest_client_gesture = {
+            'gesture': response_data['letter'],
+            'confidence': response_data['confidence'],
+            'timestamp': response_data['timestamp'],
+            'description': response_data['description'],
+            'category': response_data['category'],
+            'status': 'recognized'
+        }
+    else:
+        # No se reconoció letra clara
+        latest_client_gesture = {
+            'gesture': 'letra_no_reconocida',
+            'confidence': response_data.get('confidence', 0.0),
+            'timestamp': response_data.get('timestamp', datetime.now().isoformat()),
+            'description': response_data['message'],
+            'category': 'alfabeto_asl',
+            'status': 'not_recognized'
+        }
+
+def recognize_gesture_frame(frame, stream, stream_id, frame_counter, step=None):
+    """
+    Detectar la mano y reconocer la letra de un frame admitido (sin cache ni skipping)
+
+    Args:
+        frame: Frame BGR (OpenCV)
+        stream: StreamState del stream
+        stream_id: Identificador del stream
+        frame_counter: Número de frame dentro del stream
+        step: QualityStep del stream (resolución de MediaPipe y reconocedor) o None
+
+    Returns:
+        dict: Resultado de la detección
+    """
+    max_input_width = step.input_width if step else None
+    tier = step.tier if step else 'full'
+
+    # Con el pool de procesos, detección y reconocimiento se hacen en el trabajador de la sesión,
+    # con el peldaño de calidad del stream y la ventana y la compuerta de su propia sesión
+    worker_result = None
+    if worker_pool is not None:
+        with stream.lock:
+            stable = stream.stability is not None and stream.stability.is_stable
+        with stage_timer('inference_worker'):
+            worker_result = worker_pool.analyze(stream_id, frame, top_k=3, max_input_width=max_input_width,
+                                                tier=tier, motion_gate=stream.motion_gate is not None,
+                                                stable=stable)
+    
+    if worker_result is not None:
+        analysis = worker_result.analysis
+    else:
+        # Detectar manos y extraer landmarks en una sola pasada de MediaPipe
+        # usando el detector propio de la sesión (tracking por stream), solo en la
+        # ventana alrededor de la mano anterior si el stream tiene ROI
+        with detector_pool.acquire(stream_id) as detector:
+            if stream.roi_tracker is not None:
+                analysis = stream.roi_tracker.analyze(detector, frame, max_input_width)
+            else:
+                analysis = detector.analyze_frame(frame, max_input_width=max_input_width)
+    
+    if not analysis.hands_detected:
+        # Sin mano la letra mantenida se da por terminada
+        with stream.lock:
+            if stream.stability is not None:
+                stream.stability.reset()
+            if stream.motion_gate is not None:
+                stream.motion_gate.reset()
+        response_data = {
+            'success': False,
+            'message': 'No se detectaron manos en la imagen',
+            'letter': None,
+            'gesture': None,
+            'confidence': 0.0,
+            'hands_detected': False,
+            'error': 'no_hands_detected',
+            'frame_processed': True,
+            'frame_number': frame_counter,
+            'suggestions': [
+                'Coloque su mano frente a la cámara',
+                'Asegúrese de que la mano esté completamente visible',
+                'Use buena iluminación',
+                'Mantenga la mano a 30-60 cm de la cámara'
+            ]
+        }
+    else:
+        # Si hay manos detectadas, extraer región de la mano y reconocer letra ASL
+        try:
+            # Landmarks y bounding box ya calculados en el análisis del frame
+            landmarks = analysis.primary_landmarks
+            all_landmarks = analysis.normalized_landmarks
+            
             if landmarks:
-                hand_region = extract_hand_region(frame, landmarks)
-                letter, confidence = asl_recognizer.predict(hand_region, landmarks)
+                reused = False
+                if worker_result is not None:
+                    # El trabajador ya reconoció la letra (o reutilizó la anterior)
+                    prediction = worker_result.prediction
+                    hand_region_size = worker_result.hand_region_size
+                    tier = worker_result.tier
+                    reused = worker_result.reused
+                    if worker_result.gate_result is not None:
+                        if stream.motion_gate is not None:
+                            with stream.lock:
+                                stream.motion_gate.count(worker_result.gate_result)
+                        metrics.inc('asl_motion_gate_total', result=worker_result.gate_result)
+                else:
+                    # Mano quieta desde la última inferencia: sin recorte ni reconocedor
+                    prediction = gated_prediction(stream, landmarks)
+                    reused = prediction is not None
+                    hand_region_size = None
                 
-                if letter:
-                    # Obtener top 3 predicciones
-                    top_predictions = asl_recognizer.get_top_predictions(hand_region, top_k=3)
+                if worker_result is None and not reused:
+                    # El reconocedor de landmarks del peldaño 'fast' no necesita el recorte
+                    hand_region = None
+                    if landmark_recognizer is not None or tier != 'fast' or fast_recognizer is None:
+                        # Extraer región de la mano del frame
+                        with stage_timer('crop'):
+                            hand_region = extract_hand_region(frame, landmarks)
+                        hand_region_size = (hand_region.shape[1], hand_region.shape[0])
                     
-                    response_data = {
-                        'success': True,
-                        'message': f'Letra ASL reconocida: {letter}',
-                        'letter': letter,
-                        'confidence': confidence,
-                        'top_predictions': [
-                            {'letter': pred_letter, 'confidence': pred_conf}
-                            for pred_letter, pred_conf in top_predictions
-                        ],
-                        'timestamp': datetime.now().isoformat()
-                    }
-                else:
-                    response_data = {
-                        'success': False,
-                        'message': 'Mano detectada pero letra no reconocida',
-                        'letter': None,
-                        'confidence': 0.0,
-                        'error': 'recognition_failed',
-                        'timestamp': datetime.now().isoformat()
-                    }
+                    # Reconocer letra ASL en la región de la mano (una sola inferencia para letra y top 3)
+                    prediction = run_asl_inference(
+                        hand_region, landmarks, top_k=3,
+                        aspect_ratio=analysis.frame_shape[1] / analysis.frame_shape[0],
+                        handedness=analysis.handedness[0],
+                        tier=tier
+                    )
+                    record_gated_prediction(stream, landmarks, prediction)
+                response_data = build_recognition_response(
+                    prediction,
+                    all_landmarks if all_landmarks else [landmarks],
+                    analysis.primary_bounding_box,
+                    frame_counter,
+                    hand_region_size,
+                    update_stability(stream, None if reused else prediction, tier)
+                )
+                if reused:
+                    response_data['motion_gated'] = True
             else:
                 response_data = {
                     'success': False,
                     'message': 'No se pudieron extraer landmarks de la mano',
                     'letter': None,
+                    'gesture': None,
                     'confidence': 0.0,
+                    'hands_detected': True,
                     'error': 'invalid_landmarks',
-                    'timestamp': datetime.now().isoformat()
+                    'frame_processed': True,
+                    'frame_number': frame_counter
                 }
-        
-        return jsonify(response_data)
-        
-    except Exception as e:
-        return jsonify({
-            'success': False,
-            'message': f'Error interno en reconocimiento ASL: {str(e)}',
-            'letter': None,
-            'confidence': 0.0,
-            'error': 'internal_error'
-        }), 500
+                
+        except Exception as e:
+            response_data = {
+                'success': False,
+                'message': f'Error en reconocimiento ASL: {str(e)}',
+                'letter': None,
+                'gesture': None,
+                'confidence': 0.0,
+                'hands_detected': True,
+                'error': 'asl_recognition_error',
+                'frame_processed': True,
+                'frame_number': frame_counter
+            }
+    
+    return response_data
+
+def record_quality_change(direction):
+    """Contar un cambio de peldaño de calidad (+1 baja, -1 sube, 0 sin cambio)"""
+    if direction:
+        metrics.inc('asl_quality_changes_total', direction='down' if direction > 0 else 'up')
+
+def process_gesture_frame(frame, stream_id):
+    """
+    Detectar la letra ASL de un frame ya decodificado dentro de un stream
+
+    Compartido por el endpoint HTTP /detect_gesture y el WebSocket /ws/detect:
+    el stream_id determina el detector, el cache y el frame skipping usados.
+
+    Args:
+        frame: Frame BGR (OpenCV)
+        stream_id: Identificador del stream (sesión HTTP o conexión WebSocket)
+
+    Returns:
+        dict: Resultado de la detección
+    """
+    # Optimización de rendimiento: Cache de resultados y frame skipping
+    stream = stream_store.get(stream_id)
+    frame_counter = stream.next_frame()
+    current_time = datetime.now().timestamp()
+    
+    # Generar hash perceptual del frame para detectar cambios
+    with stage_timer('frame_hash'):
+        frame_hash = generate_frame_hash(frame)
+    
+    # Verificar cache del stream antes de procesar
+    if stream.is_cache_valid(current_time, frame_hash, CACHE_DURATION):
+        metrics.inc('asl_frames_total', result='cache_hit')
+        return stream.get_cached_result(current_time)
+    
+    # Peldaño de calidad del stream (o FRAME_SKIP_RATE fijo sin escalera)
+    step = quality_controller.step_for(stream.quality) if stream.quality is not None else None
+    
+    # Procesar solo uno de cada skip_rate frames del stream para frames diferentes
+    # (usa el último resultado del mismo stream si es reciente, menos de 500ms)
+    if stream.should_skip(frame_counter, step.skip_rate if step else FRAME_SKIP_RATE):
+        metrics.inc('asl_frames_total', result='skipped')
+        return stream.get_skipped_result(current_time, frame_counter)
+    
+    # Control de admisión: bajo sobrecarga el frame se descarta con AdmissionRejected
+    started_at = time.perf_counter()
+    try:
+        with admission_controller.admit():
+            response_data = recognize_gesture_frame(frame, stream, stream_id, frame_counter, step)
+    except AdmissionRejected:
+        if stream.quality is not None:
+            record_quality_change(quality_controller.observe_shed(stream.quality))
+        raise
+    metrics.inc('asl_frames_total', result='processed')
+    
+    # La latencia medida (cola + detección + reconocimiento) mueve el stream por la escalera
+    if stream.quality is not None:
+        record_quality_change(quality_controller.observe(stream.quality, time.perf_counter() - started_at))
+    
+    update_latest_client_gesture(response_data)
+    
+    # Cachear resultado para frames saltados y cache avanzado
+    stream.update_cache(response_data, current_time, frame_hash)
+    
+    return response_data
 
 @app.route('/detect_gesture', methods=['POST'])
 def detect_gesture():
     """Endpoint para procesar frames y detectar letras ASL"""
     try:
+        if is_warming_up():
+            return warming_up_response()
+        
         # Verificar que el reconocedor ASL esté disponible
-        if not asl_recognizer:
+        if not asl_recognizer or not detector_pool:
             return jsonify({
                 'success': False,
                 'message': 'Reconocedor ASL no disponible',
@@ -529,54 +1433,20 @@ def detect_gesture():
                 'error': 'asl_recognizer_not_available'
             }), 503
         
-        # Obtener datos del request
-        if not request.json:
+        # Obtener imagen del request (binaria, multipart o JSON base64)
+        image_payload, error, message = get_request_image()
+        if error:
             return jsonify({
                 'success': False,
-                'message': 'No se recibieron datos JSON',
+                'message': message,
                 'gesture': None,
                 'confidence': 0.0,
-                'error': 'no_data'
+                'error': error
             }), 400
         
-        # Extraer imagen del request
-        image_data = request.json.get('image')
-        if not image_data:
-            return jsonify({
-                'success': False,
-                'message': 'No se recibió imagen en el request',
-                'gesture': None,
-                'confidence': 0.0,
-                'error': 'no_image'
-            }), 400
-        
-        # Decodificar imagen base64
+        # Decodificar imagen directamente a BGR
         try:
-            # Remover prefijo data:image si existe
-            if ',' in image_data:
-                image_data = image_data.split(',')[1]
-            
-            # Decodificar base64
-            image_bytes = base64.b64decode(image_data)
-            
-            # Convertir a imagen PIL
-            pil_image = Image.open(BytesIO(image_bytes))
-            
-            # Optimización de rendimiento: Reducir resolución a 640x480 para procesamiento
-            original_size = pil_image.size
-            target_size = (640, 480)
-            
-            # Solo redimensionar si la imagen es más grande que el objetivo
-            if original_size[0] > target_size[0] or original_size[1] > target_size[1]:
-                pil_image = pil_image.resize(target_size, Image.Resampling.LANCZOS)
-            
-            # Convertir a array numpy (OpenCV format)
-            frame = np.array(pil_image)
-            
-            # Convertir RGB a BGR si es necesario
-            if len(frame.shape) == 3 and frame.shape[2] == 3:
-                frame = cv2.cvtColor(frame, cv2.COLOR_RGB2BGR)
-            
+            frame = decode_gesture_frame(image_payload)
         except Exception as e:
             return jsonify({
                 'success': False,
@@ -586,242 +1456,265 @@ def detect_gesture():
                 'error': 'image_processing_failed'
             }), 400
         
-        # Optimización de rendimiento: Cache de resultados y frame skipping
-        global frame_counter, last_detection_result, last_detection_time
-        frame_counter += 1
-        current_time = datetime.now().timestamp()
-        
-        # Generar hash del frame para detectar cambios
-        frame_hash = generate_frame_hash(frame)
-        
-        # Verificar cache antes de procesar
-        if is_cache_valid(current_time, frame_hash):
-            cached_result = result_cache['result'].copy()
-            cached_result['from_cache'] = True
-            cached_result['cache_age_ms'] = int((current_time - result_cache['timestamp']) * 1000)
-            return jsonify(cached_result)
-        
-        # Procesar solo cada FRAME_SKIP_RATE frames para frames diferentes
-        if frame_counter % FRAME_SKIP_RATE != 0:
-            # Usar último resultado si está disponible y es reciente (menos de 500ms)
-            if last_detection_result and (current_time - last_detection_time) < 0.5:
-                skipped_result = last_detection_result.copy()
-                skipped_result['frame_skipped'] = True
-                skipped_result['frame_number'] = frame_counter
-                return jsonify(skipped_result)
-            else:
-                # Si no hay resultado reciente, devolver estado de espera
-                return jsonify({
-                    'success': False,
-                    'message': 'Procesando frame...',
-                    'gesture': None,
-                    'confidence': 0.0,
-                    'hands_detected': False,
-                    'frame_skipped': True,
-                    'frame_number': frame_counter
-                })
-        
-        # Primero detectar manos en el frame
-        detection_result = hand_detector.detect_hands(frame)
+        response_data = process_gesture_frame(frame, get_stream_id())
+        with stage_timer('json_serialize'):
+            return jsonify(response_data)
         
-        if not detection_result['hands_detected']:
-            response_data = {
+    except AdmissionRejected as rejection:
+        return overload_response(rejection)
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'message': f'Error interno en detección: {str(e)}',
+            'gesture': None,
+            'confidence': 0.0,
+            'error': 'internal_error'
+        }), 500
+@app.route('/classify_landmarks', methods=['POST'])
+def classify_landmarks():
+    """
+    Reconocer la letra ASL a partir de landmarks calculados en el navegador
+
+    El cliente ejecuta MediaPipe Hands y envía solo los 21 puntos (y opcionalmente
+    un recorte pequeño de la mano), así el servidor no detecta manos:
+    {
+        "landmarks": [[x, y, z], ...],      # 21 puntos normalizados 0-1
+        "handedness": "Right",              # opcional
+        "image_width": 640,                 # opcional, para aspecto y bounding box
+        "image_height": 480,
+        "hand_crop": "data:image/jpeg;base64,..."   # opcional, requerido por el CNN
+    }
+    """
+    try:
+        if is_warming_up():
+            return warming_up_response()
+
+        if not asl_recognizer and not landmark_recognizer:
+            return jsonify({
                 'success': False,
-                'message': 'No se detectaron manos en la imagen',
+                'message': 'Reconocedor ASL no disponible',
                 'letter': None,
-                'gesture': None,
                 'confidence': 0.0,
-                'hands_detected': False,
-                'error': 'no_hands_detected',
-                'frame_processed': True,
-                'frame_number': frame_counter,
-                'suggestions': [
-                    'Coloque su mano frente a la cámara',
-                    'Asegúrese de que la mano esté completamente visible',
-                    'Use buena iluminación',
-                    'Mantenga la mano a 30-60 cm de la cámara'
-                ]
-            }
-        else:
-            # Si hay manos detectadas, extraer región de la mano y reconocer letra ASL
+                'error': 'asl_recognizer_not_available'
+            }), 503
+
+        data = request.get_json(silent=True)
+        if not data:
+            return jsonify({
+                'success': False,
+                'message': 'No se recibieron datos JSON',
+                'letter': None,
+                'confidence': 0.0,
+                'error': 'no_data'
+            }), 400
+
+        raw_landmarks = data.get('landmarks')
+        landmarks = None
+        if HandDetector.validate_landmarks(raw_landmarks):
+            landmarks = HandDetector.normalize_landmarks(raw_landmarks)
+        if landmarks is None:
+            return jsonify({
+                'success': False,
+                'message': 'Landmarks inválidos: se esperan 21 puntos [x, y, z]',
+                'letter': None,
+                'confidence': 0.0,
+                'error': 'invalid_landmarks'
+            }), 400
+
+        handedness = data.get('handedness') if data.get('handedness') in ('Left', 'Right') else None
+
+        # Tamaño del frame del navegador: relación de aspecto y bounding box en píxeles
+        try:
+            image_width = int(data.get('image_width') or 0)
+            image_height = int(data.get('image_height') or 0)
+        except (ValueError, TypeError):
+            image_width = image_height = 0
+        has_size = image_width > 0 and image_height > 0
+        aspect_ratio = image_width / image_height if has_size else 1.0
+        bounding_box = landmarks_bounding_box(landmarks, image_width, image_height) if has_size else None
+
+        # Recorte de la mano opcional (necesario si se usa el CNN)
+        hand_crop = None
+        if data.get('hand_crop'):
             try:
-                # Obtener landmarks de la mano
-                landmarks = hand_detector.get_normalized_landmarks(frame)
-                all_landmarks = hand_detector.get_all_normalized_landmarks(frame)
-                
-                if landmarks:
-                    # Calcular bounding box para visualización
-                    height, width = frame.shape[:2]
-                    x_coords = [int(lm[0] * width) for lm in landmarks]
-                    y_coords = [int(lm[1] * height) for lm in landmarks]
-                    
-                    bounding_box = {
-                        'min_x': min(x_coords),
-                        'max_x': max(x_coords),
-                        'min_y': min(y_coords),
-                        'max_y': max(y_coords),
-                        'width': max(x_coords) - min(x_coords),
-                        'height': max(y_coords) - min(y_coords)
-                    }
-                    
-                    # Extraer región de la mano del frame
-                    hand_region = extract_hand_region(frame, landmarks)
-                    
-                    # Reconocer letra ASL en la región de la mano (con landmarks para detección de movimiento)
-                    letter, confidence = asl_recognizer.predict(hand_region, landmarks)
-                    
-                    # Obtener información de estabilidad
-                    stability_info = asl_recognizer.get_stability_info()
-                    
-                    # Obtener top 3 predicciones
-                    top_predictions = asl_recognizer.get_top_predictions(hand_region, top_k=3)
-                    
-                    # Evaluar resultado SIMPLE
-                    if letter and confidence > 0.5:  # Predicciones con 50%+ de confianza
-                        response_data = {
-                            'success': True,
-                            'message': f'Letra ASL detectada: {letter}',
-                            'letter': letter,
-                            'gesture': letter,
-                            'confidence': confidence,
-                            'description': f'Letra del alfabeto ASL: {letter}',
-                            'category': 'alfabeto_asl',
-                            'hands_detected': True,
-                            'landmarks': all_landmarks if all_landmarks else [landmarks],
-                            'bounding_box': bounding_box,
-                            'hand_region_size': {
-                                'width': hand_region.shape[1],
-                                'height': hand_region.shape[0]
-                            },
-                            'stability_info': stability_info,
-                            'top_predictions': [
-                                {'letter': pred_letter, 'confidence': pred_conf}
-                                for pred_letter, pred_conf in top_predictions
-                            ],
-                            'timestamp': datetime.now().isoformat(),
-                            'frame_processed': True,
-                            'frame_number': frame_counter
-                        }
-                    elif letter and confidence > 0.3:  # Predicción detectada con confianza baja
-                        stability_message = stability_info.get('message', 'Analizando estabilidad...')
-                        response_data = {
-                            'success': False,
-                            'message': f'Detectando: {letter} - {stability_message}',
-                            'letter': letter,
-                            'gesture': None,
-                            'confidence': confidence,
-                            'description': f'Posible letra ASL: {letter} - Mantenga la posición',
-                            'category': 'alfabeto_asl',
-                            'hands_detected': True,
-                            'landmarks': all_landmarks if all_landmarks else [landmarks],
-                            'bounding_box': bounding_box,
-                            'stability_info': stability_info,
-                            'top_predictions': [
-                                {'letter': pred_letter, 'confidence': pred_conf}
-                                for pred_letter, pred_conf in top_predictions
-                            ],
-                            'frame_processed': True,
-                            'frame_number': frame_counter,
-                            'suggestions': [
-                                f'Mantenga la posición de la letra {letter} por 2-3 segundos',
-                                'Asegúrese de formar la letra claramente',
-                                'Use buena iluminación uniforme'
-                            ]
-                        }
-                    else:
-                        response_data = {
-                            'success': False,
-                            'message': 'Mano detectada pero letra no reconocida',
-                            'letter': None,
-                            'gesture': None,
-                            'confidence': confidence if letter else 0.0,
-                            'description': 'Forme una letra ASL clara',
-                            'category': 'alfabeto_asl',
-                            'hands_detected': True,
-                            'landmarks': all_landmarks if all_landmarks else [landmarks],
-                            'bounding_box': bounding_box,
-                            'stability_info': stability_info,
-                            'top_predictions': [
-                                {'letter': pred_letter, 'confidence': pred_conf}
-                                for pred_letter, pred_conf in top_predictions
-                            ] if top_predictions else [],
-                            'frame_processed': True,
-                            'frame_number': frame_counter,
-                            'suggestions': [
-                                'Forme claramente una letra del alfabeto ASL',
-                                'Mantenga la posición por unos segundos',
-                                'Asegúrese de que los dedos estén bien posicionados'
-                            ]
-                        }
-                else:
-                    response_data = {
+                crop_bytes = decode_base64_image(data['hand_crop'])
+                # Un recorte no puede ser mayor que un frame: se rechaza sin decodificarlo
+                crop_size = image_dimensions(crop_bytes)
+                if crop_size and (crop_size[0] > DETECTION_FRAME_SIZE[0] or crop_size[1] > DETECTION_FRAME_SIZE[1]):
+                    return jsonify({
                         'success': False,
-                        'message': 'No se pudieron extraer landmarks de la mano',
+                        'message': f'Recorte de la mano demasiado grande ({crop_size[0]}x{crop_size[1]})',
                         'letter': None,
-                        'gesture': None,
                         'confidence': 0.0,
-                        'hands_detected': True,
-                        'error': 'invalid_landmarks',
-                        'frame_processed': True,
-                        'frame_number': frame_counter
-                    }
-                    
+                        'error': 'hand_crop_too_large'
+                    }), 413
+                hand_crop = decode_frame(crop_bytes, max_size=HAND_CROP_MAX_SIZE)
             except Exception as e:
-                response_data = {
+                return jsonify({
                     'success': False,
-                    'message': f'Error en reconocimiento ASL: {str(e)}',
+                    'message': f'Error procesando recorte de la mano: {str(e)}',
                     'letter': None,
-                    'gesture': None,
                     'confidence': 0.0,
-                    'hands_detected': True,
-                    'error': 'asl_recognition_error',
-                    'frame_processed': True,
-                    'frame_number': frame_counter
-                }
-        
-        # Actualizar último gesto para el panel del agente
-        global latest_client_gesture
-        if response_data['success']:
-            # Letra ASL reconocida exitosamente
-            latest_client_gesture = {
-                'gesture': response_data['letter'],
-                'confidence': response_data['confidence'],
-                'timestamp': response_data['timestamp'],
-                'description': response_data['description'],
-                'category': response_data['category'],
-                'status': 'recognized'
-            }
-        else:
-            # No se reconoció letra clara
-            latest_client_gesture = {
-                'gesture': 'letra_no_reconocida',
-                'confidence': response_data.get('confidence', 0.0),
-                'timestamp': response_data.get('timestamp', datetime.now().isoformat()),
-                'description': response_data['message'],
-                'category': 'alfabeto_asl',
-                'status': 'not_recognized'
-            }
-        
-        # Cachear resultado para frames saltados y cache avanzado
-        last_detection_result = response_data.copy()
-        last_detection_time = current_time
-        update_cache(response_data, current_time, frame_hash)
-        
+                    'error': 'image_processing_failed'
+                }), 400
+
+        if landmark_recognizer is None and hand_crop is None:
+            return jsonify({
+                'success': False,
+                'message': 'El reconocedor CNN necesita el recorte de la mano (hand_crop)',
+                'letter': None,
+                'confidence': 0.0,
+                'error': 'hand_crop_required'
+            }), 422
+
+        stream = stream_store.get(get_stream_id())
+        frame_counter = stream.next_frame()
+
+        # Mano quieta desde la última inferencia: se reutiliza la predicción sin pasar por admisión
+        prediction = gated_prediction(stream, landmarks)
+        reused = prediction is not None
+        if not reused:
+            with admission_controller.admit():
+                prediction = run_asl_inference(
+                    hand_crop, landmarks, top_k=3,
+                    aspect_ratio=aspect_ratio,
+                    handedness=handedness
+                )
+            record_gated_prediction(stream, landmarks, prediction)
+        response_data = build_recognition_response(
+            prediction, [landmarks], bounding_box, frame_counter,
+            (hand_crop.shape[1], hand_crop.shape[0]) if hand_crop is not None else None,
+            update_stability(stream, None if reused else prediction)
+        )
+        if reused:
+            response_data['motion_gated'] = True
+
+        update_latest_client_gesture(response_data)
+        stream.update_cache(response_data, datetime.now().timestamp(), None)
+
         return jsonify(response_data)
-        
+
+    except AdmissionRejected as rejection:
+        return overload_response(rejection)
     except Exception as e:
         return jsonify({
             'success': False,
-            'message': f'Error interno en detección: {str(e)}',
-            'gesture': None,
+            'message': f'Error interno en clasificación por landmarks: {str(e)}',
+            'letter': None,
             'confidence': 0.0,
             'error': 'internal_error'
         }), 500
 
+# Campos de la respuesta que usan los clientes del stream WebSocket
+STREAM_RESULT_FIELDS = (
+    'success', 'message', 'letter', 'gesture', 'confidence', 'error',
+    'hands_detected', 'num_hands', 'landmarks', 'bounding_box', 'top_predictions',
+    'stability_info', 'frame_processed', 'frame_skipped', 'from_cache',
+    'cache_age_ms', 'motion_gated', 'frame_number'
+)
+
+def compact_stream_result(result):
+    """
+    Reducir un resultado de detección a los campos que consumen los clientes
+
+    Omite descripciones, sugerencias y timestamps, y redondea los landmarks
+    a 4 decimales para que cada mensaje del WebSocket sea pequeño.
+    """
+    compact = {key: result[key] for key in STREAM_RESULT_FIELDS if key in result}
+    if compact.get('landmarks'):
+        compact['landmarks'] = [
+            [[round(float(value), 4) for value in point] for point in hand]
+            for hand in compact['landmarks']
+        ]
+    return compact
+
+if sock is not None:
+    @sock.route('/ws/detect')
+    def detect_gesture_stream(ws):
+        """
+        Stream persistente de frames para reconocimiento continuo
+
+        El cliente envía cada frame como mensaje binario (JPEG/WebP) o, como
+        alternativa, un data URL base64 en texto; el servidor responde a cada
+        frame con un JSON compacto en el mismo orden. El detector, el cache y
+        el frame skipping viven con la conexión y se liberan al cerrarla.
+        """
+        stream_id = f"ws-{uuid.uuid4().hex}"
+        with ws_connections_lock:
+            ws_connections['active'] += 1
+            ws_connections['total'] += 1
+
+        try:
+            while True:
+                message = ws.receive()
+                if message is None:
+                    break
+
+                if is_warming_up():
+                    ws.send(json.dumps(warming_up_result()))
+                    continue
+
+                if not asl_recognizer or not detector_pool:
+                    ws.send(json.dumps({
+                        'success': False,
+                        'message': 'Reconocedor ASL no disponible',
+                        'letter': None,
+                        'confidence': 0.0,
+                        'error': 'asl_recognizer_not_available'
+                    }))
+                    continue
+
+                try:
+                    frame = decode_gesture_frame(message)
+                except Exception as e:
+                    ws.send(json.dumps({
+                        'success': False,
+                        'message': f'Error procesando imagen: {str(e)}',
+                        'gesture': None,
+                        'confidence': 0.0,
+                        'error': 'image_processing_failed'
+                    }))
+                    continue
+
+                try:
+                    result = compact_stream_result(process_gesture_frame(frame, stream_id))
+                except AdmissionRejected as rejection:
+                    result = overload_result(rejection)
+                except Exception as e:
+                    result = {
+                        'success': False,
+                        'message': f'Error interno en detección: {str(e)}',
+                        'gesture': None,
+                        'confidence': 0.0,
+                        'error': 'internal_error'
+                    }
+                with stage_timer('json_serialize'):
+                    message = json.dumps(result)
+                ws.send(message)
+
+        except ConnectionClosed:
+            pass
+        finally:
+            with ws_connections_lock:
+                ws_connections['active'] -= 1
+            if detector_pool:
+                detector_pool.release(stream_id)
+            if worker_pool:
+                worker_pool.release(stream_id)
+            stream_store.remove(stream_id)
+
 @app.route('/get_gestures', methods=['GET'])
 def get_gestures():
     """Obtener lista de letras ASL disponibles del NUEVO MODELO"""
     try:
+        if is_warming_up():
+            return jsonify({
+                'success': False,
+                'gestures': [],
+                'message': 'Cargando modelos, reintente en unos segundos',
+                'error': 'warming_up'
+            }), 503, {'Retry-After': str(WARMUP_RETRY_SECONDS)}
+        
         if not asl_recognizer:
             return jsonify({
                 'success': False,
@@ -849,7 +1742,8 @@ def get_gestures():
             'model_info': {
                 'accuracy': '97.5%',
                 'letters_count': len(available_letters),
-                'model_path': 'models/asl_quick_model.h5'
+                'model_path': asl_recognizer.model_path,
+                'version': model_state['active_version']
             }
         })
         
@@ -977,6 +1871,7 @@ def get_status():
                 'hand_detector': hand_detector is not None,
                 'asl_alphabet_recognizer': asl_recognizer is not None
             },
+            'startup': dict(startup_state),
             'timestamp': datetime.now().isoformat()
         }
         
@@ -984,6 +1879,8 @@ def get_status():
         if asl_recognizer:
             status_data['asl_stats'] = {
                 'model_loaded': asl_recognizer.model is not None,
+                'backend': asl_recognizer.backend_name,
+                'variant': asl_recognizer.variant,
                 'available_letters': len(asl_recognizer.class_names),
                 'letters': asl_recognizer.class_names
             }
@@ -991,15 +1888,45 @@ def get_status():
         if hand_detector:
             status_data['detection_stats'] = hand_detector.get_detection_stats()
         
-        # Agregar estadísticas de rendimiento
+        if detector_pool:
+            status_data['detector_pool'] = detector_pool.get_stats()
+        
+        if inference_service:
+            status_data['inference_batching'] = inference_service.get_stats()
+        
+        if worker_pool:
+            status_data['inference_workers'] = worker_pool.get_stats()
+        
+        status_data['admission'] = admission_controller.get_stats()
+        
+        status_data['recognizer_mode'] = RECOGNIZER_MODE
+        status_data['model'] = model_status()
+        
+        with ws_connections_lock:
+            status_data['websocket'] = {
+                'available': WEBSOCKET_AVAILABLE,
+                'endpoint': '/ws/detect' if WEBSOCKET_AVAILABLE else None,
+                'active_connections': ws_connections['active'],
+                'total_connections': ws_connections['total']
+            }
+        
+        # Agregar estadísticas de rendimiento (globales; el detalle por sesión solo para administradores)
+        stream_stats = stream_store.get_stats(max_sessions=50 if is_admin_request() else 0)
+        live_streams = max(stream_stats['live_streams'], 1)
         status_data['performance_stats'] = {
-            'frame_counter': frame_counter,
-            'frame_skip_rate': FRAME_SKIP_RATE,
+            'frame_counter': stream_stats['total_frames'],
+            'frame_skip_rate': None if quality_controller else FRAME_SKIP_RATE,
             'cache_duration_ms': int(CACHE_DURATION * 1000),
-            'effective_fps': 30 / FRAME_SKIP_RATE,  # Asumiendo 30 FPS de entrada
-            'cache_valid': result_cache['result'] is not None,
-            'cache_age_ms': int((datetime.now().timestamp() - result_cache['timestamp']) * 1000) if result_cache['result'] else 0
+            # FPS medidos por stream activo (recibidos y procesados de verdad)
+            'input_fps': round(stream_stats['total_input_fps'] / live_streams, 2),
+            'effective_fps': round(stream_stats['total_processed_fps'] / live_streams, 2),
+            'quality_ladder': quality_controller.get_stats() if quality_controller else None,
+            'stage_latency': metrics.histogram_summary(STAGE_METRIC),
+            'streams': stream_stats
         }
+        current_stream = stream_store.peek(session['stream_id']) if session.get('stream_id') else None
+        if current_stream is not None:
+            status_data['performance_stats']['current_stream'] = current_stream.get_stats()
         
         return jsonify({
             'success': True,
@@ -1014,6 +1941,124 @@ def get_status():
             'data': None
         }), 500
 
+@app.route('/healthz', methods=['GET'])
+def healthz():
+    """Liveness: el proceso responde (no espera a los modelos)"""
+    return jsonify({'status': 'ok'})
+
+@app.route('/readyz', methods=['GET'])
+def readyz():
+    """Readiness: 200 solo cuando los modelos están cargados; 503 mientras cargan o si fallaron"""
+    if is_warming_up():
+        return jsonify({'ready': False, **startup_state}), 503, {'Retry-After': str(WARMUP_RETRY_SECONDS)}
+    ready = startup_state['status'] == 'ready'
+    return jsonify({'ready': ready, **startup_state}), 200 if ready else 503
+
+def is_admin_request():
+    """
+    Peticiones de administración: sesión con rol admin o cabecera X-Admin-Token
+    igual a ADMIN_TOKEN
+
+    Sin ADMIN_TOKEN solo vale la sesión: detrás de un proxy inverso todas las
+    peticiones llegan desde localhost, así que la dirección no identifica a nadie.
+    """
+    if session.get('role') == 'admin':
+        return True
+    if ADMIN_TOKEN:
+        return hmac.compare_digest(request.headers.get('X-Admin-Token', ''), ADMIN_TOKEN)
+    return False
+
+def admin_forbidden_response():
+    return jsonify({
+        'success': False,
+        'message': 'Se requiere acceso de administrador',
+        'error': 'forbidden'
+    }), 403
+
+@app.route('/admin/models', methods=['GET'])
+def admin_list_models():
+    """Versiones del registro y estado del modelo activo"""
+    if not is_admin_request():
+        return admin_forbidden_response()
+    versions = [{
+        'version': manifest['version'],
+        'created_at': manifest.get('created_at'),
+        'checksum': manifest.get('checksum'),
+        'input_size': manifest.get('input_size'),
+        'num_classes': manifest.get('num_classes'),
+        'notes': manifest.get('notes', ''),
+        'active': manifest['version'] == model_state['active_version']
+    } for manifest in model_registry.versions()]
+    return jsonify({'success': True, 'versions': versions, 'model': model_status()})
+
+@app.route('/admin/models/load', methods=['POST'])
+def admin_load_model():
+    """
+    Cargar una versión en segundo plano, calentarla y cambiarla por la activa
+
+    JSON: {"version": "20261017-101500"} (null vuelve al modelo de MODEL_PATH).
+    Responde 202 de inmediato; el progreso se consulta en GET /admin/models.
+    """
+    if not is_admin_request():
+        return admin_forbidden_response()
+    if is_warming_up():
+        return warming_up_response()
+
+    data = request.get_json(silent=True) or {}
+    version = data.get('version')
+    if version is not None:
+        try:
+            model_registry.manifest(str(version))
+        except RegistryError as e:
+            return jsonify({'success': False, 'message': str(e), 'error': 'unknown_version'}), 404
+
+    if not start_model_load(version):
+        return jsonify({
+            'success': False,
+            'message': f"Ya se está cargando la versión {model_state['loading_version']}",
+            'error': 'load_in_progress',
+            'model': model_status()
+        }), 409
+    return jsonify({
+        'success': True,
+        'message': f"Cargando la versión {version or 'MODEL_PATH'} en segundo plano",
+        'model': model_status()
+    }), 202
+
+@app.route('/admin/models/rollback', methods=['POST'])
+def admin_rollback_model():
+    """Volver a la versión anterior (instantáneo si sigue en memoria)"""
+    if not is_admin_request():
+        return admin_forbidden_response()
+    if is_warming_up():
+        return warming_up_response()
+
+    outcome = rollback_model()
+    if outcome == 'busy':
+        return jsonify({
+            'success': False,
+            'message': f"Se está cargando la versión {model_state['loading_version']}; espere a que termine",
+            'error': 'load_in_progress',
+            'model': model_status()
+        }), 409
+    if outcome is None:
+        return jsonify({
+            'success': False,
+            'message': 'No hay versión anterior a la que volver',
+            'error': 'no_previous_version',
+            'model': model_status()
+        }), 409
+    return jsonify({
+        'success': True,
+        'message': 'Versión anterior activa' if outcome == 'swapped' else 'Cargando la versión anterior',
+        'model': model_status()
+    }), 200 if outcome == 'swapped' else 202
+
+@app.route('/metrics', methods=['GET'])
+def get_metrics():
+    """Histogramas de latencia por etapa y contadores en formato de texto de Prometheus"""
+    return Response(metrics.render(), mimetype='text/plain; version=0.0.4')
+
 # ============================================
 # GAMIFICATION SYSTEM ROUTES (NEW)
 # ============================================
@@ -1325,6 +2370,13 @@ def internal_error(error):
         'message': 'Error interno del servidor'
     }), 500
 
+# Cargar los modelos en segundo plano desde la importación (gunicorn, flask run).
+# Con el reloader de Werkzeug el proceso padre solo vigila archivos y no los carga
+if __name__ != '__main__' or os.environ.get('WERKZEUG_RUN_MAIN') == 'true':
+    if not ADMIN_TOKEN:
+        print("AVISO: ADMIN_TOKEN no configurado; /admin/models solo acepta sesiones con rol admin")
+    start_background_initialization()
+
 if __name__ == '__main__':
     # Verificar que existen los directorios necesarios
     os.makedirs('templates', exist_ok=True)
@@ -1335,20 +2387,9 @@ if __name__ == '__main__':
     print("Iniciando Sistema Educativo ASL con MODELO ENTRENADO")
     print("Estructura de proyecto configurada")
     
-    # Verificar estado de componentes
-    if hand_detector and asl_recognizer:
-        print("Detector de manos listo")
-        print("MODELO ENTRENADO cargado (97.5% precision)")
-        print("Sistema educativo con modelo personalizado")
-        print(f"Letras disponibles: {', '.join(asl_recognizer.get_available_letters())}")
-        print("Usando modelo entrenado con tu dataset personalizado")
-    else:
-        print("Algunos componentes no están disponibles")
-        if not hand_detector:
-            print("   - Detector de manos: No inicializado")
-        if not asl_recognizer:
-            print("   - Reconocedor ASL: No inicializado")
-            print("Ejecuta 'python quick_train.py' para entrenar el modelo")
+    # Los modelos se cargan en segundo plano; el resultado se imprime al terminar
+    print("Cargando detector de manos y modelo ASL en segundo plano")
+    print("Consulta GET /readyz para saber cuándo está listo el reconocimiento")
     
     print("Aplicacion educativa disponible en: http://localhost:5000")
     print("Interfaces disponibles:")
@@ -1359,6 +2400,8 @@ if __name__ == '__main__':
     print("   - POST /detect_asl_letter - Reconocimiento ASL alternativo")
     print("   - GET  /get_gestures      - Lista de letras ASL (A-Z)")
     print("   - GET  /status            - Estado del sistema")
+    print("   - GET  /healthz           - Proceso activo")
+    print("   - GET  /readyz            - Modelos cargados y listos")
     
     # Ejecutar aplicación Flask
     app.run(
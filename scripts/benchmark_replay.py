@@ -0,0 +1,420 @@
+"""
+Benchmark de /detect_gesture reproduciendo sesiones de cámara grabadas.
+
+Uso:
+    python scripts/benchmark_replay.py --frames data/sessions --students 20 --fps 3.3
+    python scripts/benchmark_replay.py --mode http --url http://localhost:5000 \
+        --frames data/sessions --students 30 --duration 60 --server-pid 12345
+    python scripts/benchmark_replay.py --capture data/captures/clase1 --students 20
+    python scripts/benchmark_replay.py --synthetic 90 --output bench.json \
+        --compare baseline.json --max-regression 10
+
+--frames es una carpeta de JPEG (una sesión) o una carpeta con una subcarpeta
+por sesión; --capture es una captura de scripts/capture_tool.py (una sesión por
+sesión grabada). Cada estudiante simulado tiene su propia sesión de Flask y reproduce
+una sesión al ritmo --fps con un solo frame en vuelo, como los clientes web: si
+la respuesta anterior no ha llegado cuando toca el siguiente frame, ese frame se
+descarta en el cliente.
+
+Modos:
+    - testclient: importa app.py y usa el cliente de pruebas de Flask en este
+      proceso (el CPU por frame incluye todo el pipeline)
+    - http: envía los frames a un servidor ya arrancado; con --server-pid se
+      mide el CPU del proceso del servidor (Linux, /proc)
+
+El informe JSON incluye la configuración y el commit para comparar ejecuciones;
+con --compare devuelve código 1 si el p95 empeora más de --max-regression %.
+Si la configuración difiere de la del informe anterior se avisa (con
+--strict-config devuelve código 1: los números no son comparables).
+"""
+
+import argparse
+import http.cookiejar
+import json
+import os
+import subprocess
+import sys
+import threading
+import time
+import urllib.error
+import urllib.request
+
+import cv2
+import numpy as np
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.inference_backends import DEFAULT_BACKEND, DEFAULT_VARIANT
+
+IMAGE_EXTENSIONS = ('.jpg', '.jpeg', '.png', '.webp')
+
+
+def load_sessions(path):
+    """
+    Cargar las sesiones grabadas como listas de JPEG codificados
+
+    Returns:
+        list: Una lista de bytes por sesión (en orden de nombre de archivo)
+    """
+    def read_images(folder):
+        names = sorted(f for f in os.listdir(folder) if f.lower().endswith(IMAGE_EXTENSIONS))
+        frames = []
+        for name in names:
+            with open(os.path.join(folder, name), 'rb') as f:
+                frames.append(f.read())
+        return frames
+
+    sessions = []
+    own_frames = read_images(path)
+    if own_frames:
+        sessions.append(own_frames)
+    for name in sorted(os.listdir(path)):
+        folder = os.path.join(path, name)
+        if os.path.isdir(folder):
+            frames = read_images(folder)
+            if frames:
+                sessions.append(frames)
+    return sessions
+
+
+def load_capture_sessions(path):
+    """Sesiones de una captura (src/capture_format.py) en orden de grabación"""
+    from src.capture_format import CaptureReader
+
+    reader = CaptureReader(path)
+    return [
+        [reader.frame_bytes(i) for i in reader.session_indices(session)]
+        for session in range(len(reader.session_names))
+    ]
+
+
+def synthetic_session(num_frames, size=(640, 480), seed=0):
+    """
+    Sesión sintética reproducible: una mancha de color piel que se mueve sobre ruido
+
+    Sirve para medir decodificación, cache y skipping sin grabaciones reales
+    (MediaPipe normalmente no detectará una mano en estos frames).
+    """
+    rng = np.random.default_rng(seed)
+    width, height = size
+    background = rng.integers(0, 255, (height, width, 3), dtype=np.uint8)
+    frames = []
+    for i in range(num_frames):
+        frame = background.copy()
+        center = (int(width * (0.3 + 0.4 * (i % 30) / 30)), int(height * 0.5))
+        cv2.ellipse(frame, center, (60, 90), 0, 0, 360, (120, 160, 210), -1)
+        ok, buffer = cv2.imencode('.jpg', frame, [cv2.IMWRITE_JPEG_QUALITY, 80])
+        if not ok:
+            raise RuntimeError(f'No se pudo codificar el frame sintético {i}')
+        frames.append(buffer.tobytes())
+    return [frames]
+
+
+def process_cpu_seconds(pid=None):
+    """CPU (usuario + sistema) consumido por este proceso o por otro vía /proc"""
+    if pid is None:
+        times = os.times()
+        return times.user + times.system
+    try:
+        with open(f'/proc/{pid}/stat', 'r') as f:
+            fields = f.read().rsplit(')', 1)[1].split()
+        return (int(fields[11]) + int(fields[12])) / os.sysconf('SC_CLK_TCK')
+    except (OSError, IndexError, ValueError):
+        return None
+
+
+def git_commit():
+    try:
+        return subprocess.check_output(
+            ['git', 'rev-parse', '--short', 'HEAD'],
+            cwd=os.path.dirname(os.path.abspath(__file__)), stderr=subprocess.DEVNULL
+        ).decode().strip()
+    except Exception:
+        return None
+
+
+class TestClientSender:
+    """Envía frames con el cliente de pruebas de Flask (una sesión por estudiante)"""
+
+    def __init__(self, app):
+        self.client = app.test_client()
+
+    def send(self, frame_bytes):
+        response = self.client.post('/detect_gesture', data=bytes(frame_bytes), content_type='image/jpeg')
+        return response.status_code, response.get_json(silent=True) or {}
+
+    def is_ready(self):
+        return self.client.get('/readyz').status_code == 200
+
+
+class HttpSender:
+    """Envía frames por HTTP a un servidor en marcha (cookie de sesión propia)"""
+
+    def __init__(self, base_url, timeout=10.0):
+        self.url = base_url.rstrip('/') + '/detect_gesture'
+        self.timeout = timeout
+        self.opener = urllib.request.build_opener(
+            urllib.request.HTTPCookieProcessor(http.cookiejar.CookieJar())
+        )
+
+    def send(self, frame_bytes):
+        request = urllib.request.Request(
+            self.url, data=bytes(frame_bytes), method='POST', headers={'Content-Type': 'image/jpeg'}
+        )
+        try:
+            with self.opener.open(request, timeout=self.timeout) as response:
+                return response.status, json.loads(response.read() or b'{}')
+        except urllib.error.HTTPError as e:
+            try:
+                body = json.loads(e.read() or b'{}')
+            except ValueError:
+                body = {}
+            return e.code, body
+        except (urllib.error.URLError, OSError) as e:
+            return 0, {'error': str(e)}
+
+    def is_ready(self):
+        try:
+            with self.opener.open(self.url.rsplit('/', 1)[0] + '/readyz', timeout=self.timeout) as response:
+                return response.status == 200
+        except (urllib.error.URLError, OSError):
+            return False
+
+
+def wait_until_ready(sender, timeout=120.0):
+    """Esperar a que el servidor termine de cargar los modelos (GET /readyz)"""
+    deadline = time.perf_counter() + timeout
+    while not sender.is_ready():
+        if time.perf_counter() > deadline:
+            return False
+        time.sleep(0.5)
+    return True
+
+
+def classify_result(status, body):
+    """Clasificar la respuesta: processed, cache_hit, skipped, shed o error"""
+    if status == 429:
+        return 'shed'
+    if status != 200:
+        return 'error'
+    if body.get('from_cache'):
+        return 'cache_hit'
+    if body.get('frame_skipped'):
+        return 'skipped'
+    return 'processed'
+
+
+def run_student(sender, frames, fps, duration, offset, start_at, records):
+    """
+    Reproducir una sesión al ritmo indicado con un solo frame en vuelo
+
+    Cada registro es (instante de envío relativo, latencia en s, clase del resultado);
+    los frames que no se pudieron enviar a tiempo se registran como 'client_dropped'.
+    """
+    interval = 1.0 / fps
+    index = 0
+    while True:
+        scheduled = start_at + index * interval
+        if scheduled - start_at >= duration:
+            break
+        now = time.perf_counter()
+        if now < scheduled:
+            time.sleep(scheduled - now)
+        elif now - scheduled > interval:
+            # La respuesta anterior tardó más que un intervalo: saltar los frames vencidos
+            missed = int((now - scheduled) / interval)
+            for _ in range(missed):
+                records.append((index * interval, None, 'client_dropped'))
+                index += 1
+            continue
+
+        frame = frames[(offset + index) % len(frames)]
+        sent_at = time.perf_counter()
+        status, body = sender.send(frame)
+        records.append((sent_at - start_at, time.perf_counter() - sent_at, classify_result(status, body)))
+        index += 1
+
+
+def percentile_ms(latencies, q):
+    return round(float(np.percentile(latencies, q)) * 1000, 2) if len(latencies) else None
+
+
+def summarize(records_by_student, elapsed, cpu_seconds, config):
+    """Informe agregado de todas las sesiones"""
+    records = [record for student in records_by_student for record in student]
+    sent = [record for record in records if record[2] != 'client_dropped']
+    latencies = np.array([record[1] for record in sent], dtype=np.float64)
+    counts = {}
+    for record in records:
+        counts[record[2]] = counts.get(record[2], 0) + 1
+    answered = max(len(sent), 1)
+
+    return {
+        'config': config,
+        'commit': git_commit(),
+        'elapsed_s': round(elapsed, 3),
+        'frames_scheduled': len(records),
+        'frames_sent': len(sent),
+        'result_counts': counts,
+        'latency_ms': {
+            'p50': percentile_ms(latencies, 50),
+            'p95': percentile_ms(latencies, 95),
+            'p99': percentile_ms(latencies, 99),
+            'mean': round(float(latencies.mean()) * 1000, 2) if len(latencies) else None,
+            'max': round(float(latencies.max()) * 1000, 2) if len(latencies) else None
+        },
+        'achieved_fps': round(len(sent) / elapsed, 2) if elapsed > 0 else 0.0,
+        'achieved_fps_per_student': round(len(sent) / elapsed / max(config['students'], 1), 3) if elapsed > 0 else 0.0,
+        'processed_ratio': round(counts.get('processed', 0) / answered, 4),
+        'cache_hit_ratio': round(counts.get('cache_hit', 0) / answered, 4),
+        'skip_ratio': round(counts.get('skipped', 0) / answered, 4),
+        'shed_ratio': round(counts.get('shed', 0) / answered, 4),
+        'error_ratio': round(counts.get('error', 0) / answered, 4),
+        'cpu_ms_per_frame': round(cpu_seconds / len(sent) * 1000, 3) if cpu_seconds is not None and sent else None
+    }
+
+
+def compare_reports(report, baseline, max_regression):
+    """
+    Comparar con un informe anterior
+
+    Returns:
+        tuple: (dict de diferencias, True si el p95 empeora más de max_regression %)
+            Las diferencias incluyen config_changes: claves de configuración distintas
+    """
+    delta = {}
+    for key in ('p50', 'p95', 'p99'):
+        before, after = baseline['latency_ms'].get(key), report['latency_ms'].get(key)
+        if before and after is not None:
+            delta[f'{key}_change_pct'] = round((after - before) / before * 100, 1)
+    for key in ('achieved_fps', 'cpu_ms_per_frame', 'cache_hit_ratio', 'skip_ratio', 'shed_ratio'):
+        if baseline.get(key) is not None and report.get(key) is not None:
+            delta[key] = {'before': baseline[key], 'after': report[key]}
+    delta['baseline_commit'] = baseline.get('commit')
+    before_config, after_config = baseline.get('config', {}), report.get('config', {})
+    delta['config_changes'] = {
+        key: {'before': before_config.get(key), 'after': after_config.get(key)}
+        for key in sorted(set(before_config) | set(after_config))
+        if before_config.get(key) != after_config.get(key)
+    }
+    regressed = delta.get('p95_change_pct', 0.0) > max_regression
+    return delta, regressed
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark de /detect_gesture con sesiones grabadas')
+    parser.add_argument('--frames', help='Carpeta con JPEG o con una subcarpeta por sesión')
+    parser.add_argument('--capture', help='Captura de scripts/capture_tool.py')
+    parser.add_argument('--synthetic', type=int, default=0, help='Generar una sesión sintética de N frames')
+    parser.add_argument('--mode', choices=['testclient', 'http'], default='testclient')
+    parser.add_argument('--url', default='http://localhost:5000', help='Servidor para el modo http')
+    parser.add_argument('--server-pid', type=int, default=None, help='PID del servidor para medir su CPU (modo http)')
+    parser.add_argument('--students', type=int, default=10, help='Estudiantes simultáneos')
+    parser.add_argument('--fps', type=float, default=3.3, help='Frames por segundo por estudiante (el cliente web envía cada 300 ms)')
+    parser.add_argument('--duration', type=float, default=30.0, help='Segundos de reproducción')
+    parser.add_argument('--warmup', type=int, default=3, help='Frames de calentamiento por estudiante (no se miden)')
+    parser.add_argument('--output', default=None, help='Ruta del informe JSON')
+    parser.add_argument('--compare', default=None, help='Informe JSON anterior con el que comparar')
+    parser.add_argument('--max-regression', type=float, default=10.0, help='Empeoramiento máximo del p95 (%%)')
+    parser.add_argument('--strict-config', action='store_true',
+                        help='Fallar si la configuración difiere de la del informe de --compare')
+    args = parser.parse_args()
+
+    if args.frames:
+        sessions = load_sessions(args.frames)
+    elif args.capture:
+        sessions = load_capture_sessions(args.capture)
+    elif args.synthetic:
+        sessions = synthetic_session(args.synthetic)
+    else:
+        parser.error('Indique --frames, --capture o --synthetic')
+    if not sessions:
+        print(f"No hay frames en {args.frames or args.capture}")
+        return 1
+
+    if args.mode == 'testclient':
+        from app import app
+        senders = [TestClientSender(app) for _ in range(args.students)]
+        cpu_pid = None
+    else:
+        senders = [HttpSender(args.url) for _ in range(args.students)]
+        cpu_pid = args.server_pid
+
+    if not wait_until_ready(senders[0]):
+        print("El servidor no está listo (GET /readyz no devuelve 200)")
+        return 1
+
+    # Calentamiento: sesiones, detectores y primeras inferencias fuera de la medida
+    for i, sender in enumerate(senders):
+        frames = sessions[i % len(sessions)]
+        for index in range(args.warmup):
+            sender.send(frames[index % len(frames)])
+
+    records_by_student = [[] for _ in senders]
+    cpu_before = process_cpu_seconds(cpu_pid) if args.mode == 'testclient' or cpu_pid else None
+    start_at = time.perf_counter() + 0.1
+    threads = []
+    for i, sender in enumerate(senders):
+        frames = sessions[i % len(sessions)]
+        thread = threading.Thread(
+            target=run_student,
+            args=(sender, frames, args.fps, args.duration, (i * 7) % len(frames), start_at, records_by_student[i]),
+            daemon=True
+        )
+        thread.start()
+        threads.append(thread)
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - start_at
+
+    cpu_seconds = None
+    if cpu_before is not None:
+        cpu_after = process_cpu_seconds(cpu_pid)
+        cpu_seconds = cpu_after - cpu_before if cpu_after is not None else None
+
+    config = {
+        'mode': args.mode,
+        'students': args.students,
+        'fps': args.fps,
+        'duration_s': args.duration,
+        'sessions': len(sessions),
+        'source': args.frames or args.capture or f'synthetic:{args.synthetic}',
+        # Entorno del pipeline con los valores por defecto de app.py; solo aplica
+        # al modo testclient (el servidor http lee su propio entorno)
+        'recognizer_mode': os.environ.get('RECOGNIZER_MODE', 'cnn').lower(),
+        'model_backend': os.environ.get('MODEL_BACKEND', DEFAULT_BACKEND).lower(),
+        'model_variant': os.environ.get('MODEL_VARIANT', DEFAULT_VARIANT).lower(),
+        'inference_batching': os.environ.get('INFERENCE_BATCHING', '1'),
+        'inference_workers': os.environ.get('INFERENCE_WORKERS', '0'),
+        'quality_ladder': os.environ.get('QUALITY_LADDER', '1'),
+        'motion_gate': os.environ.get('MOTION_GATE', '1'),
+        'roi_tracking': os.environ.get('ROI_TRACKING', '0')
+    }
+    report = summarize(records_by_student, elapsed, cpu_seconds, config)
+
+    exit_code = 0
+    if args.compare:
+        with open(args.compare, 'r') as f:
+            baseline = json.load(f)
+        report['comparison'], regressed = compare_reports(report, baseline, args.max_regression)
+        config_changes = report['comparison']['config_changes']
+        if config_changes:
+            changes = ', '.join(f"{key}: {change['before']} -> {change['after']}"
+                                for key, change in config_changes.items())
+            print(f"Aviso: la configuración difiere de {args.compare} ({changes})")
+            if args.strict_config:
+                exit_code = 1
+        if regressed:
+            print(f"Regresión: p95 {report['comparison']['p95_change_pct']}% peor que {args.compare}")
+            exit_code = 1
+
+    print(json.dumps(report, indent=2))
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+        print(f"Informe guardado en {args.output}")
+    return exit_code
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,217 @@
+"""
+Herramienta de capturas de sesiones (src/capture_format.py).
+
+Uso:
+    # Importar una carpeta con una subcarpeta por sesión (JPEG en orden de nombre)
+    python scripts/capture_tool.py import --source data/sessions --output data/captures/clase1
+
+    # Importar un dataset etiquetado (una subcarpeta por letra) extrayendo landmarks
+    python scripts/capture_tool.py import --source dataset/holdout --output data/captures/holdout \
+        --labeled --detect
+
+    # Resumen de una captura
+    python scripts/capture_tool.py info data/captures/holdout
+
+    # Evaluar ASLAlphabetRecognizerV2 (o el de landmarks) sobre los frames etiquetados
+    python scripts/capture_tool.py evaluate data/captures/holdout --report eval.json
+
+La captura también se puede reproducir con scripts/benchmark_replay.py --capture.
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.capture_format import CaptureReader, CaptureWriter
+from src.frame_io import decode_frame, image_dimensions
+
+IMAGE_EXTENSIONS = ('.jpg', '.jpeg', '.png', '.webp')
+
+
+def list_folders(source):
+    """(nombre, [rutas de imágenes]) por subcarpeta, o la propia carpeta si tiene imágenes"""
+    def images(folder):
+        return [os.path.join(folder, f) for f in sorted(os.listdir(folder))
+                if f.lower().endswith(IMAGE_EXTENSIONS)]
+
+    folders = []
+    own = images(source)
+    if own:
+        folders.append((os.path.basename(os.path.normpath(source)), own))
+    for name in sorted(os.listdir(source)):
+        path = os.path.join(source, name)
+        if os.path.isdir(path):
+            paths = images(path)
+            if paths:
+                folders.append((name, paths))
+    return folders
+
+
+def import_folders(args):
+    detector = None
+    if args.detect:
+        from src.hand_detector import HandDetector
+        detector = HandDetector(static_image_mode=True, max_num_hands=1, min_detection_confidence=0.3)
+
+    folders = list_folders(args.source)
+    if not folders:
+        print(f"No hay imágenes en {args.source}")
+        return 1
+
+    try:
+        with CaptureWriter(args.output, chunk_bytes=args.chunk_mb * 1024 * 1024) as writer:
+            for name, paths in folders:
+                with_hand = 0
+                for i, path in enumerate(paths[:args.limit]):
+                    with open(path, 'rb') as f:
+                        frame_bytes = f.read()
+
+                    landmarks, handedness = None, None
+                    if detector is not None:
+                        analysis = detector.analyze_frame(decode_frame(frame_bytes))
+                        if analysis.primary_landmarks:
+                            landmarks = analysis.primary_landmarks
+                            handedness = analysis.handedness[0]
+                            with_hand += 1
+
+                    writer.add(
+                        frame_bytes, landmarks=landmarks, handedness=handedness,
+                        label=name if args.labeled else None,
+                        session=name, timestamp=i / args.fps
+                    )
+                detail = f", {with_hand} con mano" if detector is not None else ''
+                print(f"{name}: {len(paths[:args.limit])} frames{detail}")
+    finally:
+        if detector is not None:
+            detector.cleanup()
+
+    with CaptureReader(args.output) as reader:
+        print(json.dumps(reader.get_stats(), indent=2))
+    return 0
+
+
+def show_info(args):
+    with CaptureReader(args.capture) as reader:
+        print(json.dumps(reader.get_stats(), indent=2))
+    return 0
+
+
+def create_recognizer(args):
+    if args.recognizer == 'landmarks':
+        from src.landmark_recognizer import LandmarkAlphabetRecognizer
+        return LandmarkAlphabetRecognizer(model_path=args.landmark_model)
+
+    from src.asl_alphabet_recognizer_v2 import ASLAlphabetRecognizerV2
+    return ASLAlphabetRecognizerV2(model_path=args.model, class_mapping_path=args.class_mapping)
+
+
+def evaluate(args):
+    """Precisión y latencia del reconocedor sobre los frames etiquetados con mano"""
+    from src.hand_detector import extract_hand_region
+
+    recognizer = create_recognizer(args)
+    if not recognizer.is_model_loaded():
+        print("Modelo no disponible")
+        return 1
+
+    with CaptureReader(args.capture) as reader:
+        labeled = np.flatnonzero((reader.labels >= 0) & (reader.handedness >= 0))
+        if args.limit:
+            labeled = labeled[:args.limit]
+        if len(labeled) == 0:
+            print("La captura no tiene frames etiquetados con landmarks (importar con --labeled --detect)")
+            return 1
+
+        correct, latencies = 0, []
+        per_class = {}
+        confusions = {}
+        for i in labeled:
+            expected = reader.label(i)
+            landmarks = reader.landmarks[i].tolist()
+
+            started_at = time.perf_counter()
+            if args.recognizer == 'landmarks':
+                # La relación de aspecto sale de la cabecera del JPEG, sin decodificarlo
+                frame_width, frame_height = image_dimensions(reader.frame_bytes(i)) or (1, 1)
+                prediction = recognizer.infer_landmarks(
+                    landmarks, top_k=3, aspect_ratio=frame_width / frame_height,
+                    handedness=reader.handedness_name(i)
+                )
+            else:
+                frame = reader.decode(i)
+                prediction = recognizer.infer(extract_hand_region(frame, landmarks), top_k=3)
+            latencies.append(time.perf_counter() - started_at)
+
+            predicted = prediction.letter if prediction else None
+            stats = per_class.setdefault(expected, {'total': 0, 'correct': 0})
+            stats['total'] += 1
+            if predicted == expected:
+                correct += 1
+                stats['correct'] += 1
+            else:
+                key = f'{expected}->{predicted}'
+                confusions[key] = confusions.get(key, 0) + 1
+
+    latencies = np.array(latencies)
+    report = {
+        'capture': args.capture,
+        'recognizer': args.recognizer,
+        'frames': int(len(labeled)),
+        'accuracy': round(correct / len(labeled), 4),
+        'latency_ms_mean': round(float(latencies.mean()) * 1000, 3),
+        'latency_ms_p95': round(float(np.percentile(latencies, 95)) * 1000, 3),
+        'per_class_accuracy': {
+            letter: round(stats['correct'] / stats['total'], 4)
+            for letter, stats in sorted(per_class.items())
+        },
+        'top_confusions': dict(sorted(confusions.items(), key=lambda item: -item[1])[:10])
+    }
+    print(json.dumps(report, indent=2))
+    if args.report:
+        with open(args.report, 'w') as f:
+            json.dump(report, f, indent=2)
+        print(f"Informe guardado en {args.report}")
+    return 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Capturas de sesiones para benchmarks y regresión')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    import_parser = subparsers.add_parser('import', help='Crear una captura desde carpetas de imágenes')
+    import_parser.add_argument('--source', required=True, help='Carpeta con una subcarpeta por sesión o por letra')
+    import_parser.add_argument('--output', required=True, help='Carpeta de la captura')
+    import_parser.add_argument('--labeled', action='store_true', help='El nombre de cada subcarpeta es la letra')
+    import_parser.add_argument('--detect', action='store_true', help='Extraer landmarks con MediaPipe')
+    import_parser.add_argument('--fps', type=float, default=10.0, help='FPS de grabación para los timestamps')
+    import_parser.add_argument('--limit', type=int, default=None, help='Máximo de imágenes por subcarpeta')
+    import_parser.add_argument('--chunk-mb', type=int, default=64, help='Tamaño máximo de cada chunk de frames')
+
+    info_parser = subparsers.add_parser('info', help='Resumen de una captura')
+    info_parser.add_argument('capture')
+
+    eval_parser = subparsers.add_parser('evaluate', help='Evaluar el reconocedor sobre los frames etiquetados')
+    eval_parser.add_argument('capture')
+    eval_parser.add_argument('--recognizer', choices=['cnn', 'landmarks'], default='cnn')
+    eval_parser.add_argument('--model', default=os.environ.get('MODEL_PATH', 'models/asl_quick_model.h5'))
+    eval_parser.add_argument('--class-mapping', default=os.environ.get('CLASS_MAPPING_PATH', 'models/class_mapping_quick.json'))
+    eval_parser.add_argument('--landmark-model', default=os.environ.get('LANDMARK_MODEL_PATH', 'models/asl_landmark_model.npz'))
+    eval_parser.add_argument('--limit', type=int, default=None, help='Máximo de frames a evaluar')
+    eval_parser.add_argument('--report', default=None, help='Ruta del informe JSON')
+
+    args = parser.parse_args()
+    if args.command == 'import':
+        return import_folders(args)
+    if args.command == 'info':
+        return show_info(args)
+    return evaluate(args)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,138 @@
+"""
+Convierte el modelo Keras (.h5) a los artefactos de los backends alternativos
+y verifica que todos los backends producen la misma salida.
+
+Uso:
+    python scripts/convert_model.py --model models/asl_quick_model.h5
+    python scripts/convert_model.py --model models/asl_quick_model.h5 --verify
+
+Genera junto al .h5:
+    - <modelo>.tflite  (backend tflite, requiere tensorflow)
+    - <modelo>.onnx    (backend onnx, requiere tf2onnx)
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.inference_backends import BACKENDS, create_backend, resolve_artifact_path
+from src.prediction import top_k_indices
+
+
+def convert_tflite(keras_model, output_path):
+    """Exporta el modelo a TFLite float32."""
+    import tensorflow as tf
+
+    converter = tf.lite.TFLiteConverter.from_keras_model(keras_model)
+    with open(output_path, 'wb') as f:
+        f.write(converter.convert())
+    print(f"TFLite generado: {output_path}")
+
+
+def convert_onnx(keras_model, output_path, opset=13):
+    """Exporta el modelo a ONNX con lote dinámico."""
+    import tensorflow as tf
+    import tf2onnx
+
+    _, height, width, channels = keras_model.input_shape
+    spec = (tf.TensorSpec((None, height, width, channels), tf.float32, name='input'),)
+    tf2onnx.convert.from_keras(keras_model, input_signature=spec, opset=opset, output_path=output_path)
+    print(f"ONNX generado: {output_path}")
+
+
+def verify_backends(model_path, backends, samples=16, top_k=3, tolerance=1e-3, seed=0):
+    """
+    Compara cada backend con Keras sobre las mismas entradas aleatorias.
+
+    Args:
+        model_path: Ruta al .h5
+        backends: Nombres de backend a verificar
+        samples: Número de imágenes sintéticas
+        top_k: Top-k que debe coincidir
+        tolerance: Diferencia absoluta máxima permitida en probabilidades
+
+    Returns:
+        dict: Informe por backend
+    """
+    reference = create_backend('keras', model_path)
+    height, width = reference.input_size
+    rng = np.random.default_rng(seed)
+    batch = rng.random((samples, height, width, 3), dtype=np.float32)
+    expected = reference.predict(batch)
+    expected_top = [top_k_indices(p, top_k).tolist() for p in expected]
+
+    report = {}
+    for name in backends:
+        try:
+            backend = create_backend(name, model_path)
+        except Exception as e:
+            report[name] = {'ok': False, 'error': str(e)}
+            continue
+
+        backend.predict(batch[:1])  # calentar
+        start = time.perf_counter()
+        output = np.concatenate([backend.predict(batch[i:i + 1]) for i in range(samples)], axis=0)
+        latency_ms = (time.perf_counter() - start) / samples * 1000.0
+
+        max_abs_diff = float(np.max(np.abs(output - expected)))
+        top_matches = sum(
+            top_k_indices(p, top_k).tolist() == ref for p, ref in zip(output, expected_top)
+        )
+        report[name] = {
+            'ok': max_abs_diff <= tolerance and top_matches == samples,
+            'max_abs_diff': max_abs_diff,
+            'top_k_matches': f'{top_matches}/{samples}',
+            'latency_ms_per_frame': round(latency_ms, 3)
+        }
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Convierte el modelo ASL a TFLite/ONNX')
+    parser.add_argument('--model', default=os.environ.get('MODEL_PATH', 'models/asl_quick_model.h5'),
+                        help='Ruta al modelo Keras (.h5)')
+    parser.add_argument('--formats', nargs='+', default=['tflite', 'onnx'], choices=['tflite', 'onnx'],
+                        help='Artefactos a generar')
+    parser.add_argument('--verify', action='store_true',
+                        help='Verificar que todos los backends coinciden con Keras')
+    parser.add_argument('--tolerance', type=float, default=1e-3,
+                        help='Diferencia absoluta máxima en probabilidades')
+    parser.add_argument('--skip-convert', action='store_true', help='Solo verificar')
+    args = parser.parse_args()
+
+    if not os.path.exists(args.model):
+        print(f"Modelo no encontrado: {args.model}")
+        return 1
+
+    if not args.skip_convert:
+        from tensorflow.keras.models import load_model
+
+        keras_model = load_model(args.model)
+        for fmt in args.formats:
+            output_path = resolve_artifact_path(args.model, fmt)
+            try:
+                if fmt == 'tflite':
+                    convert_tflite(keras_model, output_path)
+                else:
+                    convert_onnx(keras_model, output_path)
+            except ImportError as e:
+                print(f"No se pudo generar {fmt}: {e}")
+
+    if args.verify:
+        backends = [name for name in BACKENDS if name != 'keras']
+        report = verify_backends(args.model, backends, tolerance=args.tolerance)
+        print(json.dumps(report, indent=2))
+        if not all(entry['ok'] for entry in report.values()):
+            return 1
+
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,154 @@
+"""
+Gestión del registro de versiones del modelo ASL (src/model_registry.py).
+
+Uso:
+    # Registrar el modelo entrenado (y sus .tflite/.onnx convertidos) como versión nueva
+    python scripts/manage_models.py register --model models/asl_quick_model.h5 \
+        --class-mapping models/class_mapping_quick.json --notes "dataset v3"
+
+    # Listar versiones y comprobar checksums
+    python scripts/manage_models.py list
+    python scripts/manage_models.py verify 20261017-101500
+
+    # Activar una versión en un servidor en marcha (carga en segundo plano y cambio en caliente)
+    python scripts/manage_models.py activate 20261017-101500 --url http://localhost:5000
+
+    # Volver a la versión anterior
+    python scripts/manage_models.py rollback --url http://localhost:5000
+
+Sin --url, activate y rollback solo cambian la versión que cargará el próximo arranque.
+El token de administración se lee de ADMIN_TOKEN.
+"""
+
+import argparse
+import json
+import os
+import sys
+import urllib.error
+import urllib.request
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.model_registry import ModelRegistry, RegistryError
+
+
+def probe_input_size(model_path, backend):
+    """Leer el tamaño de entrada cargando el modelo (224x224 si no se puede)"""
+    try:
+        from src.inference_backends import create_backend
+        return create_backend(backend, model_path).input_size
+    except Exception as e:
+        print(f"No se pudo leer el tamaño de entrada ({e}); se usa 224x224")
+        return (224, 224)
+
+
+def call_server(url, path, payload=None):
+    """POST a un endpoint de administración del servidor"""
+    request = urllib.request.Request(
+        url.rstrip('/') + path,
+        data=json.dumps(payload or {}).encode('utf-8'),
+        method='POST',
+        headers={'Content-Type': 'application/json', 'X-Admin-Token': os.environ.get('ADMIN_TOKEN', '')}
+    )
+    try:
+        with urllib.request.urlopen(request, timeout=30) as response:
+            body = json.loads(response.read() or b'{}')
+            status = response.status
+    except urllib.error.HTTPError as e:
+        body = json.loads(e.read() or b'{}')
+        status = e.code
+    print(json.dumps(body, indent=2))
+    return 0 if status < 400 else 1
+
+
+def register(registry, args):
+    input_size = (args.input_size, args.input_size) if args.input_size else probe_input_size(args.model, args.backend)
+    manifest = registry.register(args.model, args.class_mapping, version=args.version,
+                                 input_size=input_size, notes=args.notes)
+    print(json.dumps(manifest, indent=2))
+    return 0
+
+
+def list_versions(registry, args):
+    active = registry.active()
+    for manifest in registry.versions():
+        marker = '*' if manifest['version'] == active.get('version') else ' '
+        print(f"{marker} {manifest['version']}  {manifest['created_at'][:19]}  "
+              f"{manifest['num_classes']} clases  {manifest['input_size'][0]}x{manifest['input_size'][1]}  "
+              f"{manifest['checksum'][:12]}  {manifest.get('notes', '')}")
+    print(f"Activa: {active.get('version') or 'MODEL_PATH'}, anterior: {active.get('previous') or '-'}")
+    return 0
+
+
+def verify(registry, args):
+    registry.verify(args.version)
+    print(f"Versión {args.version} verificada")
+    return 0
+
+
+def activate(registry, args):
+    registry.manifest(args.version)
+    if args.url:
+        return call_server(args.url, '/admin/models/load', {'version': args.version})
+    active = registry.active()
+    registry.set_active(args.version, active.get('version'))
+    print(f"Versión {args.version} activa a partir del próximo arranque")
+    return 0
+
+
+def rollback(registry, args):
+    if args.url:
+        return call_server(args.url, '/admin/models/rollback')
+    active = registry.active()
+    if not active.get('previous'):
+        print("No hay versión anterior")
+        return 1
+    registry.set_active(active['previous'], active.get('version'))
+    print(f"Versión {active['previous']} activa a partir del próximo arranque")
+    return 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Registro de versiones del modelo ASL')
+    parser.add_argument('--registry', default=os.environ.get('MODEL_REGISTRY_DIR', 'models/registry'),
+                        help='Carpeta del registro')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    register_parser = subparsers.add_parser('register', help='Registrar una versión nueva')
+    register_parser.add_argument('--model', default=os.environ.get('MODEL_PATH', 'models/asl_quick_model.h5'))
+    register_parser.add_argument('--class-mapping', default=os.environ.get('CLASS_MAPPING_PATH', 'models/class_mapping_quick.json'))
+    register_parser.add_argument('--version', default=None, help='Nombre de la versión (por defecto fecha y hora)')
+    register_parser.add_argument('--input-size', type=int, default=None, help='Lado de entrada (si no, se lee del modelo)')
+    register_parser.add_argument('--backend', default='keras', help='Backend para leer el tamaño de entrada')
+    register_parser.add_argument('--notes', default='', help='Descripción de la versión')
+
+    subparsers.add_parser('list', help='Listar versiones')
+
+    verify_parser = subparsers.add_parser('verify', help='Comprobar checksums de una versión')
+    verify_parser.add_argument('version')
+
+    activate_parser = subparsers.add_parser('activate', help='Activar una versión')
+    activate_parser.add_argument('version')
+    activate_parser.add_argument('--url', default=None, help='Servidor en marcha (http://localhost:5000)')
+
+    rollback_parser = subparsers.add_parser('rollback', help='Volver a la versión anterior')
+    rollback_parser.add_argument('--url', default=None, help='Servidor en marcha (http://localhost:5000)')
+
+    args = parser.parse_args()
+    registry = ModelRegistry(args.registry)
+    commands = {
+        'register': register,
+        'list': list_versions,
+        'verify': verify,
+        'activate': activate,
+        'rollback': rollback
+    }
+    try:
+        return commands[args.command](registry, args)
+    except RegistryError as e:
+        print(f"Error: {e}")
+        return 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,252 @@
+"""
+Cuantización post-entrenamiento del modelo ASL e informe de precisión vs latencia.
+
+Uso:
+    python scripts/quantize_model.py \
+        --model models/asl_quick_model.h5 \
+        --calibration-dir data/calibration \
+        --eval-dir data/holdout \
+        --report models/quantization_report.json
+
+Genera junto al .h5:
+    - <modelo>.tflite          (float32 sin optimizar, base de la latencia; si no existe)
+    - <modelo>.float16.tflite  (pesos float16, entrada/salida float32)
+    - <modelo>.int8.tflite     (int8 completo, calibrado con recortes de mano)
+
+El directorio de evaluación tiene una subcarpeta por letra (A/, B/, ...) con
+recortes de mano. El informe compara cada variante con el TFLite float32 (latencia)
+y con el modelo Keras (precisión y concordancia de predicciones).
+Para servir una variante: MODEL_BACKEND=tflite MODEL_VARIANT=int8
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+
+import cv2
+import numpy as np
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.inference_backends import create_backend, resolve_artifact_path
+from src.prediction import top_k_indices
+
+IMAGE_EXTENSIONS = ('.jpg', '.jpeg', '.png', '.bmp', '.webp')
+
+
+def list_images(directory):
+    """Lista recursiva de imágenes de un directorio, en orden estable."""
+    paths = []
+    for root, _, files in os.walk(directory):
+        for name in sorted(files):
+            if name.lower().endswith(IMAGE_EXTENSIONS):
+                paths.append(os.path.join(root, name))
+    return sorted(paths)
+
+
+def load_image(path, input_size):
+    """
+    Carga un recorte con el mismo preprocesado que ASLAlphabetRecognizerV2.
+
+    Returns:
+        numpy array: (alto, ancho, 3) float32 en 0-1, o None si no se puede leer
+    """
+    image = cv2.imread(path)
+    if image is None:
+        return None
+    height, width = input_size
+    return cv2.resize(image, (width, height)).astype(np.float32) / 255.0
+
+
+def representative_dataset(paths, input_size):
+    """Generador de calibración para el conversor TFLite."""
+    def generator():
+        for path in paths:
+            image = load_image(path, input_size)
+            if image is not None:
+                yield [image[np.newaxis, ...]]
+    return generator
+
+
+def quantize(keras_model, model_path, calibration_paths, variants):
+    """
+    Genera las variantes cuantizadas.
+
+    Args:
+        keras_model: Modelo Keras cargado
+        model_path: Ruta al .h5 (para nombrar los artefactos)
+        calibration_paths: Imágenes de calibración para int8
+        variants: Variantes a generar (float32, float16, int8)
+
+    Returns:
+        dict: Ruta generada por variante
+    """
+    import tensorflow as tf
+
+    input_size = tuple(keras_model.input_shape[1:3])
+    outputs = {}
+    for variant in variants:
+        converter = tf.lite.TFLiteConverter.from_keras_model(keras_model)
+        if variant != 'float32':
+            converter.optimizations = [tf.lite.Optimize.DEFAULT]
+
+        if variant == 'float16':
+            converter.target_spec.supported_types = [tf.float16]
+        elif variant == 'int8':
+            if not calibration_paths:
+                print("Se omite int8: no hay imágenes de calibración")
+                continue
+            converter.representative_dataset = representative_dataset(calibration_paths, input_size)
+            converter.target_spec.supported_ops = [tf.lite.OpsSet.TFLITE_BUILTINS_INT8]
+            converter.inference_input_type = tf.int8
+            converter.inference_output_type = tf.int8
+
+        output_path = resolve_artifact_path(model_path, 'tflite', variant)
+        with open(output_path, 'wb') as f:
+            f.write(converter.convert())
+        outputs[variant] = output_path
+        print(f"Variante {variant} generada: {output_path}")
+    return outputs
+
+
+def load_eval_set(eval_dir, class_names, input_size, limit=None):
+    """
+    Carga el conjunto de evaluación etiquetado por subcarpeta.
+
+    Returns:
+        tuple: (imágenes (N, alto, ancho, 3), etiquetas (N,))
+    """
+    class_index = {name: i for i, name in enumerate(class_names)}
+    images, labels = [], []
+    for label in sorted(os.listdir(eval_dir)):
+        label_dir = os.path.join(eval_dir, label)
+        if not os.path.isdir(label_dir) or label not in class_index:
+            continue
+        for path in list_images(label_dir)[:limit]:
+            image = load_image(path, input_size)
+            if image is not None:
+                images.append(image)
+                labels.append(class_index[label])
+    if not images:
+        return np.empty((0,) + tuple(input_size) + (3,), np.float32), np.empty(0, np.int64)
+    return np.stack(images), np.array(labels)
+
+
+def evaluate_backend(backend, images, labels, reference=None, top_k=3):
+    """
+    Mide precisión y latencia de un backend con lotes de 1 (como en producción).
+
+    Returns:
+        tuple: (informe, probabilidades)
+    """
+    backend.predict(images[:1])  # calentar
+    outputs = []
+    latencies = []
+    for i in range(len(images)):
+        start = time.perf_counter()
+        outputs.append(backend.predict(images[i:i + 1])[0])
+        latencies.append((time.perf_counter() - start) * 1000.0)
+    probabilities = np.stack(outputs)
+
+    predicted = probabilities.argmax(axis=1)
+    top = np.array([top_k_indices(p, top_k) for p in probabilities])
+    report = {
+        'artifact': backend.model_path,
+        'size_mb': round(os.path.getsize(backend.model_path) / (1024 * 1024), 3),
+        'top1_accuracy': float(np.mean(predicted == labels)),
+        f'top{top_k}_accuracy': float(np.mean([label in row for label, row in zip(labels, top)])),
+        'latency_ms_p50': float(np.percentile(latencies, 50)),
+        'latency_ms_p95': float(np.percentile(latencies, 95)),
+        'latency_ms_mean': float(np.mean(latencies))
+    }
+    if reference is not None:
+        report['agreement_with_float32'] = float(np.mean(predicted == reference.argmax(axis=1)))
+        report['max_abs_prob_diff'] = float(np.max(np.abs(probabilities - reference)))
+    return report, probabilities
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Cuantiza el modelo ASL (float16 / int8)')
+    parser.add_argument('--model', default=os.environ.get('MODEL_PATH', 'models/asl_quick_model.h5'))
+    parser.add_argument('--class-mapping', default=os.environ.get('CLASS_MAPPING_PATH', 'models/class_mapping_quick.json'))
+    parser.add_argument('--calibration-dir', help='Recortes de mano para calibrar int8')
+    parser.add_argument('--num-calibration', type=int, default=200, help='Máximo de imágenes de calibración')
+    parser.add_argument('--eval-dir', help='Conjunto de evaluación (una subcarpeta por letra)')
+    parser.add_argument('--eval-limit', type=int, default=None, help='Máximo de imágenes por letra')
+    parser.add_argument('--variants', nargs='+', default=['float16', 'int8'], choices=['float16', 'int8'])
+    parser.add_argument('--report', default=None, help='Ruta del informe JSON')
+    parser.add_argument('--skip-convert', action='store_true', help='Solo generar el informe')
+    args = parser.parse_args()
+
+    if not os.path.exists(args.model):
+        print(f"Modelo no encontrado: {args.model}")
+        return 1
+
+    if not args.skip_convert:
+        from tensorflow.keras.models import load_model
+
+        calibration_paths = []
+        if args.calibration_dir:
+            calibration_paths = list_images(args.calibration_dir)
+            rng = np.random.default_rng(0)
+            if len(calibration_paths) > args.num_calibration:
+                calibration_paths = sorted(rng.choice(calibration_paths, args.num_calibration, replace=False))
+        variants = list(args.variants)
+        # La latencia se compara con el mismo runtime sin cuantizar, no con Keras
+        if not os.path.exists(resolve_artifact_path(args.model, 'tflite', 'float32')):
+            variants.insert(0, 'float32')
+        quantize(load_model(args.model), args.model, calibration_paths, variants)
+
+    if not args.eval_dir:
+        return 0
+
+    with open(args.class_mapping, 'r') as f:
+        class_mapping = json.load(f)
+    class_names = [class_mapping[str(i)] for i in range(len(class_mapping))]
+
+    # Keras solo es la referencia de precisión y concordancia
+    keras_backend = create_backend('keras', args.model)
+    images, labels = load_eval_set(args.eval_dir, class_names, keras_backend.input_size, args.eval_limit)
+    if len(images) == 0:
+        print(f"No hay imágenes de evaluación en {args.eval_dir}")
+        return 1
+
+    keras_report, reference = evaluate_backend(keras_backend, images, labels)
+    report = {
+        'model': args.model,
+        'eval_images': int(len(images)),
+        'reference': keras_report,
+        'variants': {}
+    }
+
+    # La base de latencia es el TFLite float32: mismo runtime que las variantes cuantizadas
+    baseline_latency = None
+    for variant in ['float32'] + [v for v in args.variants if v != 'float32']:
+        try:
+            backend = create_backend('tflite', args.model, variant)
+        except FileNotFoundError as e:
+            report['variants'][variant] = {'error': str(e)}
+            continue
+        variant_report, _ = evaluate_backend(backend, images, labels, reference)
+        if variant == 'float32':
+            baseline_latency = variant_report['latency_ms_mean']
+        elif baseline_latency is not None:
+            variant_report['speedup_vs_float32'] = round(
+                baseline_latency / max(variant_report['latency_ms_mean'], 1e-9), 2
+            )
+        report['variants'][variant] = variant_report
+    if baseline_latency is None:
+        print("Sin TFLite float32 (ejecuta convert_model.py): no se calcula speedup_vs_float32")
+
+    print(json.dumps(report, indent=2))
+    if args.report:
+        with open(args.report, 'w') as f:
+            json.dump(report, f, indent=2)
+        print(f"Informe guardado en {args.report}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,240 @@
+"""
+Entrena el clasificador de letras basado en landmarks (motor RECOGNIZER_MODE=landmarks).
+
+Uso:
+    python scripts/train_landmark_classifier.py --dataset dataset/asl_alphabet_train
+    python scripts/train_landmark_classifier.py --dataset dataset/asl_alphabet_train --kind knn
+
+El dataset es el mismo que usa el CNN: una subcarpeta por letra con imágenes.
+Los landmarks se extraen con HandDetector (MediaPipe, modo imagen estática) y se
+guardan en una caché .npz para no repetir la extracción entre entrenamientos; la
+caché se regenera si cambian el dataset, --limit-per-class o las clases.
+"""
+
+import argparse
+import json
+import os
+import sys
+
+import cv2
+import numpy as np
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.hand_detector import HandDetector
+from src.landmark_recognizer import NUM_FEATURES, landmark_features
+
+IMAGE_EXTENSIONS = ('.jpg', '.jpeg', '.png', '.bmp', '.webp')
+
+
+def list_images(letter_dir):
+    """Imágenes de la carpeta de una letra en orden de nombre"""
+    return sorted(f for f in os.listdir(letter_dir) if f.lower().endswith(IMAGE_EXTENSIONS))
+
+
+def dataset_signature(dataset_dir, class_names, limit_per_class=None):
+    """
+    Parámetros de los que depende la caché de características
+
+    Returns:
+        dict: Ruta del dataset, límite por clase, clases y número de imágenes
+    """
+    num_files = 0
+    for letter in class_names:
+        letter_dir = os.path.join(dataset_dir, letter)
+        if os.path.isdir(letter_dir):
+            num_files += len(list_images(letter_dir)[:limit_per_class])
+    return {
+        'dataset': os.path.abspath(dataset_dir),
+        'limit_per_class': limit_per_class,
+        'class_names': list(class_names),
+        'num_files': num_files,
+        'num_features': NUM_FEATURES
+    }
+
+
+def load_cache(cache_path, signature):
+    """
+    Leer la caché de características si se generó con los mismos parámetros
+
+    Returns:
+        tuple: (características, etiquetas) o None si no existe o no coincide
+    """
+    if not os.path.exists(cache_path):
+        return None
+    with np.load(cache_path) as cached:
+        if 'signature' not in cached or json.loads(str(cached['signature'])) != signature:
+            print(f"La caché {cache_path} no corresponde al dataset actual; se regenera")
+            return None
+        return cached['features'], cached['labels']
+
+
+def extract_dataset(dataset_dir, class_names, limit_per_class=None):
+    """
+    Extrae características de landmarks de todo el dataset.
+
+    Returns:
+        tuple: (características (N, 63), etiquetas (N,))
+    """
+    detector = HandDetector(static_image_mode=True, max_num_hands=1, min_detection_confidence=0.3)
+    class_index = {name: i for i, name in enumerate(class_names)}
+    features, labels = [], []
+
+    try:
+        for letter in class_names:
+            letter_dir = os.path.join(dataset_dir, letter)
+            if not os.path.isdir(letter_dir):
+                print(f"Sin carpeta para la letra {letter}")
+                continue
+
+            files = list_images(letter_dir)
+            found = 0
+            for name in files[:limit_per_class]:
+                image = cv2.imread(os.path.join(letter_dir, name))
+                if image is None:
+                    continue
+                analysis = detector.analyze_frame(image)
+                if not analysis.primary_landmarks:
+                    continue
+                height, width = analysis.frame_shape
+                features.append(landmark_features(
+                    analysis.primary_landmarks, width / height, analysis.handedness[0]
+                ))
+                labels.append(class_index[letter])
+                found += 1
+            print(f"{letter}: {found}/{len(files[:limit_per_class])} imágenes con mano detectada")
+    finally:
+        detector.cleanup()
+
+    if not features:
+        return np.empty((0, NUM_FEATURES), np.float32), np.empty(0, np.int64)
+    return np.stack(features).astype(np.float32), np.array(labels, dtype=np.int64)
+
+
+def train_mlp(x, y, num_classes, hidden=(64,), epochs=200, batch_size=64, lr=1e-3, seed=0):
+    """
+    Entrena un MLP ReLU + softmax con Adam en NumPy.
+
+    Returns:
+        list: Capas [(W, b), ...]
+    """
+    rng = np.random.default_rng(seed)
+    sizes = [x.shape[1], *hidden, num_classes]
+    layers = [
+        [rng.normal(0, np.sqrt(2.0 / fan_in), (fan_in, fan_out)).astype(np.float32),
+         np.zeros(fan_out, np.float32)]
+        for fan_in, fan_out in zip(sizes[:-1], sizes[1:])
+    ]
+    moments = [[np.zeros_like(p) for p in layer] for layer in layers]
+    velocities = [[np.zeros_like(p) for p in layer] for layer in layers]
+    beta1, beta2, eps, step = 0.9, 0.999, 1e-8, 0
+
+    for epoch in range(epochs):
+        order = rng.permutation(len(x))
+        for start in range(0, len(x), batch_size):
+            idx = order[start:start + batch_size]
+            activations = [x[idx]]
+            for W, b in layers[:-1]:
+                activations.append(np.maximum(activations[-1] @ W + b, 0.0))
+            logits = activations[-1] @ layers[-1][0] + layers[-1][1]
+            logits -= logits.max(axis=1, keepdims=True)
+            probabilities = np.exp(logits)
+            probabilities /= probabilities.sum(axis=1, keepdims=True)
+
+            grad = probabilities
+            grad[np.arange(len(idx)), y[idx]] -= 1.0
+            grad /= len(idx)
+
+            step += 1
+            for i in reversed(range(len(layers))):
+                W, b = layers[i]
+                grad_W = activations[i].T @ grad
+                grad_b = grad.sum(axis=0)
+                if i > 0:
+                    grad = (grad @ W.T) * (activations[i] > 0)
+                for j, g in enumerate((grad_W, grad_b)):
+                    moments[i][j] = beta1 * moments[i][j] + (1 - beta1) * g
+                    velocities[i][j] = beta2 * velocities[i][j] + (1 - beta2) * g * g
+                    m_hat = moments[i][j] / (1 - beta1 ** step)
+                    v_hat = velocities[i][j] / (1 - beta2 ** step)
+                    layers[i][j] -= lr * m_hat / (np.sqrt(v_hat) + eps)
+
+    return [(W, b) for W, b in layers]
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Entrena el clasificador ASL por landmarks')
+    parser.add_argument('--dataset', required=True, help='Dataset con una subcarpeta por letra')
+    parser.add_argument('--class-mapping', default=os.environ.get('CLASS_MAPPING_PATH', 'models/class_mapping_quick.json'))
+    parser.add_argument('--output', default=os.environ.get('LANDMARK_MODEL_PATH', 'models/asl_landmark_model.npz'))
+    parser.add_argument('--cache', default='data/landmark_features.npz', help='Caché de características extraídas')
+    parser.add_argument('--kind', choices=['mlp', 'knn'], default='mlp')
+    parser.add_argument('--hidden', type=int, nargs='+', default=[64])
+    parser.add_argument('--epochs', type=int, default=200)
+    parser.add_argument('--k', type=int, default=5)
+    parser.add_argument('--limit-per-class', type=int, default=None)
+    parser.add_argument('--val-split', type=float, default=0.2)
+    args = parser.parse_args()
+
+    with open(args.class_mapping, 'r') as f:
+        class_mapping = json.load(f)
+    class_names = [class_mapping[str(i)] for i in range(len(class_mapping))]
+
+    signature = dataset_signature(args.dataset, class_names, args.limit_per_class)
+    cached = load_cache(args.cache, signature)
+    if cached is not None:
+        x, y = cached
+        print(f"Características cargadas desde caché: {args.cache} ({len(x)} muestras)")
+    else:
+        x, y = extract_dataset(args.dataset, class_names, args.limit_per_class)
+        os.makedirs(os.path.dirname(args.cache) or '.', exist_ok=True)
+        np.savez_compressed(args.cache, features=x, labels=y, signature=np.array(json.dumps(signature)))
+
+    if len(x) == 0:
+        print("No se extrajeron landmarks del dataset")
+        return 1
+
+    rng = np.random.default_rng(0)
+    order = rng.permutation(len(x))
+    num_val = int(len(x) * args.val_split)
+    val_idx, train_idx = order[:num_val], order[num_val:]
+
+    mean = x[train_idx].mean(axis=0)
+    std = x[train_idx].std(axis=0) + 1e-6
+    x_train = (x[train_idx] - mean) / std
+    x_val = (x[val_idx] - mean) / std
+
+    model = {
+        'kind': np.array(args.kind),
+        'class_names': np.array(json.dumps(class_names)),
+        'mean': mean.astype(np.float32),
+        'std': std.astype(np.float32)
+    }
+
+    if args.kind == 'mlp':
+        layers = train_mlp(x_train, y[train_idx], len(class_names), tuple(args.hidden), args.epochs)
+        model['num_layers'] = np.array(len(layers))
+        for i, (W, b) in enumerate(layers):
+            model[f'W{i}'] = W
+            model[f'b{i}'] = b
+    else:
+        model['train_features'] = x_train.astype(np.float32)
+        model['train_labels'] = y[train_idx]
+        model['k'] = np.array(args.k)
+
+    os.makedirs(os.path.dirname(args.output) or '.', exist_ok=True)
+    np.savez(args.output, **model)
+    print(f"Modelo guardado en {args.output}")
+
+    if num_val:
+        from src.landmark_recognizer import LandmarkAlphabetRecognizer
+
+        recognizer = LandmarkAlphabetRecognizer(args.output)
+        predicted = recognizer.predict_features(x[val_idx]).argmax(axis=1)
+        print(f"Precisión en validación: {np.mean(predicted == y[val_idx]):.3f} ({num_val} muestras)")
+
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
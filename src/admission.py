@@ -0,0 +1,143 @@
+"""
+Control de admisión de frames al pipeline de detección.
+Limita cuántos frames se procesan a la vez y cuántos esperan; bajo sobrecarga
+los frames se descartan enseguida con una sugerencia de reintento, porque un
+frame procesado tarde ya no sirve al estudiante.
+"""
+
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Dict
+
+
+class AdmissionRejected(Exception):
+    """Frame descartado por sobrecarga (cola llena o plazo vencido)"""
+
+    def __init__(self, reason: str, retry_after: float):
+        super().__init__(reason)
+        self.reason = reason
+        self.retry_after = retry_after
+
+    @property
+    def retry_after_ms(self) -> int:
+        return int(round(self.retry_after * 1000))
+
+
+class AdmissionController:
+    """
+    Cola acotada con plazo delante de la detección y el reconocimiento
+
+    - Como máximo max_concurrent frames se procesan a la vez
+    - Como máximo max_queue frames esperan turno; si la cola está llena el
+      frame se rechaza sin esperar (reason 'queue_full')
+    - Un frame que espera más de deadline_ms se descarta (reason 'deadline')
+    - El tiempo de reintento sugerido se estima con la media móvil del tiempo
+      de servicio y el trabajo pendiente
+    """
+
+    def __init__(self,
+                 max_concurrent: int = 4,
+                 max_queue: int = 16,
+                 deadline_ms: float = 500.0,
+                 min_retry_ms: float = 100.0,
+                 max_retry_ms: float = 5000.0):
+        """
+        Args:
+            max_concurrent: Frames procesándose a la vez
+            max_queue: Frames esperando turno como máximo
+            deadline_ms: Espera máxima en cola antes de descartar el frame
+            min_retry_ms: Reintento sugerido mínimo
+            max_retry_ms: Reintento sugerido máximo
+        """
+        self.max_concurrent = max(1, int(max_concurrent))
+        self.max_queue = max(0, int(max_queue))
+        self.deadline = max(0.0, float(deadline_ms)) / 1000.0
+        self.min_retry = float(min_retry_ms) / 1000.0
+        self.max_retry = float(max_retry_ms) / 1000.0
+
+        self._cond = threading.Condition()
+        self.in_flight = 0
+        self.queue_depth = 0
+
+        # Estadísticas
+        self.admitted = 0
+        self.shed_queue_full = 0
+        self.shed_deadline = 0
+        self.max_queue_depth = 0
+        self.total_queue_wait = 0.0
+        self.service_time_ema = None
+
+    def retry_after(self) -> float:
+        """Segundos sugeridos antes de reenviar (se llama con el lock tomado)"""
+        service_time = self.service_time_ema if self.service_time_ema is not None else 0.1
+        pending = self.in_flight + self.queue_depth + 1
+        estimate = service_time * pending / self.max_concurrent
+        return min(self.max_retry, max(self.min_retry, estimate))
+
+    @contextmanager
+    def admit(self):
+        """
+        Reservar un turno de procesamiento para un frame
+
+        Raises:
+            AdmissionRejected: Si la cola está llena o el frame no obtiene
+                turno antes del plazo
+        """
+        with self._cond:
+            if self.in_flight >= self.max_concurrent:
+                if self.queue_depth >= self.max_queue:
+                    self.shed_queue_full += 1
+                    raise AdmissionRejected('queue_full', self.retry_after())
+
+                enqueued_at = time.monotonic()
+                expires_at = enqueued_at + self.deadline
+                self.queue_depth += 1
+                self.max_queue_depth = max(self.max_queue_depth, self.queue_depth)
+                try:
+                    while self.in_flight >= self.max_concurrent:
+                        remaining = expires_at - time.monotonic()
+                        if remaining <= 0:
+                            self.shed_deadline += 1
+                            raise AdmissionRejected('deadline', self.retry_after())
+                        self._cond.wait(remaining)
+                finally:
+                    self.queue_depth -= 1
+                self.total_queue_wait += time.monotonic() - enqueued_at
+
+            self.in_flight += 1
+            self.admitted += 1
+
+        started_at = time.monotonic()
+        try:
+            yield
+        finally:
+            service_time = time.monotonic() - started_at
+            with self._cond:
+                self.in_flight -= 1
+                if self.service_time_ema is None:
+                    self.service_time_ema = service_time
+                else:
+                    self.service_time_ema = 0.8 * self.service_time_ema + 0.2 * service_time
+                self._cond.notify()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Profundidad de la cola, frames admitidos y descartados"""
+        with self._cond:
+            shed = self.shed_queue_full + self.shed_deadline
+            offered = self.admitted + shed
+            return {
+                'max_concurrent': self.max_concurrent,
+                'max_queue': self.max_queue,
+                'deadline_ms': int(self.deadline * 1000),
+                'in_flight': self.in_flight,
+                'queue_depth': self.queue_depth,
+                'max_queue_depth': self.max_queue_depth,
+                'admitted': self.admitted,
+                'shed_queue_full': self.shed_queue_full,
+                'shed_deadline': self.shed_deadline,
+                'shed_ratio': round(shed / offered, 4) if offered else 0.0,
+                'avg_queue_wait_ms': round(self.total_queue_wait / self.admitted * 1000, 2) if self.admitted else 0.0,
+                'avg_service_ms': round(self.service_time_ema * 1000, 2) if self.service_time_ema is not None else None,
+                'suggested_retry_ms': int(round(self.retry_after() * 1000))
+            }
@@ -8,6 +8,8 @@ import tensorflow as tf
 from tensorflow.keras.models import load_model
 import os
 
+from src.prediction import build_prediction
+
 class ASLAlphabetRecognizer:
     def __init__(self, model_path='dataset/ResNet50V2-ASL.h5'):
         """
@@ -64,43 +66,50 @@ class ASLAlphabetRecognizer:
     
 
     
-    def predict(self, image, landmarks=None):
+    def infer(self, image, top_k=3):
         """
-        Predice la letra ASL en la imagen - VERSIÓN SIMPLE.
+        Ejecuta una sola inferencia y devuelve el registro completo.
         
         Args:
             image: Imagen de entrada
-            landmarks: Landmarks de la mano (no usado en versión simple)
+            top_k (int): Número de predicciones a conservar
             
         Returns:
-            tuple: (letra_predicha, confianza)
+            PredictionResult o None si el modelo no está disponible o falla
         """
         if self.model is None:
-            return None, 0.0
+            return None
         
         try:
-            # Preprocesar imagen
             processed_image = self.preprocess_image(image)
-            
-            # Realizar predicción
             predictions = self.model.predict(processed_image, verbose=0)
             
-            # Obtener la clase con mayor probabilidad
-            predicted_class = np.argmax(predictions[0])
-            confidence = float(predictions[0][predicted_class])
-            predicted_letter = self.class_names[predicted_class]
+            # Validar que tenemos predicciones
+            if len(predictions) == 0 or len(predictions[0]) == 0:
+                return None
             
-            # Solo devolver si la confianza es suficiente
-            if confidence >= self.min_confidence_threshold:
-                return predicted_letter, confidence
-            else:
-                return None, confidence
+            return build_prediction(predictions[0], self.class_names,
+                                    self.min_confidence_threshold, top_k)
             
         except Exception as e:
             print(f"Error en predicción: {e}")
-            return None, 0.0
+            return None
     
-
+    def predict(self, image, landmarks=None):
+        """
+        Predice la letra ASL en la imagen - VERSIÓN SIMPLE.
+        
+        Args:
+            image: Imagen de entrada
+            landmarks: Landmarks de la mano (no usado en versión simple)
+            
+        Returns:
+            tuple: (letra_predicha, confianza)
+        """
+        result = self.infer(image)
+        if result is None:
+            return None, 0.0
+        return result.as_tuple()
     
     def get_top_predictions(self, image, top_k=3):
         """
@@ -113,35 +122,10 @@ class ASLAlphabetRecognizer:
         Returns:
             list: Lista de tuplas (letra, confianza)
         """
-        if self.model is None:
-            return []
-        
-        try:
-            processed_image = self.preprocess_image(image)
-            predictions = self.model.predict(processed_image, verbose=0)
-            
-            # Validar que tenemos predicciones
-            if len(predictions) == 0 or len(predictions[0]) == 0:
-                return []
-            
-            # Asegurar que top_k no sea mayor que el número de clases
-            top_k = min(top_k, len(predictions[0]), len(self.class_names))
-            
-            # Obtener índices de las top-k predicciones
-            top_indices = np.argsort(predictions[0])[-top_k:][::-1]
-            
-            results = []
-            for idx in top_indices:
-                if idx < len(self.class_names):  # Validación adicional
-                    letter = self.class_names[idx]
-                    confidence = float(predictions[0][idx])
-                    results.append((letter, confidence))
-            
-            return results
-            
-        except Exception as e:
-            print(f"Error en predicciones múltiples: {e}")
+        result = self.infer(image, top_k=top_k)
+        if result is None:
             return []
+        return result.top(top_k)
     
     def get_stability_info(self):
         """Información simple de estabilidad."""
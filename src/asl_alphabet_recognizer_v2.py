@@ -4,39 +4,61 @@ Reconocedor ASL actualizado para usar el modelo entrenado con nuestro dataset.
 
 import cv2
 import numpy as np
-import tensorflow as tf
-from tensorflow.keras.models import load_model
 import json
 import os
 
+from src.inference_backends import DEFAULT_BACKEND, DEFAULT_VARIANT, create_backend
+from src.metrics import stage_timer
+from src.prediction import build_prediction
+from src.temporal_stability import TemporalStabilityEngine
+
 class ASLAlphabetRecognizerV2:
     def __init__(self, model_path='models/asl_quick_model.h5', 
-                 class_mapping_path='models/class_mapping_quick.json'):
+                 class_mapping_path='models/class_mapping_quick.json',
+                 backend=None, variant=None):
         """
         Inicializa el reconocedor ASL v2.
         
         Args:
             model_path: Ruta al modelo entrenado
             class_mapping_path: Ruta al mapeo de clases
+            backend: Backend de inferencia (keras, keras_direct, tflite, onnx).
+                Por defecto se lee de la variable de entorno MODEL_BACKEND.
+            variant: Precisión del modelo (float32, float16, int8).
+                Por defecto se lee de la variable de entorno MODEL_VARIANT.
         """
         self.model_path = model_path
         self.class_mapping_path = class_mapping_path
+        self.backend_name = (backend or os.environ.get('MODEL_BACKEND', DEFAULT_BACKEND)).lower()
+        self.variant = (variant or os.environ.get('MODEL_VARIANT', DEFAULT_VARIANT)).lower()
+        # Backend de inferencia cargado (expone predict sobre lotes)
         self.model = None
+        self.input_size = (224, 224)
         self.class_names = []
         self.min_confidence = 0.6
+        # Estabilidad de las predicciones de predict() (el servidor usa una por stream)
+        self.stability = TemporalStabilityEngine()
         
         self.load_model_and_classes()
     
     def load_model_and_classes(self):
         """Carga el modelo y el mapeo de clases."""
         try:
-            # Cargar modelo
-            if os.path.exists(self.model_path):
-                self.model = load_model(self.model_path)
-                print(f"Modelo cargado: {self.model_path}")
-            else:
-                print(f"Modelo no encontrado: {self.model_path}")
-                return
+            # Cargar modelo con el backend configurado
+            try:
+                self.model = create_backend(self.backend_name, self.model_path, self.variant)
+            except (ValueError, FileNotFoundError) as e:
+                is_default = self.backend_name == DEFAULT_BACKEND and self.variant == DEFAULT_VARIANT
+                if is_default or not os.path.exists(self.model_path):
+                    print(f"Modelo no encontrado: {self.model_path} ({e})")
+                    return
+                print(f"{e}. Usando backend '{DEFAULT_BACKEND}' ({DEFAULT_VARIANT})")
+                self.backend_name = DEFAULT_BACKEND
+                self.variant = DEFAULT_VARIANT
+                self.model = create_backend(self.backend_name, self.model_path)
+            
+            self.input_size = self.model.input_size
+            print(f"Modelo cargado: {self.model.model_path} (backend: {self.backend_name}, {self.variant})")
             
             # Cargar mapeo de clases
             if os.path.exists(self.class_mapping_path):
@@ -62,56 +84,98 @@ class ASLAlphabetRecognizerV2:
         Returns:
             numpy array: Imagen preprocesada
         """
-        # Redimensionar a 224x224 (tamaño del modelo)
-        image_resized = cv2.resize(image, (224, 224))
+        # Redimensionar al tamaño de entrada del modelo (224x224)
+        with stage_timer('preprocess'):
+            height, width = self.input_size
+            image_resized = cv2.resize(image, (width, height))
+            
+            # Normalizar
+            image_normalized = image_resized.astype(np.float32) / 255.0
+            
+            # Expandir dimensiones
+            image_batch = np.expand_dims(image_normalized, axis=0)
         
-        # Normalizar
-        image_normalized = image_resized.astype(np.float32) / 255.0
+        return image_batch
+    
+    def predict_batch(self, image_batch):
+        """
+        Ejecuta el modelo sobre un lote ya preprocesado.
         
-        # Expandir dimensiones
-        image_batch = np.expand_dims(image_normalized, axis=0)
+        Args:
+            image_batch: Array (N, 224, 224, 3) float32
+            
+        Returns:
+            numpy array: Probabilidades (N, num_clases)
+        """
+        with stage_timer('cnn'):
+            return np.asarray(self.model.predict(image_batch))
+    
+    def make_result(self, probabilities, top_k=3):
+        """
+        Construye el registro de predicción para un vector de probabilidades.
         
-        return image_batch
+        Args:
+            probabilities: Vector de probabilidades de una imagen
+            top_k: Número de predicciones a conservar
+            
+        Returns:
+            PredictionResult
+        """
+        with stage_timer('top_k'):
+            return build_prediction(probabilities, self.class_names, self.min_confidence, top_k)
     
-    def predict(self, image, landmarks=None):
+    def infer_batch(self, images, top_k=3):
         """
-        Predice la letra ASL.
+        Ejecuta un único forward pass para varias imágenes.
         
         Args:
-            image: Imagen de entrada
-            landmarks: Landmarks de la mano (opcional, para compatibilidad)
+            images: Lista de imágenes de entrada
+            top_k: Número de predicciones a conservar por imagen
             
         Returns:
-            tuple: (letra, confianza)
+            list: PredictionResult por imagen (None en todas si falla)
         """
         if self.model is None or len(self.class_names) == 0:
-            return None, 0.0
+            return [None] * len(images)
         
         try:
-            # Preprocesar
-            processed_image = self.preprocess_image(image)
-            
-            # Predecir
-            predictions = self.model.predict(processed_image, verbose=0)
+            image_batch = np.concatenate([self.preprocess_image(image) for image in images], axis=0)
+            predictions = self.predict_batch(image_batch)
+            return [self.make_result(probabilities, top_k) for probabilities in predictions]
             
-            # Obtener mejor predicción
-            predicted_idx = np.argmax(predictions[0])
-            confidence = float(predictions[0][predicted_idx])
-            
-            if predicted_idx < len(self.class_names):
-                predicted_letter = self.class_names[predicted_idx]
-                
-                # Solo retornar si confianza es suficiente
-                if confidence >= self.min_confidence:
-                    return predicted_letter, confidence
-                else:
-                    return None, confidence
-            else:
-                return None, 0.0
-                
         except Exception as e:
             print(f"Error en predicción: {e}")
+            return [None] * len(images)
+    
+    def infer(self, image, top_k=3):
+        """
+        Ejecuta una sola inferencia y devuelve el registro completo.
+        
+        Args:
+            image: Imagen de entrada
+            top_k: Número de predicciones a conservar
+            
+        Returns:
+            PredictionResult o None si el modelo no está disponible o falla
+        """
+        return self.infer_batch([image], top_k=top_k)[0]
+    
+    def predict(self, image, landmarks=None):
+        """
+        Predice la letra ASL.
+        
+        Args:
+            image: Imagen de entrada
+            landmarks: Landmarks de la mano (opcional, para compatibilidad)
+            
+        Returns:
+            tuple: (letra, confianza)
+        """
+        result = self.infer(image)
+        if result is None:
             return None, 0.0
+        self.stability.update(result.probabilities, self.class_names)
+        return result.as_tuple()
     
     def get_top_predictions(self, image, top_k=3):
         """
@@ -124,44 +188,40 @@ class ASLAlphabetRecognizerV2:
         Returns:
             list: Lista de (letra, confianza)
         """
-        if self.model is None or len(self.class_names) == 0:
+        result = self.infer(image, top_k=top_k)
+        if result is None:
             return []
+        return result.top(top_k)
+    
+    def warmup(self, batch_sizes=(1,)):
+        """
+        Calienta el modelo con lotes sintéticos de cada tamaño que usará el servidor.
         
-        try:
-            processed_image = self.preprocess_image(image)
-            predictions = self.model.predict(processed_image, verbose=0)
-            
-            # Obtener top-k índices
-            top_k = min(top_k, len(predictions[0]), len(self.class_names))
-            top_indices = np.argsort(predictions[0])[-top_k:][::-1]
-            
-            results = []
-            for idx in top_indices:
-                if idx < len(self.class_names):
-                    letter = self.class_names[idx]
-                    confidence = float(predictions[0][idx])
-                    results.append((letter, confidence))
-            
-            return results
+        Se llama al arrancar, antes de aceptar frames, para que la primera petición
+        (y la primera de cada tamaño de lote) no pague el trazado del grafo.
+        
+        Args:
+            batch_sizes: Tamaños de lote (1 sin micro-batching, 1..max con él)
             
-        except Exception as e:
-            print(f"Error en predicciones múltiples: {e}")
-            return []
+        Returns:
+            dict: Milisegundos por tamaño de lote (vacío si el modelo no está cargado)
+        """
+        if not self.is_model_loaded():
+            return {}
+        
+        return self.model.warmup(batch_sizes)
     
     def get_available_letters(self):
         """Retorna las letras disponibles en el modelo."""
         return self.class_names.copy()
     
     def get_stability_info(self):
-        """Información de estabilidad - compatibilidad con el código existente."""
-        return {
-            'stable': True,
-            'message': 'Modelo entrenado - alta precisión'
-        }
+        """Estabilidad de las últimas predicciones de predict() (ver TemporalStabilityEngine.get_info)."""
+        return self.stability.get_info()
     
     def reset_history(self):
-        """Reinicia historial - compatibilidad con el código existente."""
-        pass
+        """Olvida las predicciones anteriores (sin mano o cambio de usuario)."""
+        self.stability.reset()
     
     def is_model_loaded(self):
         """Verifica si el modelo está cargado correctamente."""
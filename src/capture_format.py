@@ -0,0 +1,302 @@
+"""
+Formato de captura de sesiones para benchmarks y datos de regresión.
+
+Una captura es una carpeta con:
+    manifest.json       versión, clases, sesiones y lista de chunks
+    frames-00000.bin    frames codificados (JPEG/WebP) concatenados, en chunks
+    index.npy           (N, 3) int64: chunk, offset y longitud de cada frame
+    sessions.npy        (N,) int32: índice de sesión de cada frame
+    timestamps.npy      (N,) float64: segundos desde el inicio de la sesión
+    landmarks.npy       (N, 21, 3) float32: landmarks normalizados (NaN sin mano)
+    handedness.npy      (N,) int8: -1 sin mano, 0 Left, 1 Right
+    labels.npy          (N,) int16: índice en class_names o -1 sin etiqueta
+
+Los chunks y las columnas se abren con mmap: leer un frame no abre archivos
+ni copia más que los bytes de ese frame.
+"""
+
+import json
+import mmap
+import os
+from typing import Iterator, List, Optional, Sequence
+
+import numpy as np
+
+from src.frame_io import decode_frame
+
+FORMAT_VERSION = 1
+NUM_LANDMARKS = 21
+DEFAULT_CHUNK_BYTES = 64 * 1024 * 1024
+HANDEDNESS_CODES = {None: -1, 'Left': 0, 'Right': 1}
+HANDEDNESS_NAMES = {code: name for name, code in HANDEDNESS_CODES.items()}
+
+
+def _chunk_name(index):
+    return f'frames-{index:05d}.bin'
+
+
+class CaptureWriter:
+    """
+    Grabador de una captura
+
+    Uso:
+        with CaptureWriter('data/captures/clase1', class_names=letters) as writer:
+            writer.add(jpeg_bytes, landmarks=points, handedness='Right', label='A', session='alumno1')
+    """
+
+    def __init__(self, path: str, class_names: Optional[Sequence[str]] = None,
+                 chunk_bytes: int = DEFAULT_CHUNK_BYTES):
+        """
+        Args:
+            path: Carpeta de la captura (se crea; no debe contener otra captura)
+            class_names: Letras de las etiquetas (se amplía con etiquetas nuevas)
+            chunk_bytes: Tamaño máximo de cada archivo de frames
+        """
+        if os.path.exists(os.path.join(path, 'manifest.json')):
+            raise FileExistsError(f'Ya existe una captura en {path}')
+        os.makedirs(path, exist_ok=True)
+
+        self.path = path
+        self.chunk_bytes = int(chunk_bytes)
+        self.class_names: List[str] = list(class_names or [])
+        self.session_names: List[str] = []
+        self._session_frames: List[int] = []
+
+        self._chunk_index = -1
+        self._chunk_file = None
+        self._chunk_size = 0
+        self._chunk_sizes: List[int] = []
+
+        self._index: List[tuple] = []
+        self._sessions: List[int] = []
+        self._timestamps: List[float] = []
+        self._landmarks: List[np.ndarray] = []
+        self._handedness: List[int] = []
+        self._labels: List[int] = []
+        self._closed = False
+
+    def _open_chunk(self):
+        if self._chunk_file is not None:
+            self._chunk_file.close()
+            self._chunk_sizes.append(self._chunk_size)
+        self._chunk_index += 1
+        self._chunk_size = 0
+        self._chunk_file = open(os.path.join(self.path, _chunk_name(self._chunk_index)), 'wb')
+
+    def _session_index(self, session):
+        name = str(session)
+        if name not in self.session_names:
+            self.session_names.append(name)
+            self._session_frames.append(0)
+        return self.session_names.index(name)
+
+    def _label_index(self, label):
+        if label is None:
+            return -1
+        if label not in self.class_names:
+            self.class_names.append(label)
+        return self.class_names.index(label)
+
+    def add(self, frame_bytes, landmarks=None, handedness: Optional[str] = None,
+            label: Optional[str] = None, session='default', timestamp: Optional[float] = None) -> int:
+        """
+        Añadir un frame codificado con sus landmarks y etiqueta opcionales
+
+        Args:
+            frame_bytes: Imagen codificada (JPEG/WebP/PNG)
+            landmarks: 21 puntos [x, y, z] normalizados o None si no hay mano
+            handedness: 'Left', 'Right' o None
+            label: Letra del frame o None
+            session: Nombre de la sesión (estudiante o grabación)
+            timestamp: Segundos desde el inicio de la sesión
+
+        Returns:
+            int: Índice del frame en la captura
+        """
+        if self._closed:
+            raise ValueError('La captura ya está cerrada')
+        frame_bytes = bytes(frame_bytes)
+        if not frame_bytes:
+            raise ValueError('Frame vacío')
+
+        # Validar y convertir todo antes de escribir: un error no deja bytes huérfanos en el chunk
+        points = np.full((NUM_LANDMARKS, 3), np.nan, dtype=np.float32)
+        if landmarks is not None:
+            points = np.asarray(landmarks, dtype=np.float32)
+            if points.size != NUM_LANDMARKS * 3:
+                raise ValueError(f'Se esperaban {NUM_LANDMARKS} landmarks [x, y, z], no {points.shape}')
+            points = points.reshape(NUM_LANDMARKS, 3)
+        if handedness is not None and handedness not in HANDEDNESS_CODES:
+            raise ValueError(f'Lateralidad inválida: {handedness!r}')
+        if label is not None and not isinstance(label, str):
+            raise ValueError(f'Etiqueta inválida: {label!r}')
+        if timestamp is not None:
+            timestamp = float(timestamp)
+
+        if self._chunk_file is None or (self._chunk_size > 0 and
+                                        self._chunk_size + len(frame_bytes) > self.chunk_bytes):
+            self._open_chunk()
+        self._chunk_file.write(frame_bytes)
+        self._index.append((self._chunk_index, self._chunk_size, len(frame_bytes)))
+        self._chunk_size += len(frame_bytes)
+
+        session_index = self._session_index(session)
+        if timestamp is None:
+            # Sin reloj: el número de frame dentro de la sesión
+            timestamp = float(self._session_frames[session_index])
+        self._session_frames[session_index] += 1
+        self._sessions.append(session_index)
+        self._timestamps.append(timestamp)
+        self._landmarks.append(points)
+        self._handedness.append(HANDEDNESS_CODES.get(handedness, -1) if landmarks is not None else -1)
+        self._labels.append(self._label_index(label))
+        return len(self._index) - 1
+
+    def close(self):
+        """Escribir el índice, las columnas y el manifiesto"""
+        if self._closed:
+            return
+        self._closed = True
+        if self._chunk_file is not None:
+            self._chunk_file.close()
+            self._chunk_sizes.append(self._chunk_size)
+
+        count = len(self._index)
+        columns = {
+            'index': np.array(self._index, dtype=np.int64).reshape(count, 3),
+            'sessions': np.array(self._sessions, dtype=np.int32),
+            'timestamps': np.array(self._timestamps, dtype=np.float64),
+            'landmarks': (np.stack(self._landmarks) if count
+                          else np.empty((0, NUM_LANDMARKS, 3), np.float32)),
+            'handedness': np.array(self._handedness, dtype=np.int8),
+            'labels': np.array(self._labels, dtype=np.int16)
+        }
+        for name, values in columns.items():
+            np.save(os.path.join(self.path, f'{name}.npy'), values)
+
+        manifest = {
+            'version': FORMAT_VERSION,
+            'frame_count': count,
+            'class_names': self.class_names,
+            'sessions': self.session_names,
+            'chunks': [
+                {'file': _chunk_name(i), 'bytes': size}
+                for i, size in enumerate(self._chunk_sizes)
+            ]
+        }
+        # El manifiesto se escribe al final: su presencia marca la captura como completa
+        with open(os.path.join(self.path, 'manifest.json'), 'w') as f:
+            json.dump(manifest, f, indent=2)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+
+class CaptureReader:
+    """
+    Lector de una captura con acceso aleatorio o secuencial
+
+    Las columnas (landmarks, labels, ...) son arrays NumPy mapeados en memoria;
+    frame_bytes(i) devuelve una vista sobre el chunk sin copiar.
+    """
+
+    def __init__(self, path: str):
+        with open(os.path.join(path, 'manifest.json'), 'r') as f:
+            self.manifest = json.load(f)
+        if self.manifest.get('version') != FORMAT_VERSION:
+            raise ValueError(f"Versión de captura no soportada: {self.manifest.get('version')}")
+
+        self.path = path
+        self.class_names: List[str] = self.manifest['class_names']
+        self.session_names: List[str] = self.manifest['sessions']
+
+        def column(name):
+            return np.load(os.path.join(path, f'{name}.npy'), mmap_mode='r')
+
+        self.index = column('index')
+        self.sessions = column('sessions')
+        self.timestamps = column('timestamps')
+        self.landmarks = column('landmarks')
+        self.handedness = column('handedness')
+        self.labels = column('labels')
+
+        self._files = []
+        self._chunks = []
+        for chunk in self.manifest['chunks']:
+            f = open(os.path.join(path, chunk['file']), 'rb')
+            self._files.append(f)
+            self._chunks.append(memoryview(mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ))
+                                if chunk['bytes'] else memoryview(b''))
+
+    def __len__(self) -> int:
+        return int(self.manifest['frame_count'])
+
+    def frame_bytes(self, i: int) -> memoryview:
+        """Bytes codificados del frame i (vista sin copia)"""
+        chunk, offset, length = (int(v) for v in self.index[i])
+        return self._chunks[chunk][offset:offset + length]
+
+    def decode(self, i: int, max_size=None) -> np.ndarray:
+        """Frame i decodificado a BGR"""
+        return decode_frame(self.frame_bytes(i), max_size=max_size)
+
+    def has_hand(self, i: int) -> bool:
+        return self.handedness[i] >= 0
+
+    def label(self, i: int) -> Optional[str]:
+        index = int(self.labels[i])
+        return self.class_names[index] if index >= 0 else None
+
+    def handedness_name(self, i: int) -> Optional[str]:
+        return HANDEDNESS_NAMES.get(int(self.handedness[i]))
+
+    def session_indices(self, session) -> np.ndarray:
+        """Índices de los frames de una sesión (por nombre o índice), en orden de grabación"""
+        if not isinstance(session, (int, np.integer)):
+            session = self.session_names.index(str(session))
+        indices = np.flatnonzero(self.sessions == session)
+        return indices[np.argsort(self.timestamps[indices], kind='stable')]
+
+    def iter_frames(self, indices=None) -> Iterator[tuple]:
+        """Recorrer (índice, bytes del frame) en orden o para los índices indicados"""
+        for i in (range(len(self)) if indices is None else indices):
+            yield int(i), self.frame_bytes(int(i))
+
+    def get_stats(self):
+        labeled = self.labels >= 0
+        return {
+            'path': self.path,
+            'frames': len(self),
+            'sessions': len(self.session_names),
+            'chunks': len(self._chunks),
+            'encoded_bytes': int(sum(chunk['bytes'] for chunk in self.manifest['chunks'])),
+            'frames_with_hand': int(np.count_nonzero(self.handedness >= 0)),
+            'labeled_frames': int(np.count_nonzero(labeled)),
+            'class_names': self.class_names,
+            'frames_per_class': {
+                name: int(np.count_nonzero(self.labels == i)) for i, name in enumerate(self.class_names)
+            }
+        }
+
+    def close(self):
+        for chunk in self._chunks:
+            obj = chunk.obj
+            try:
+                chunk.release()
+                if isinstance(obj, mmap.mmap):
+                    obj.close()
+            except BufferError:
+                pass  # Aún hay vistas de frames en uso; el mmap se libera con ellas
+        for f in self._files:
+            f.close()
+        self._chunks = []
+        self._files = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
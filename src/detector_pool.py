@@ -0,0 +1,221 @@
+"""
+Pool de detectores de manos por sesión.
+Cada stream de cámara conserva su propio grafo de MediaPipe en modo tracking,
+con desalojo LRU y por inactividad para acotar la memoria.
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, List
+
+
+class _PoolEntry:
+    """Detector asignado a una sesión."""
+
+    __slots__ = ('detector', 'lock', 'last_used', 'in_use', 'frames')
+
+    def __init__(self, detector):
+        self.detector = detector
+        self.lock = threading.Lock()
+        self.last_used = time.monotonic()
+        self.in_use = 0
+        self.frames = 0
+
+
+class HandDetectorPool:
+    """
+    Pool acotado de HandDetector indexado por clave de sesión
+
+    - Cada sesión usa siempre el mismo detector, así el tracking de MediaPipe
+      no se rompe al intercalar frames de distintos estudiantes
+    - Un lock por detector evita llamadas concurrentes al mismo grafo
+    - Al superar max_size se desaloja el detector usado hace más tiempo
+    - Los detectores sin uso durante idle_timeout segundos se liberan
+    - prewarm() deja detectores ya inicializados para los primeros streams
+    """
+
+    def __init__(self,
+                 factory: Callable[[], Any],
+                 max_size: int = 32,
+                 idle_timeout: float = 120.0):
+        """
+        Args:
+            factory: Función que crea un HandDetector nuevo
+            max_size: Número máximo de detectores vivos
+            idle_timeout: Segundos sin uso antes de liberar un detector
+        """
+        self.factory = factory
+        self.max_size = max(1, int(max_size))
+        self.idle_timeout = float(idle_timeout)
+
+        self._entries: "OrderedDict[str, _PoolEntry]" = OrderedDict()
+        self._spares: List[Any] = []
+        self._lock = threading.Lock()
+
+        # Estadísticas
+        self.created = 0
+        self.evicted_lru = 0
+        self.evicted_idle = 0
+        self.spares_used = 0
+
+    def prewarm(self, count: int, frame_size=(640, 480)) -> List[float]:
+        """
+        Crear e inicializar detectores de reserva para los próximos streams
+
+        Args:
+            count: Número de detectores de reserva
+            frame_size: (ancho, alto) del frame sintético de calentamiento
+
+        Returns:
+            Milisegundos del calentamiento de cada detector
+        """
+        timings = []
+        for _ in range(max(0, int(count))):
+            detector = self.factory()
+            timings.append(detector.warmup(frame_size))
+            with self._lock:
+                self._spares.append(detector)
+        return timings
+
+    def _new_detector(self):
+        """Detector de reserva ya calentado o uno nuevo"""
+        with self._lock:
+            if self._spares:
+                self.spares_used += 1
+                return self._spares.pop()
+        return self.factory()
+
+    @contextmanager
+    def acquire(self, session_key: str):
+        """
+        Obtener el detector de una sesión con uso exclusivo
+
+        Args:
+            session_key: Identificador del stream (sesión de Flask)
+
+        Yields:
+            HandDetector asignado a la sesión
+        """
+        entry = self._checkout(session_key)
+        try:
+            with entry.lock:
+                entry.frames += 1
+                yield entry.detector
+        finally:
+            with self._lock:
+                entry.in_use -= 1
+                entry.last_used = time.monotonic()
+
+    def _checkout(self, session_key: str) -> _PoolEntry:
+        """Obtener o crear la entrada de la sesión y marcarla en uso"""
+        to_close: List[Any] = []
+        with self._lock:
+            to_close.extend(self._evict_idle())
+            entry = self._entries.get(session_key)
+            if entry is not None:
+                self._entries.move_to_end(session_key)
+                entry.in_use += 1
+                entry.last_used = time.monotonic()
+
+        if entry is None:
+            # Crear el grafo de MediaPipe fuera del lock para no bloquear otras sesiones
+            new_entry = _PoolEntry(self._new_detector())
+            with self._lock:
+                entry = self._entries.get(session_key)
+                if entry is None:
+                    entry = new_entry
+                    self._entries[session_key] = entry
+                    self.created += 1
+                else:
+                    # Otra petición de la misma sesión lo creó primero
+                    self._entries.move_to_end(session_key)
+                    to_close.append(new_entry.detector)
+                entry.in_use += 1
+                entry.last_used = time.monotonic()
+                to_close.extend(self._evict_lru())
+
+        self._close(to_close)
+        return entry
+
+    def _evict_idle(self) -> List[Any]:
+        """Quitar detectores inactivos (se llama con el lock tomado)"""
+        if self.idle_timeout <= 0:
+            return []
+
+        now = time.monotonic()
+        evicted = []
+        for key, entry in list(self._entries.items()):
+            if now - entry.last_used < self.idle_timeout:
+                break  # El OrderedDict está ordenado por uso
+            if entry.in_use == 0:
+                del self._entries[key]
+                evicted.append(entry.detector)
+                self.evicted_idle += 1
+        return evicted
+
+    def _evict_lru(self) -> List[Any]:
+        """Quitar los detectores menos usados hasta respetar max_size (con el lock tomado)"""
+        evicted = []
+        for key, entry in list(self._entries.items()):
+            if len(self._entries) <= self.max_size:
+                break
+            if entry.in_use == 0:
+                del self._entries[key]
+                evicted.append(entry.detector)
+                self.evicted_lru += 1
+        return evicted
+
+    def _close(self, detectors: List[Any]):
+        """Liberar recursos de detectores desalojados"""
+        for detector in detectors:
+            try:
+                detector.cleanup()
+            except Exception as e:
+                print(f"Error liberando detector: {e}")
+
+    def release(self, session_key: str):
+        """
+        Liberar explícitamente el detector de una sesión (por ejemplo al cerrar sesión)
+
+        Args:
+            session_key: Identificador del stream
+        """
+        with self._lock:
+            entry = self._entries.get(session_key)
+            if entry is None or entry.in_use > 0:
+                return
+            del self._entries[session_key]
+        self._close([entry.detector])
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Estadísticas del pool
+
+        Returns:
+            Dict con tamaño, desalojos y detecciones acumuladas
+        """
+        with self._lock:
+            entries = list(self._entries.values())
+            return {
+                'active_detectors': len(entries),
+                'max_size': self.max_size,
+                'idle_timeout_s': self.idle_timeout,
+                'in_use': sum(1 for entry in entries if entry.in_use > 0),
+                'created': self.created,
+                'evicted_lru': self.evicted_lru,
+                'evicted_idle': self.evicted_idle,
+                'spare_detectors': len(self._spares),
+                'spares_used': self.spares_used,
+                'frames_processed': sum(entry.frames for entry in entries),
+                'total_detections': sum(entry.detector.detection_count for entry in entries)
+            }
+
+    def close_all(self):
+        """Liberar todos los detectores"""
+        with self._lock:
+            detectors = [entry.detector for entry in self._entries.values()] + self._spares
+            self._entries.clear()
+            self._spares = []
+        self._close(detectors)
@@ -0,0 +1,154 @@
+"""
+Decodificación de frames recibidos por los endpoints de detección.
+Soporta cuerpo binario (JPEG/WebP/PNG), multipart y el formato JSON base64 original,
+con decodificación a resolución reducida para no procesar píxeles que se descartan.
+"""
+
+import base64
+
+import cv2
+import numpy as np
+
+from src.metrics import stage_timer
+
+# Tipos de contenido aceptados como cuerpo binario de la imagen
+BINARY_IMAGE_MIMETYPES = (
+    'image/jpeg',
+    'image/jpg',
+    'image/webp',
+    'image/png',
+    'application/octet-stream'
+)
+
+PNG_SIGNATURE = b'\x89PNG\r\n\x1a\n'
+
+# Marcadores SOF de JPEG (excepto DHT 0xC4, JPG 0xC8 y DAC 0xCC)
+JPEG_SOF_MARKERS = frozenset(range(0xC0, 0xD0)) - {0xC4, 0xC8, 0xCC}
+
+# Escalas de decodificación reducida, de la más pequeña a la más grande
+REDUCED_DECODE_FLAGS = (
+    (8, cv2.IMREAD_REDUCED_COLOR_8),
+    (4, cv2.IMREAD_REDUCED_COLOR_4),
+    (2, cv2.IMREAD_REDUCED_COLOR_2)
+)
+
+
+def decode_base64_image(image_data):
+    """
+    Decodificar una imagen base64 (con o sin prefijo data:image/...;base64,)
+
+    Args:
+        image_data: Cadena base64 o data URL
+
+    Returns:
+        bytes: Imagen codificada
+    """
+    # Remover prefijo data:image si existe
+    if ',' in image_data:
+        image_data = image_data.split(',', 1)[1]
+    with stage_timer('base64_decode'):
+        return base64.b64decode(image_data)
+
+
+def image_dimensions(image_bytes):
+    """
+    Leer ancho y alto de una imagen JPEG o PNG desde su cabecera, sin decodificarla
+
+    Args:
+        image_bytes: Imagen codificada
+
+    Returns:
+        tuple: (ancho, alto) o None si el formato no se reconoce
+    """
+    data = memoryview(image_bytes)
+
+    # PNG: la cabecera IHDR va siempre al principio
+    if len(data) >= 24 and bytes(data[:8]) == PNG_SIGNATURE:
+        return int.from_bytes(data[16:20], 'big'), int.from_bytes(data[20:24], 'big')
+
+    if len(data) < 4 or data[0] != 0xFF or data[1] != 0xD8:
+        return None
+
+    # JPEG: recorrer los segmentos hasta el marcador SOF con las dimensiones
+    offset = 2
+    while offset + 9 < len(data):
+        if data[offset] != 0xFF:
+            return None
+        marker = data[offset + 1]
+        if marker == 0xFF:
+            offset += 1
+            continue
+        if marker in JPEG_SOF_MARKERS:
+            height = int.from_bytes(data[offset + 5:offset + 7], 'big')
+            width = int.from_bytes(data[offset + 7:offset + 9], 'big')
+            return width, height
+        if marker in (0xD8, 0x01) or 0xD0 <= marker <= 0xD7:
+            offset += 2
+            continue
+        offset += 2 + int.from_bytes(data[offset + 2:offset + 4], 'big')
+    return None
+
+
+def fit_size(width, height, max_size):
+    """
+    Tamaño que cabe en max_size (ancho, alto) manteniendo la relación de aspecto
+
+    Nunca amplía: si la imagen ya cabe devuelve su tamaño original.
+    """
+    max_width, max_height = max_size
+    scale = min(max_width / width, max_height / height, 1.0)
+    return max(1, int(round(width * scale))), max(1, int(round(height * scale)))
+
+
+def reduced_decode_flag(width, height, max_size):
+    """
+    Flag de cv2.imdecode que decodifica a la mayor escala 1/2, 1/4 o 1/8
+    cuyo resultado sigue siendo mayor o igual que el tamaño final
+    """
+    target_width, target_height = fit_size(width, height, max_size)
+    for factor, flag in REDUCED_DECODE_FLAGS:
+        if width // factor >= target_width and height // factor >= target_height:
+            return flag
+    return cv2.IMREAD_COLOR
+
+
+def decode_frame(image_bytes, max_size=None):
+    """
+    Decodificar bytes JPEG/WebP/PNG directamente a un array BGR de OpenCV
+
+    Con max_size, los JPEG se decodifican ya reducidos (escalado DCT de libjpeg
+    vía cv2.IMREAD_REDUCED_COLOR_*) a la potencia de dos más cercana por encima
+    del objetivo, y se termina con un resize INTER_AREA que conserva el aspecto.
+
+    Args:
+        image_bytes: Imagen codificada (bytes, bytearray o memoryview)
+        max_size: (ancho, alto) máximo del frame resultante o None para no reducir
+
+    Returns:
+        numpy array (alto, ancho, 3) uint8 en BGR
+
+    Raises:
+        ValueError: Si los bytes no son una imagen válida
+    """
+    if not image_bytes:
+        raise ValueError('Imagen vacía')
+
+    flag = cv2.IMREAD_COLOR
+    if max_size is not None:
+        dimensions = image_dimensions(image_bytes)
+        if dimensions and min(dimensions) > 0:
+            flag = reduced_decode_flag(dimensions[0], dimensions[1], max_size)
+
+    buffer = np.frombuffer(image_bytes, dtype=np.uint8)
+    with stage_timer('image_decode'):
+        frame = cv2.imdecode(buffer, flag)
+    if frame is None:
+        raise ValueError('Formato de imagen no soportado')
+
+    if max_size is not None:
+        height, width = frame.shape[:2]
+        target_size = fit_size(width, height, max_size)
+        if target_size != (width, height):
+            with stage_timer('resize'):
+                frame = cv2.resize(frame, target_size, interpolation=cv2.INTER_AREA)
+    return frame
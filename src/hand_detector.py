@@ -3,18 +3,161 @@ Detector de manos usando MediaPipe
 Implementa la detección de puntos clave de las manos para el sistema de señas
 """
 
+import math
+import time
 import cv2
 import numpy as np
+from dataclasses import dataclass, field
 from typing import List, Optional, Tuple, Dict, Any
 
-# Importar MediaPipe con manejo de errores
-try:
-    import mediapipe as mp
-    MEDIAPIPE_AVAILABLE = True
-except ImportError as e:
-    print(f"⚠️ MediaPipe no disponible: {e}")
-    MEDIAPIPE_AVAILABLE = False
-    mp = None
+from src.metrics import stage_timer
+
+# MediaPipe se importa al crear el primer detector: importarlo tarda varios
+# segundos y las páginas que no detectan manos no deben esperarlo
+mp = None
+MEDIAPIPE_AVAILABLE = None  # None: todavía no se ha intentado importar
+
+
+def load_mediapipe() -> bool:
+    """Importar MediaPipe la primera vez que se necesita (con manejo de errores)"""
+    global mp, MEDIAPIPE_AVAILABLE
+    if MEDIAPIPE_AVAILABLE is None:
+        try:
+            import mediapipe
+            mp = mediapipe
+            MEDIAPIPE_AVAILABLE = True
+        except ImportError as e:
+            print(f"⚠️ MediaPipe no disponible: {e}")
+            MEDIAPIPE_AVAILABLE = False
+    return MEDIAPIPE_AVAILABLE
+
+
+@dataclass
+class FrameAnalysis:
+    """
+    Resultado de una única pasada de MediaPipe Hands sobre un frame
+
+    Agrupa todo lo que los endpoints necesitan de un frame para no volver
+    a ejecutar ``hands.process`` por cada dato consultado. Solo incluye las manos
+    con landmarks válidos y todas las listas tienen una entrada por mano en el
+    mismo orden.
+
+    Attributes:
+        results: Objeto results de MediaPipe (None si no hubo frame)
+        landmarks: Arrays (21, 3) float32 por mano, en coordenadas normalizadas
+        normalized_landmarks: Landmarks por mano como listas [x, y, z] acotadas a 0-1
+        handedness: Etiqueta 'Left'/'Right' por mano (None si no está disponible)
+        handedness_scores: Confianza de MediaPipe por mano (None si no está disponible)
+        bounding_boxes: Bounding box en píxeles por mano
+        frame_shape: (alto, ancho) del frame analizado
+        roi: Ventana (x0, y0, x1, y1) en píxeles procesada por MediaPipe o None si fue el frame completo
+    """
+    results: Any = None
+    landmarks: List[np.ndarray] = field(default_factory=list)
+    normalized_landmarks: List[List[List[float]]] = field(default_factory=list)
+    handedness: List[Optional[str]] = field(default_factory=list)
+    handedness_scores: List[Optional[float]] = field(default_factory=list)
+    bounding_boxes: List[Dict[str, int]] = field(default_factory=list)
+    frame_shape: Tuple[int, int] = (0, 0)
+    roi: Optional[Tuple[int, int, int, int]] = None
+
+    @property
+    def hands_detected(self) -> bool:
+        return len(self.landmarks) > 0
+
+    @property
+    def num_hands(self) -> int:
+        return len(self.landmarks)
+
+    @property
+    def primary_landmarks(self) -> Optional[List[List[float]]]:
+        """Landmarks normalizados de la primera mano o None"""
+        return self.normalized_landmarks[0] if self.normalized_landmarks else None
+
+    @property
+    def primary_bounding_box(self) -> Optional[Dict[str, int]]:
+        """Bounding box de la primera mano o None"""
+        return self.bounding_boxes[0] if self.bounding_boxes else None
+
+    @property
+    def primary_score(self) -> Optional[float]:
+        """Confianza de MediaPipe de la primera mano o None"""
+        return self.handedness_scores[0] if self.handedness_scores else None
+
+
+def landmarks_bounding_box(landmarks, width: int, height: int) -> Dict[str, int]:
+    """
+    Bounding box en píxeles de una mano a partir de sus landmarks normalizados
+    
+    Mismo cálculo que usaba /detect_gesture (coordenadas truncadas a int).
+    
+    Args:
+        landmarks: Array o lista (21, 3) con [x, y, z] normalizados
+        width: Ancho del frame en píxeles
+        height: Alto del frame en píxeles
+        
+    Returns:
+        Dict con min_x, max_x, min_y, max_y, width y height
+    """
+    points = np.asarray(landmarks, dtype=np.float32)
+    x_coords = (np.clip(points[:, 0], 0.0, 1.0) * width).astype(np.int32)
+    y_coords = (np.clip(points[:, 1], 0.0, 1.0) * height).astype(np.int32)
+    min_x, max_x = int(x_coords.min()), int(x_coords.max())
+    min_y, max_y = int(y_coords.min()), int(y_coords.max())
+    return {
+        'min_x': min_x,
+        'max_x': max_x,
+        'min_y': min_y,
+        'max_y': max_y,
+        'width': max_x - min_x,
+        'height': max_y - min_y
+    }
+
+
+def extract_hand_region(frame, landmarks):
+    """
+    Extrae la región de la mano del frame usando los landmarks.
+    
+    Args:
+        frame: Frame de la imagen
+        landmarks: Lista de landmarks de la mano
+        
+    Returns:
+        numpy array: Región recortada de la mano
+    """
+    try:
+        height, width = frame.shape[:2]
+        
+        # Convertir landmarks normalizados a coordenadas de píxeles
+        x_coords = [int(lm[0] * width) for lm in landmarks]
+        y_coords = [int(lm[1] * height) for lm in landmarks]
+        
+        # Encontrar bounding box de la mano
+        min_x, max_x = min(x_coords), max(x_coords)
+        min_y, max_y = min(y_coords), max(y_coords)
+        
+        # Agregar margen alrededor de la mano (20% extra)
+        margin_x = int((max_x - min_x) * 0.2)
+        margin_y = int((max_y - min_y) * 0.2)
+        
+        # Aplicar margen con límites del frame
+        min_x = max(0, min_x - margin_x)
+        max_x = min(width, max_x + margin_x)
+        min_y = max(0, min_y - margin_y)
+        max_y = min(height, max_y + margin_y)
+        
+        # Extraer región de la mano
+        hand_region = frame[min_y:max_y, min_x:max_x]
+        
+        # Asegurar que la región no esté vacía
+        if hand_region.size == 0:
+            return frame  # Devolver frame completo si hay error
+        
+        return hand_region
+        
+    except Exception as e:
+        print(f"Error extrayendo región de mano: {e}")
+        return frame  # Devolver frame completo si hay error
 
 
 class HandDetector:
@@ -40,7 +183,7 @@ class HandDetector:
             min_tracking_confidence: Confianza mínima para seguimiento
         """
         # Verificar disponibilidad de MediaPipe
-        if not MEDIAPIPE_AVAILABLE:
+        if not load_mediapipe():
             raise ImportError("MediaPipe no está disponible. Instale con: pip install mediapipe==0.10.3")
         
         # Inicializar MediaPipe
@@ -49,12 +192,13 @@ class HandDetector:
         self.mp_drawing_styles = mp.solutions.drawing_styles
         
         # Configurar detector de manos
-        self.hands = self.mp_hands.Hands(
-            static_image_mode=static_image_mode,
-            max_num_hands=max_num_hands,
-            min_detection_confidence=min_detection_confidence,
-            min_tracking_confidence=min_tracking_confidence
-        )
+        self._hands_options = {
+            'static_image_mode': static_image_mode,
+            'max_num_hands': max_num_hands,
+            'min_detection_confidence': min_detection_confidence,
+            'min_tracking_confidence': min_tracking_confidence
+        }
+        self.hands = self.mp_hands.Hands(**self._hands_options)
         
         # Estado interno
         self.last_detection = None
@@ -104,6 +248,37 @@ class HandDetector:
             'processed_frame': frame.copy()
         }
     
+    def warmup(self, frame_size: Tuple[int, int] = (640, 480)) -> float:
+        """
+        Procesar un frame negro para inicializar el grafo de MediaPipe
+        
+        Args:
+            frame_size: (ancho, alto) de los frames que recibirá el detector
+            
+        Returns:
+            Milisegundos de la primera llamada
+        """
+        width, height = frame_size
+        started_at = time.perf_counter()
+        self.detect_hands(np.zeros((height, width, 3), dtype=np.uint8))
+        return round((time.perf_counter() - started_at) * 1000, 2)
+    
+    def reset_tracking(self):
+        """
+        Olvidar el seguimiento de MediaPipe entre frames
+
+        En modo video MediaPipe sigue la mano a partir de su posición en la imagen
+        anterior; si la imagen pasa a ser otra región del frame (ventana de la mano
+        distinta o frame completo) ese seguimiento ya no es válido y el siguiente
+        frame debe volver a detectar la palma.
+        """
+        reset = getattr(self.hands, 'reset', None)
+        if reset is not None:
+            reset()
+        else:
+            self.hands.close()
+            self.hands = self.mp_hands.Hands(**self._hands_options)
+    
     def get_landmarks(self, frame: np.ndarray) -> Optional[List[List[float]]]:
         """
         Extraer 21 puntos clave de las manos detectadas
@@ -120,24 +295,125 @@ class HandDetector:
         if not detection_result['hands_detected']:
             return None
         
-        results = detection_result['results']
-        all_landmarks = []
+        return [hand.tolist() for hand in self._landmark_arrays(detection_result['results'])]
+    
+    def _landmark_arrays(self, results) -> List[np.ndarray]:
+        """
+        Convertir los landmarks de MediaPipe en arrays (21, 3) por mano
+        
+        Args:
+            results: Resultados de MediaPipe
+            
+        Returns:
+            Lista de arrays float32 con [x, y, z] de cada punto
+        """
+        if results is None or not results.multi_hand_landmarks:
+            return []
+        
+        return [
+            np.array([[lm.x, lm.y, lm.z] for lm in hand_landmarks.landmark], dtype=np.float32)
+            for hand_landmarks in results.multi_hand_landmarks
+        ]
+    
+    def analyze_frame(self, frame: np.ndarray,
+                      roi: Optional[Tuple[int, int, int, int]] = None,
+                      max_input_width: Optional[int] = None) -> FrameAnalysis:
+        """
+        Analizar un frame con una sola llamada a MediaPipe
+        
+        Reemplaza la secuencia detect_hands + get_normalized_landmarks +
+        get_all_normalized_landmarks, que procesaba el mismo frame varias veces.
         
-        # Extraer landmarks de cada mano detectada
-        for hand_landmarks in results.multi_hand_landmarks:
-            hand_points = []
+        Args:
+            frame: Frame de video en formato BGR (OpenCV)
+            roi: Ventana (x0, y0, x1, y1) en píxeles a procesar en lugar del frame
+                completo; los landmarks se devuelven en coordenadas del frame completo
+            max_input_width: Ancho máximo de la imagen entregada a MediaPipe; la imagen
+                (o la ventana) más ancha se reduce antes de procesarla. Los landmarks
+                son normalizados, así que no dependen de la reducción
             
-            # Extraer los 21 puntos de la mano
-            for landmark in hand_landmarks.landmark:
-                hand_points.append([
-                    landmark.x,  # Coordenada X normalizada (0-1)
-                    landmark.y,  # Coordenada Y normalizada (0-1)
-                    landmark.z   # Profundidad relativa
-                ])
+        Returns:
+            FrameAnalysis con resultados, landmarks, lateralidad y bounding boxes
+        """
+        if frame is None:
+            return FrameAnalysis()
+        
+        height, width = frame.shape[:2]
+        if roi is not None:
+            x0, y0, x1, y1 = roi
+            frame = frame[y0:y1, x0:x1]
+        if max_input_width and frame.shape[1] > max_input_width:
+            with stage_timer('input_resize'):
+                input_height = max(1, int(round(frame.shape[0] * max_input_width / frame.shape[1])))
+                frame = cv2.resize(frame, (int(max_input_width), input_height), interpolation=cv2.INTER_AREA)
+        with stage_timer('color_convert'):
+            rgb_frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+        with stage_timer('mediapipe'):
+            results = self.hands.process(rgb_frame)
+        
+        return self._build_analysis(results, (height, width), roi)
+    
+    def _build_analysis(self, results, frame_shape: Tuple[int, int],
+                        roi: Optional[Tuple[int, int, int, int]] = None) -> FrameAnalysis:
+        """
+        Construir un FrameAnalysis a partir de los resultados de MediaPipe
+        
+        Args:
+            results: Resultados de MediaPipe
+            frame_shape: (alto, ancho) del frame completo
+            roi: Ventana procesada (x0, y0, x1, y1) o None si fue el frame completo
             
-            all_landmarks.append(hand_points)
+        Returns:
+            FrameAnalysis con los datos de todas las manos detectadas
+        """
+        height, width = frame_shape
+        landmark_arrays = self._landmark_arrays(results)
+        
+        if roi is not None:
+            # Pasar de coordenadas normalizadas del recorte a las del frame completo
+            x0, y0, x1, y1 = roi
+            scale = np.array([(x1 - x0) / width, (y1 - y0) / height, (x1 - x0) / width], dtype=np.float32)
+            offset = np.array([x0 / width, y0 / height, 0.0], dtype=np.float32)
+            landmark_arrays = [hand * scale + offset for hand in landmark_arrays]
         
-        return all_landmarks
+        if landmark_arrays:
+            self.detection_count += 1
+            self.last_detection = results
+        
+        # Las manos con landmarks inválidos se descartan de todas las listas a la vez
+        # para que el índice de cada mano coincida en landmarks, lateralidad y bounding box
+        valid_arrays = []
+        normalized_landmarks = []
+        handedness = []
+        handedness_scores = []
+        bounding_boxes = []
+        multi_handedness = getattr(results, 'multi_handedness', None) or []
+        for i, hand in enumerate(landmark_arrays):
+            normalized = self.normalize_landmarks(hand.tolist())
+            if normalized is None:
+                continue
+            
+            label = None
+            score = None
+            if i < len(multi_handedness) and multi_handedness[i].classification:
+                label = multi_handedness[i].classification[0].label
+                score = getattr(multi_handedness[i].classification[0], 'score', None)
+            valid_arrays.append(hand)
+            normalized_landmarks.append(normalized)
+            handedness.append(label)
+            handedness_scores.append(score)
+            bounding_boxes.append(landmarks_bounding_box(hand, width, height))
+        
+        return FrameAnalysis(
+            results=results,
+            landmarks=valid_arrays,
+            normalized_landmarks=normalized_landmarks,
+            handedness=handedness,
+            handedness_scores=handedness_scores,
+            bounding_boxes=bounding_boxes,
+            frame_shape=(height, width),
+            roi=roi
+        )
     
     def draw_landmarks(self, frame: np.ndarray, results) -> np.ndarray:
         """
@@ -163,7 +439,8 @@ class HandDetector:
         
         return frame
     
-    def normalize_landmarks(self, landmarks: List[List[float]]) -> Optional[List[List[float]]]:
+    @staticmethod
+    def normalize_landmarks(landmarks: List[List[float]]) -> Optional[List[List[float]]]:
         """
         Normalizar landmarks para coordenadas 0-1 y manejar casos sin detección
         
@@ -263,7 +540,8 @@ class HandDetector:
         # Normalizar todas las manos detectadas
         return self.normalize_multiple_hands(raw_landmarks)
     
-    def validate_landmarks(self, landmarks: List[List[float]]) -> bool:
+    @staticmethod
+    def validate_landmarks(landmarks: List[List[float]]) -> bool:
         """
         Validar que los landmarks tienen el formato correcto
         
@@ -285,10 +563,11 @@ class HandDetector:
             if not isinstance(point, (list, tuple)) or len(point) != 3:
                 return False
             
-            # Verificar que son números válidos
+            # Verificar que son números válidos (sin NaN ni infinitos)
             try:
                 x, y, z = point
-                float(x), float(y), float(z)
+                if not all(math.isfinite(float(value)) for value in (x, y, z)):
+                    return False
             except (ValueError, TypeError):
                 return False
         
@@ -0,0 +1,330 @@
+"""
+Backends de inferencia para el reconocedor ASL.
+Permiten ejecutar el mismo modelo con Keras, una llamada compilada con tf.function,
+TFLite (XNNPACK) u ONNX Runtime y elegir el más rápido en cada máquina.
+"""
+
+import os
+import threading
+import time
+
+import numpy as np
+
+DEFAULT_BACKEND = 'keras'
+
+# Extensión del artefacto que usa cada backend
+BACKEND_EXTENSIONS = {
+    'keras': '.h5',
+    'keras_direct': '.h5',
+    'tflite': '.tflite',
+    'onnx': '.onnx'
+}
+
+
+# Variantes de precisión generadas por scripts/quantize_model.py (solo TFLite)
+MODEL_VARIANTS = ('float32', 'float16', 'int8')
+DEFAULT_VARIANT = 'float32'
+
+
+def resolve_artifact_path(model_path, backend_name, variant=None):
+    """
+    Obtiene la ruta del artefacto para un backend a partir de MODEL_PATH.
+
+    Si MODEL_PATH no tiene la extensión del backend se busca el archivo hermano
+    generado por scripts/convert_model.py (por ejemplo models/asl_quick_model.tflite).
+    Las variantes cuantizadas añaden un sufijo: models/asl_quick_model.int8.tflite,
+    también cuando MODEL_PATH ya apunta al .tflite float32.
+
+    Args:
+        model_path: Ruta configurada del modelo
+        backend_name: Nombre del backend
+        variant: Variante de precisión (float32, float16, int8)
+
+    Returns:
+        str: Ruta del artefacto
+
+    Raises:
+        ValueError: Si MODEL_PATH ya es el artefacto de otra variante cuantizada
+    """
+    extension = BACKEND_EXTENSIONS.get(backend_name, '.h5')
+    base, current_extension = os.path.splitext(model_path)
+    if current_extension != extension:
+        if variant and variant != DEFAULT_VARIANT:
+            return f'{base}.{variant}{extension}'
+        return base + extension
+
+    if not variant or variant == DEFAULT_VARIANT:
+        return model_path
+    stem, current_variant = os.path.splitext(base)
+    current_variant = current_variant.lstrip('.')
+    if current_variant == variant:
+        return model_path
+    if current_variant in MODEL_VARIANTS:
+        raise ValueError(
+            f"MODEL_PATH es la variante '{current_variant}' ({model_path}) pero MODEL_VARIANT es '{variant}'"
+        )
+    return f'{base}.{variant}{extension}'
+
+
+class InferenceBackend:
+    """
+    Interfaz común de los backends.
+
+    Cada backend carga su artefacto y expone predict(batch) que recibe un
+    array (N, alto, ancho, 3) float32 y devuelve probabilidades (N, clases).
+    """
+
+    name = 'base'
+    variant = DEFAULT_VARIANT
+
+    def __init__(self, model_path):
+        self.model_path = model_path
+        self.input_size = (224, 224)
+
+    def predict(self, image_batch):
+        raise NotImplementedError
+
+    def warmup(self, batch_sizes=(1,)):
+        """
+        Ejecuta lotes sintéticos de cada tamaño antes de la primera petición.
+
+        El trazado del grafo (Keras), la reserva de tensores (TFLite) y la
+        inicialización de la sesión (ONNX) ocurren en la primera llamada con
+        cada forma de entrada; aquí se pagan al arrancar.
+
+        Args:
+            batch_sizes: Tamaños de lote que usará el servidor
+
+        Returns:
+            dict: Milisegundos de la llamada de cada tamaño de lote
+        """
+        height, width = self.input_size
+        timings = {}
+        for batch_size in sorted({int(size) for size in batch_sizes if int(size) > 0}):
+            started_at = time.perf_counter()
+            self.predict(np.zeros((batch_size, height, width, 3), dtype=np.float32))
+            timings[batch_size] = round((time.perf_counter() - started_at) * 1000, 2)
+        return timings
+
+    def describe(self):
+        """Información del backend para /status."""
+        return {
+            'backend': self.name,
+            'variant': self.variant,
+            'artifact': self.model_path,
+            'input_size': list(self.input_size)
+        }
+
+
+class KerasBackend(InferenceBackend):
+    """Backend original: tensorflow.keras load_model + model.predict."""
+
+    name = 'keras'
+
+    def __init__(self, model_path):
+        super().__init__(model_path)
+        from tensorflow.keras.models import load_model
+
+        self.model = load_model(model_path)
+        self.input_size = _keras_input_size(self.model)
+
+    def predict(self, image_batch):
+        return np.asarray(self.model.predict(image_batch, verbose=0))
+
+
+class KerasDirectBackend(KerasBackend):
+    """
+    Llamada directa al modelo compilada con tf.function.
+
+    Evita la sobrecarga por llamada de model.predict (creación del
+    data adapter, callbacks y bucle de pasos) que domina con lotes pequeños.
+    """
+
+    name = 'keras_direct'
+
+    def __init__(self, model_path):
+        super().__init__(model_path)
+        import tensorflow as tf
+
+        height, width = self.input_size
+        self._call = tf.function(
+            lambda batch: self.model(batch, training=False),
+            input_signature=[tf.TensorSpec([None, height, width, 3], tf.float32)]
+        )
+
+    def predict(self, image_batch):
+        return self._call(np.asarray(image_batch, dtype=np.float32)).numpy()
+
+
+class TFLiteBackend(InferenceBackend):
+    """
+    Intérprete TFLite con el delegado XNNPACK para CPU.
+
+    Usa tflite_runtime si está instalado y si no el intérprete incluido en TensorFlow.
+    Admite modelos float32, float16 (pesos fp16, E/S float32) e int8 completos,
+    cuantizando la entrada y decuantizando la salida con los parámetros del modelo.
+
+    Cada tamaño de lote usa su propio intérprete con los tensores ya reservados:
+    alternar lotes de 1 y 3 no vuelve a llamar a allocate_tensors en cada petición.
+    Un intérprete no admite llamadas concurrentes, así que cada uno tiene su lock.
+    """
+
+    name = 'tflite'
+
+    def __init__(self, model_path, num_threads=None, variant=DEFAULT_VARIANT):
+        super().__init__(model_path)
+        self.variant = variant
+        try:
+            from tflite_runtime.interpreter import Interpreter
+        except ImportError:
+            import tensorflow as tf
+            Interpreter = tf.lite.Interpreter
+
+        if num_threads is None:
+            num_threads = int(os.environ.get('TFLITE_NUM_THREADS', os.cpu_count() or 1))
+        self._create_interpreter = lambda: Interpreter(model_path=model_path, num_threads=num_threads)
+
+        # XNNPACK es el resolver por defecto del intérprete para modelos float en CPU
+        interpreter = self._create_interpreter()
+        interpreter.allocate_tensors()
+        model_input = interpreter.get_input_details()[0]
+        self.input_size = (int(model_input['shape'][1]), int(model_input['shape'][2]))
+
+        # Intérprete, entrada, salida y lock por tamaño de lote
+        self._interpreters = {
+            int(model_input['shape'][0]): (interpreter, model_input, interpreter.get_output_details()[0],
+                                           threading.Lock())
+        }
+        self._interpreters_lock = threading.Lock()
+
+    def _interpreter_for(self, batch_size):
+        """Intérprete con la entrada fijada a batch_size (se crea la primera vez)."""
+        entry = self._interpreters.get(batch_size)
+        if entry is None:
+            with self._interpreters_lock:
+                entry = self._interpreters.get(batch_size)
+                if entry is None:
+                    height, width = self.input_size
+                    interpreter = self._create_interpreter()
+                    model_input = interpreter.get_input_details()[0]
+                    interpreter.resize_tensor_input(model_input['index'], [batch_size, height, width, 3])
+                    interpreter.allocate_tensors()
+                    entry = (interpreter, interpreter.get_input_details()[0],
+                             interpreter.get_output_details()[0], threading.Lock())
+                    self._interpreters[batch_size] = entry
+        return entry
+
+    def predict(self, image_batch):
+        image_batch = np.asarray(image_batch, dtype=np.float32)
+        interpreter, model_input, model_output, lock = self._interpreter_for(image_batch.shape[0])
+        quantized = _quantize(image_batch, model_input)
+        with lock:
+            interpreter.set_tensor(model_input['index'], quantized)
+            interpreter.invoke()
+            output = interpreter.get_tensor(model_output['index'])
+        return _dequantize(output, model_output)
+
+
+def _quantize(values, tensor_details):
+    """Convierte float32 al tipo de entrada del tensor (int8/uint8 usan escala y zero point)."""
+    dtype = tensor_details['dtype']
+    if not np.issubdtype(dtype, np.integer):
+        return values.astype(dtype, copy=False)
+    scale, zero_point = tensor_details['quantization']
+    info = np.iinfo(dtype)
+    return np.clip(np.round(values / scale + zero_point), info.min, info.max).astype(dtype)
+
+
+def _dequantize(values, tensor_details):
+    """Convierte la salida del tensor a float32."""
+    if not np.issubdtype(values.dtype, np.integer):
+        return np.array(values, dtype=np.float32)
+    scale, zero_point = tensor_details['quantization']
+    return (values.astype(np.float32) - zero_point) * scale
+
+
+class ONNXBackend(InferenceBackend):
+    """Backend ONNX Runtime con el proveedor de CPU."""
+
+    name = 'onnx'
+
+    def __init__(self, model_path, num_threads=None):
+        super().__init__(model_path)
+        import onnxruntime as ort
+
+        options = ort.SessionOptions()
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        if num_threads:
+            options.intra_op_num_threads = num_threads
+
+        self.session = ort.InferenceSession(model_path, sess_options=options,
+                                            providers=['CPUExecutionProvider'])
+        model_input = self.session.get_inputs()[0]
+        self._input_name = model_input.name
+        shape = model_input.shape
+        if isinstance(shape[1], int) and isinstance(shape[2], int):
+            self.input_size = (shape[1], shape[2])
+
+    def predict(self, image_batch):
+        image_batch = np.asarray(image_batch, dtype=np.float32)
+        return np.asarray(self.session.run(None, {self._input_name: image_batch})[0])
+
+
+BACKENDS = {
+    'keras': KerasBackend,
+    'keras_direct': KerasDirectBackend,
+    'tflite': TFLiteBackend,
+    'onnx': ONNXBackend
+}
+
+
+def _keras_input_size(model):
+    """Alto y ancho de entrada de un modelo Keras (224x224 por defecto)."""
+    try:
+        shape = model.input_shape
+        if isinstance(shape, list):
+            shape = shape[0]
+        if shape[1] and shape[2]:
+            return (int(shape[1]), int(shape[2]))
+    except Exception:
+        pass
+    return (224, 224)
+
+
+def create_backend(backend_name, model_path, variant=None):
+    """
+    Crea el backend indicado para MODEL_PATH.
+
+    Args:
+        backend_name: Nombre del backend (keras, keras_direct, tflite, onnx)
+        model_path: Ruta configurada del modelo (.h5)
+        variant: Variante de precisión (float32, float16, int8). Las variantes
+            cuantizadas solo existen para el backend tflite.
+
+    Returns:
+        InferenceBackend
+
+    Raises:
+        ValueError: Si el backend o la variante no existen
+        FileNotFoundError: Si no existe el artefacto del backend
+    """
+    backend_name = (backend_name or DEFAULT_BACKEND).lower()
+    variant = (variant or DEFAULT_VARIANT).lower()
+    if backend_name not in BACKENDS:
+        raise ValueError(f"Backend desconocido: {backend_name}. Opciones: {', '.join(BACKENDS)}")
+    if variant not in MODEL_VARIANTS:
+        raise ValueError(f"Variante desconocida: {variant}. Opciones: {', '.join(MODEL_VARIANTS)}")
+    if variant != DEFAULT_VARIANT and backend_name != 'tflite':
+        raise ValueError(f"La variante '{variant}' solo está disponible con el backend tflite")
+
+    artifact_path = resolve_artifact_path(model_path, backend_name, variant)
+    if not os.path.exists(artifact_path):
+        tool = 'quantize_model.py' if variant != DEFAULT_VARIANT else 'convert_model.py'
+        raise FileNotFoundError(
+            f"Artefacto no encontrado para backend '{backend_name}': {artifact_path}. "
+            f"Genera con: python scripts/{tool} --model {model_path}"
+        )
+
+    if backend_name == 'tflite':
+        return TFLiteBackend(artifact_path, variant=variant)
+    return BACKENDS[backend_name](artifact_path)
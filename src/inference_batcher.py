@@ -0,0 +1,187 @@
+"""
+Servicio de inferencia con micro-batching dinámico.
+Agrupa los recortes de mano de peticiones concurrentes en un solo forward pass del CNN.
+"""
+
+import queue
+import threading
+import time
+
+import numpy as np
+
+from src.metrics import STAGE_METRIC, metrics
+
+
+class _PendingInference:
+    """Petición de inferencia en espera de su lote."""
+
+    __slots__ = ('recognizer', 'image_batch', 'top_k', 'enqueued_at', 'event', 'result')
+
+    def __init__(self, recognizer, image_batch, top_k):
+        # El reconocedor que preprocesó la imagen también la clasifica (aunque se cambie de modelo)
+        self.recognizer = recognizer
+        self.image_batch = image_batch
+        self.top_k = top_k
+        self.enqueued_at = time.perf_counter()
+        self.event = threading.Event()
+        self.result = None
+
+
+class BatchingInferenceService:
+    """
+    Cola de inferencia que agrupa peticiones concurrentes.
+
+    Cada hilo de Flask preprocesa su recorte y lo encola; un hilo trabajador
+    arma lotes de hasta max_batch_size elementos esperando como máximo
+    max_wait_ms desde la primera petición del lote, ejecuta un único
+    forward pass y entrega a cada petición su PredictionResult.
+    """
+
+    def __init__(self, recognizer, max_batch_size=8, max_wait_ms=5.0, request_timeout=5.0):
+        """
+        Args:
+            recognizer: Reconocedor con preprocess_image, predict_batch y make_result
+            max_batch_size: Tamaño máximo de lote
+            max_wait_ms: Espera máxima para completar un lote (ms)
+            request_timeout: Tiempo máximo que una petición espera su resultado (s)
+        """
+        self.recognizer = recognizer
+        self.max_batch_size = max(1, int(max_batch_size))
+        self.max_wait = max(0.0, float(max_wait_ms)) / 1000.0
+        self.request_timeout = request_timeout
+
+        self._queue = queue.Queue()
+        self._stats_lock = threading.Lock()
+        self._running = True
+
+        # Estadísticas
+        self.batches_run = 0
+        self.items_processed = 0
+        self.timeouts = 0
+        self.errors = 0
+        self.batch_size_counts = {}
+        self.total_queue_wait = 0.0
+        self.max_queue_wait = 0.0
+
+        self._worker = threading.Thread(target=self._run, name='asl-inference-batcher', daemon=True)
+        self._worker.start()
+
+    def infer(self, image, top_k=3):
+        """
+        Encola una imagen y espera su resultado.
+
+        Args:
+            image: Recorte de la mano (BGR)
+            top_k: Número de predicciones a conservar
+
+        Returns:
+            PredictionResult o None si el modelo no está disponible, falla o expira
+        """
+        recognizer = self.recognizer
+        if not self._running or not recognizer.is_model_loaded():
+            return None
+
+        # El preprocesado se hace en el hilo de la petición para paralelizarlo
+        request = _PendingInference(recognizer, recognizer.preprocess_image(image), top_k)
+        self._queue.put(request)
+
+        if not request.event.wait(self.request_timeout):
+            with self._stats_lock:
+                self.timeouts += 1
+            return None
+        return request.result
+
+    def swap_recognizer(self, recognizer):
+        """
+        Cambiar el reconocedor de las peticiones nuevas
+
+        Las que ya están en cola terminan con el reconocedor con el que se preprocesaron.
+        """
+        self.recognizer = recognizer
+
+    def _collect_batch(self):
+        """Toma la primera petición y completa el lote hasta el límite de tamaño o tiempo."""
+        first = self._queue.get()
+        if first is None:
+            return None
+
+        batch = [first]
+        deadline = time.perf_counter() + self.max_wait
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - time.perf_counter()
+            try:
+                item = self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if item is None:
+                self._running = False
+                break
+            batch.append(item)
+        return batch
+
+    def _run(self):
+        """Bucle del hilo trabajador."""
+        while self._running:
+            batch = self._collect_batch()
+            if batch is None:
+                break
+
+            started_at = time.perf_counter()
+            # Durante un cambio de modelo el lote puede mezclar dos reconocedores
+            groups = {}
+            for item in batch:
+                groups.setdefault(id(item.recognizer), []).append(item)
+            for items in groups.values():
+                recognizer = items[0].recognizer
+                try:
+                    probabilities = recognizer.predict_batch(
+                        np.concatenate([item.image_batch for item in items], axis=0)
+                    )
+                    for item, item_probabilities in zip(items, probabilities):
+                        item.result = recognizer.make_result(item_probabilities, item.top_k)
+                except Exception as e:
+                    print(f"Error en inferencia por lotes: {e}")
+                    with self._stats_lock:
+                        self.errors += 1
+
+            with self._stats_lock:
+                size = len(batch)
+                self.batches_run += 1
+                self.items_processed += size
+                self.batch_size_counts[size] = self.batch_size_counts.get(size, 0) + 1
+                for item in batch:
+                    wait = started_at - item.enqueued_at
+                    self.total_queue_wait += wait
+                    self.max_queue_wait = max(self.max_queue_wait, wait)
+                    metrics.observe(STAGE_METRIC, wait, stage='batch_wait')
+
+            for item in batch:
+                item.event.set()
+
+    def get_stats(self):
+        """
+        Estadísticas de la cola de inferencia.
+
+        Returns:
+            dict: Distribución de tamaños de lote y tiempos de espera en cola
+        """
+        with self._stats_lock:
+            return {
+                'max_batch_size': self.max_batch_size,
+                'max_wait_ms': self.max_wait * 1000.0,
+                'queue_depth': self._queue.qsize(),
+                'batches_run': self.batches_run,
+                'items_processed': self.items_processed,
+                'avg_batch_size': (self.items_processed / self.batches_run) if self.batches_run else 0.0,
+                'batch_size_distribution': {str(k): v for k, v in sorted(self.batch_size_counts.items())},
+                'avg_queue_wait_ms': (self.total_queue_wait / self.items_processed * 1000.0) if self.items_processed else 0.0,
+                'max_queue_wait_ms': self.max_queue_wait * 1000.0,
+                'timeouts': self.timeouts,
+                'errors': self.errors
+            }
+
+    def shutdown(self):
+        """Detiene el hilo trabajador."""
+        if self._running:
+            self._running = False
+            self._queue.put(None)
@@ -0,0 +1,287 @@
+"""
+Proceso trabajador de inferencia (detección de manos + reconocimiento ASL).
+Lo lanza InferenceWorkerPool con `python -m src.inference_worker`; recibe los
+frames a través de ranuras de memoria compartida y devuelve por su conexión
+solo los resultados (landmarks, bounding box y predicción).
+
+Cada sesión del trabajador tiene su propio detector, ventana de la mano (ROI) y
+compuerta de movimiento; el proceso web indica en cada frame el ancho máximo de
+la entrada de MediaPipe y el reconocedor del peldaño de calidad del stream.
+"""
+
+import argparse
+import dataclasses
+import os
+import socket
+import sys
+import time
+from collections import OrderedDict
+from multiprocessing import resource_tracker
+from multiprocessing.connection import Connection
+from multiprocessing.shared_memory import SharedMemory
+
+import numpy as np
+
+from src.hand_detector import HandDetector, extract_hand_region
+from src.motion_gate import MotionGate
+from src.roi_tracker import HandROITracker
+
+
+def attach_shared_memory(name):
+    """
+    Abrir un bloque de memoria compartida creado por el proceso web
+
+    El bloque pertenece al proceso padre: se evita que el resource tracker de
+    este proceso lo elimine al terminar.
+    """
+    try:
+        return SharedMemory(name=name, track=False)
+    except TypeError:
+        # Python < 3.13 no admite track=False
+        shm = SharedMemory(name=name)
+        resource_tracker.unregister(shm._name, 'shared_memory')
+        return shm
+
+
+def create_landmark_recognizer():
+    """Crear el reconocedor de landmarks o None si no hay modelo"""
+    from src.landmark_recognizer import LandmarkAlphabetRecognizer
+
+    recognizer = LandmarkAlphabetRecognizer(
+        model_path=os.environ.get('LANDMARK_MODEL_PATH', 'models/asl_landmark_model.npz')
+    )
+    return recognizer if recognizer.is_model_loaded() else None
+
+
+def create_recognizer():
+    """Crear el reconocedor configurado (CNN o landmarks) en este proceso"""
+    if os.environ.get('RECOGNIZER_MODE', 'cnn').lower() == 'landmarks':
+        recognizer = create_landmark_recognizer()
+        if recognizer is not None:
+            return recognizer, 'landmarks'
+
+    from src.asl_alphabet_recognizer_v2 import ASLAlphabetRecognizerV2
+
+    recognizer = ASLAlphabetRecognizerV2(
+        model_path=os.environ.get('MODEL_PATH', 'models/asl_quick_model.h5'),
+        class_mapping_path=os.environ.get('CLASS_MAPPING_PATH', 'models/class_mapping_quick.json')
+    )
+    return recognizer, 'cnn'
+
+
+def create_motion_gate():
+    """Compuerta de movimiento con la misma configuración que el proceso web"""
+    return MotionGate(
+        threshold=float(os.environ.get('MOTION_GATE_THRESHOLD', 0.05)),
+        max_age=float(os.environ.get('MOTION_GATE_MAX_AGE', 0.3)),
+        stable_max_age=float(os.environ.get('MOTION_GATE_STABLE_MAX_AGE', 1.0))
+    )
+
+
+class _Session:
+    """Detector en modo tracking, ventana de la mano y compuerta de movimiento de un stream"""
+
+    __slots__ = ('detector', 'roi_tracker', 'motion_gate')
+
+    def __init__(self, roi_tracking, roi_expansion):
+        self.detector = HandDetector(
+            static_image_mode=False,
+            max_num_hands=1,
+            min_detection_confidence=0.5,
+            min_tracking_confidence=0.5
+        )
+        self.roi_tracker = HandROITracker(expansion=roi_expansion) if roi_tracking else None
+        self.motion_gate = create_motion_gate()
+
+    def analyze(self, frame, max_input_width=None):
+        if self.roi_tracker is not None:
+            return self.roi_tracker.analyze(self.detector, frame, max_input_width)
+        return self.detector.analyze_frame(frame, max_input_width=max_input_width)
+
+
+class InferenceWorker:
+    """Bucle de un proceso trabajador"""
+
+    def __init__(self, conn, shm, slot_bytes, max_sessions=16):
+        self.conn = conn
+        self.shm = shm
+        self.slot_bytes = slot_bytes
+        self.max_sessions = max(1, int(max_sessions))
+        self.sessions = OrderedDict()
+        self.roi_tracking = str(os.environ.get('ROI_TRACKING', '0')).lower() in ('1', 'true', 'yes')
+        self.roi_expansion = float(os.environ.get('ROI_EXPANSION', 2.0))
+        self.recognizer, self.recognizer_mode = create_recognizer()
+        # Reconocedor de los peldaños 'fast' (sin él se usa el configurado)
+        if self.recognizer_mode == 'landmarks':
+            self.fast_recognizer = self.recognizer
+        else:
+            self.fast_recognizer = create_landmark_recognizer()
+        self.spare_session = None
+
+    def warmup(self):
+        """
+        Inicializar MediaPipe y el modelo antes de anunciarse como listo
+
+        La sesión calentada queda de reserva para el primer stream que llegue.
+
+        Returns:
+            float: Milisegundos del calentamiento
+        """
+        started_at = time.perf_counter()
+        self.spare_session = _Session(self.roi_tracking, self.roi_expansion)
+        self.spare_session.detector.warmup()
+        if self.recognizer_mode == 'cnn':
+            # El trabajador procesa los frames de uno en uno
+            self.recognizer.warmup((1,))
+        return round((time.perf_counter() - started_at) * 1000, 2)
+
+    def load_model(self, model_path, class_mapping_path):
+        """
+        Cargar y calentar otra versión del CNN y cambiarla por la actual
+
+        Los frames que llegan mientras tanto esperan en el socket; el proceso
+        web los procesa él mismo si vence su tiempo de espera.
+        """
+        if self.recognizer_mode != 'cnn':
+            return None
+        from src.asl_alphabet_recognizer_v2 import ASLAlphabetRecognizerV2
+
+        recognizer = ASLAlphabetRecognizerV2(model_path=model_path, class_mapping_path=class_mapping_path)
+        if not recognizer.is_model_loaded():
+            return f'No se pudo cargar {model_path}'
+        recognizer.warmup((1,))
+        self.recognizer = recognizer
+        return None
+
+    def session(self, key):
+        """Sesión del stream (LRU acotado por max_sessions)"""
+        session = self.sessions.get(key)
+        if session is None:
+            session, self.spare_session = self.spare_session, None
+            if session is None:
+                session = _Session(self.roi_tracking, self.roi_expansion)
+            self.sessions[key] = session
+            while len(self.sessions) > self.max_sessions:
+                _, oldest = self.sessions.popitem(last=False)
+                oldest.detector.cleanup()
+        else:
+            self.sessions.move_to_end(key)
+        return session
+
+    def release(self, key):
+        session = self.sessions.pop(key, None)
+        if session is not None:
+            session.detector.cleanup()
+
+    def analyze(self, slot, shape, session_key, top_k, max_input_width=None, tier='full',
+                motion_gate=False, stable=False):
+        """
+        Detectar la mano y reconocer la letra del frame de una ranura
+
+        Args:
+            slot: Ranura de memoria compartida con el frame
+            shape: Forma del frame
+            session_key: Identificador del stream
+            top_k: Número de predicciones a conservar
+            max_input_width: Ancho máximo de la entrada de MediaPipe (peldaño de calidad)
+            tier: Reconocedor del peldaño ('full' o 'fast')
+            motion_gate: Si reutilizar la predicción anterior con la mano quieta
+            stable: Si la letra del stream está estable (ver MotionGate.check)
+        """
+        frame = np.ndarray(shape, dtype=np.uint8, buffer=self.shm.buf, offset=slot * self.slot_bytes)
+        session = self.session(session_key)
+        analysis = session.analyze(frame, max_input_width)
+        if tier == 'fast' and self.fast_recognizer is None:
+            tier = 'full'
+
+        prediction = None
+        hand_region_size = None
+        gate_result = None
+        landmarks = analysis.primary_landmarks
+        if not landmarks:
+            session.motion_gate.reset()
+        else:
+            if motion_gate:
+                prediction = session.motion_gate.check(landmarks, stable=stable)
+                gate_result = session.motion_gate.last_result
+            if prediction is None:
+                if tier == 'fast' or self.recognizer_mode == 'landmarks':
+                    height, width = analysis.frame_shape
+                    prediction = self.fast_recognizer.infer_landmarks(
+                        landmarks, top_k=top_k, aspect_ratio=width / height,
+                        handedness=analysis.handedness[0]
+                    )
+                else:
+                    hand_region = extract_hand_region(frame, landmarks)
+                    hand_region_size = (hand_region.shape[1], hand_region.shape[0])
+                    prediction = self.recognizer.infer(hand_region, top_k=top_k)
+                if motion_gate:
+                    session.motion_gate.record(landmarks, prediction)
+
+        # Los results de MediaPipe no se pueden serializar y el padre no los usa
+        return {
+            'analysis': dataclasses.replace(analysis, results=None),
+            'prediction': prediction,
+            'hand_region_size': hand_region_size,
+            'tier': tier,
+            'gate_result': gate_result
+        }
+
+    def run(self):
+        warmup_ms = self.warmup()
+        self.conn.send(('ready', os.getpid(), {'recognizer_mode': self.recognizer_mode,
+                                               'warmup_ms': warmup_ms}))
+        while True:
+            try:
+                message = self.conn.recv()
+            except (EOFError, OSError):
+                break
+
+            command = message[0]
+            if command == 'analyze':
+                _, request_id, slot, shape, session_key, top_k, options = message
+                started_at = time.perf_counter()
+                try:
+                    payload, error = self.analyze(slot, shape, session_key, top_k, **options), None
+                except Exception as e:
+                    payload, error = None, str(e)
+                self.conn.send(('result', request_id, slot, payload, error,
+                                time.perf_counter() - started_at))
+            elif command == 'release':
+                self.release(message[1])
+            elif command == 'load_model':
+                _, version, model_path, class_mapping_path = message
+                try:
+                    error = self.load_model(model_path, class_mapping_path)
+                except Exception as e:
+                    error = str(e)
+                self.conn.send(('model_loaded', version, error))
+            elif command == 'stop':
+                break
+
+        for key in list(self.sessions):
+            self.release(key)
+        if self.spare_session is not None:
+            self.spare_session.detector.cleanup()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Trabajador de inferencia ASL')
+    parser.add_argument('--fd', type=int, required=True, help='Descriptor del socket con el proceso web')
+    parser.add_argument('--shm', required=True, help='Nombre del bloque de memoria compartida')
+    parser.add_argument('--slot-bytes', type=int, required=True)
+    parser.add_argument('--max-sessions', type=int, default=16)
+    args = parser.parse_args()
+
+    conn = Connection(socket.socket(fileno=args.fd).detach())
+    shm = attach_shared_memory(args.shm)
+    try:
+        InferenceWorker(conn, shm, args.slot_bytes, args.max_sessions).run()
+    finally:
+        shm.close()
+        conn.close()
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,209 @@
+"""
+Reconocedor ASL basado solo en landmarks de MediaPipe.
+Clasifica la letra a partir de los 21x3 puntos de la mano con un MLP o kNN en NumPy,
+sin ejecutar el CNN sobre el recorte de la imagen.
+"""
+
+import json
+import os
+
+import numpy as np
+
+from src.metrics import stage_timer
+from src.prediction import build_prediction
+
+NUM_LANDMARKS = 21
+NUM_FEATURES = NUM_LANDMARKS * 3
+
+# Índices de MediaPipe Hands usados para la normalización
+WRIST = 0
+MIDDLE_FINGER_MCP = 9
+
+
+def landmark_features(landmarks, aspect_ratio=1.0, handedness=None):
+    """
+    Convierte landmarks en un vector de 63 características centrado en la mano.
+
+    - Corrige la relación de aspecto (x e y normalizados por ancho y alto distintos)
+    - Traslada al origen en la muñeca
+    - Escala por la distancia muñeca - nudillo del dedo medio
+    - Refleja el eje x de la mano izquierda para compartir el mismo clasificador
+
+    Args:
+        landmarks: Array (21, 3) o (N, 21, 3) con [x, y, z] normalizados
+        aspect_ratio: Ancho / alto del frame del que salen los landmarks
+        handedness: 'Left', 'Right' o None (por mano si es una lista)
+
+    Returns:
+        numpy array: (63,) o (N, 63) float32
+    """
+    points = np.asarray(landmarks, dtype=np.float32)
+    single = points.ndim == 2
+    if single:
+        points = points[np.newaxis]
+    points = points.reshape(-1, NUM_LANDMARKS, 3).copy()
+
+    points[:, :, 0] *= aspect_ratio
+    points -= points[:, WRIST:WRIST + 1, :]
+
+    scale = np.linalg.norm(points[:, MIDDLE_FINGER_MCP, :2], axis=1)
+    scale = np.where(scale > 1e-6, scale, 1.0)
+    points /= scale[:, np.newaxis, np.newaxis]
+
+    if handedness is not None:
+        labels = [handedness] * len(points) if isinstance(handedness, str) else list(handedness)
+        is_left = np.array([label == 'Left' for label in labels], dtype=bool)
+        points[is_left, :, 0] *= -1.0
+
+    features = points.reshape(len(points), NUM_FEATURES)
+    return features[0] if single else features
+
+
+def _softmax(logits):
+    logits = logits - logits.max(axis=1, keepdims=True)
+    exp = np.exp(logits)
+    return exp / exp.sum(axis=1, keepdims=True)
+
+
+class LandmarkAlphabetRecognizer:
+    """
+    Motor de reconocimiento alternativo al CNN que usa solo landmarks.
+
+    El modelo es un .npz generado por scripts/train_landmark_classifier.py con:
+    - kind: 'mlp' o 'knn'
+    - class_names: letras en el mismo orden que el mapeo del CNN
+    - mean, std: normalización de características
+    - mlp: W0, b0, W1, b1, ... (ReLU entre capas, softmax al final)
+    - knn: train_features, train_labels, k
+    """
+
+    def __init__(self, model_path='models/asl_landmark_model.npz', min_confidence=0.6):
+        """
+        Args:
+            model_path: Ruta al modelo de landmarks (.npz)
+            min_confidence: Confianza mínima para aceptar una letra
+        """
+        self.model_path = model_path
+        self.min_confidence = min_confidence
+        self.model = None
+        self.kind = None
+        self.class_names = []
+        self.layers = []
+        self.mean = None
+        self.std = None
+        self.knn_features = None
+        self.knn_labels = None
+        self.knn_k = 5
+
+        self.load_model()
+
+    def load_model(self):
+        """Carga el modelo de landmarks."""
+        try:
+            if not os.path.exists(self.model_path):
+                print(f"Modelo de landmarks no encontrado: {self.model_path}")
+                return
+
+            data = np.load(self.model_path, allow_pickle=False)
+            self.kind = str(data['kind'])
+            self.class_names = json.loads(str(data['class_names']))
+            self.mean = data['mean'].astype(np.float32)
+            self.std = data['std'].astype(np.float32)
+
+            if self.kind == 'mlp':
+                num_layers = int(data['num_layers'])
+                self.layers = [
+                    (data[f'W{i}'].astype(np.float32), data[f'b{i}'].astype(np.float32))
+                    for i in range(num_layers)
+                ]
+            elif self.kind == 'knn':
+                self.knn_features = data['train_features'].astype(np.float32)
+                self.knn_labels = data['train_labels'].astype(np.int64)
+                self.knn_k = int(data['k'])
+            else:
+                print(f"Tipo de modelo de landmarks desconocido: {self.kind}")
+                return
+
+            self.model = self
+            print(f"Modelo de landmarks cargado: {self.model_path} ({self.kind})")
+
+        except Exception as e:
+            print(f"Error cargando modelo de landmarks: {e}")
+            self.model = None
+
+    def predict_features(self, features):
+        """
+        Probabilidades por clase para un lote de características.
+
+        Args:
+            features: Array (N, 63)
+
+        Returns:
+            numpy array: (N, num_clases)
+        """
+        x = (np.asarray(features, dtype=np.float32) - self.mean) / self.std
+
+        if self.kind == 'mlp':
+            for W, b in self.layers[:-1]:
+                x = np.maximum(x @ W + b, 0.0)
+            W, b = self.layers[-1]
+            return _softmax(x @ W + b)
+
+        # kNN: votos ponderados por distancia inversa entre los k vecinos más cercanos
+        distances = (
+            np.sum(x ** 2, axis=1, keepdims=True)
+            - 2.0 * x @ self.knn_features.T
+            + np.sum(self.knn_features ** 2, axis=1)
+        )
+        k = min(self.knn_k, self.knn_features.shape[0])
+        nearest = np.argpartition(distances, k - 1, axis=1)[:, :k]
+        weights = 1.0 / (np.sqrt(np.maximum(np.take_along_axis(distances, nearest, axis=1), 0.0)) + 1e-6)
+        probabilities = np.zeros((x.shape[0], len(self.class_names)), dtype=np.float32)
+        np.add.at(probabilities, (np.arange(x.shape[0])[:, np.newaxis], self.knn_labels[nearest]), weights)
+        return probabilities / probabilities.sum(axis=1, keepdims=True)
+
+    def infer_landmarks(self, landmarks, top_k=3, aspect_ratio=1.0, handedness=None):
+        """
+        Reconoce la letra a partir de los landmarks de una mano.
+
+        Args:
+            landmarks: Lista o array (21, 3) de landmarks normalizados
+            top_k: Número de predicciones a conservar
+            aspect_ratio: Ancho / alto del frame
+            handedness: 'Left', 'Right' o None
+
+        Returns:
+            PredictionResult o None si el modelo no está disponible o falla
+        """
+        if not self.is_model_loaded() or landmarks is None:
+            return None
+
+        try:
+            with stage_timer('landmark_classifier'):
+                features = landmark_features(landmarks, aspect_ratio, handedness)
+                probabilities = self.predict_features(features[np.newaxis])[0]
+            with stage_timer('top_k'):
+                return build_prediction(probabilities, self.class_names, self.min_confidence, top_k)
+        except Exception as e:
+            print(f"Error en predicción por landmarks: {e}")
+            return None
+
+    def predict(self, image, landmarks=None):
+        """
+        Predice la letra ASL (la imagen se ignora; compatible con ASLAlphabetRecognizerV2).
+
+        Returns:
+            tuple: (letra, confianza)
+        """
+        result = self.infer_landmarks(landmarks)
+        if result is None:
+            return None, 0.0
+        return result.as_tuple()
+
+    def get_available_letters(self):
+        """Retorna las letras disponibles en el modelo."""
+        return self.class_names.copy()
+
+    def is_model_loaded(self):
+        """Verifica si el modelo está cargado correctamente."""
+        return self.model is not None and len(self.class_names) > 0
@@ -0,0 +1,176 @@
+"""
+Métricas de latencia por etapa del pipeline de detección.
+Histogramas de buckets fijos y contadores en memoria, exportados en formato
+de texto de Prometheus por el endpoint /metrics.
+"""
+
+import bisect
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable, Dict, List, Tuple
+
+# Límites superiores de los buckets de latencia en segundos (de 0.5 ms a 2.5 s)
+LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5)
+
+STAGE_METRIC = 'asl_stage_duration_seconds'
+
+
+class Histogram:
+    """Histograma de buckets fijos (un contador por bucket, suma y total)"""
+
+    __slots__ = ('buckets', 'counts', 'sum', 'count')
+
+    def __init__(self, buckets=LATENCY_BUCKETS):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)  # El último es +Inf
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+
+def _format_labels(labels: Tuple[Tuple[str, str], ...]) -> str:
+    if not labels:
+        return ''
+    pairs = ','.join(f'{key}="{value}"' for key, value in labels)
+    return '{' + pairs + '}'
+
+
+def _format_value(value) -> str:
+    if isinstance(value, bool):
+        return '1' if value else '0'
+    if isinstance(value, int):
+        return str(value)
+    return repr(float(value))
+
+
+class MetricsRegistry:
+    """
+    Registro de histogramas, contadores y gauges con etiquetas
+
+    - observe/inc son O(log buckets) con un único lock: aptos para cada frame
+    - Los gauges se leen al exportar mediante una función registrada
+    - render() genera el formato de texto de Prometheus (versión 0.0.4)
+    """
+
+    def __init__(self, buckets=LATENCY_BUCKETS):
+        self.buckets = tuple(buckets)
+        self._lock = threading.Lock()
+        self._help: Dict[str, Tuple[str, str]] = {}
+        self._histograms: Dict[str, Dict[tuple, Histogram]] = {}
+        self._counters: Dict[str, Dict[tuple, float]] = {}
+        self._gauges: Dict[str, Callable[[], object]] = {}
+
+    def describe(self, name: str, kind: str, help_text: str):
+        """Registrar el tipo (histogram, counter, gauge) y la ayuda de una métrica"""
+        self._help[name] = (kind, help_text)
+
+    def observe(self, name: str, value: float, **labels):
+        """Añadir una observación (en segundos) al histograma de la métrica"""
+        key = tuple(sorted(labels.items()))
+        with self._lock:
+            series = self._histograms.setdefault(name, {})
+            histogram = series.get(key)
+            if histogram is None:
+                histogram = series[key] = Histogram(self.buckets)
+            histogram.observe(value)
+
+    def inc(self, name: str, amount: float = 1, **labels):
+        """Incrementar un contador"""
+        key = tuple(sorted(labels.items()))
+        with self._lock:
+            series = self._counters.setdefault(name, {})
+            series[key] = series.get(key, 0) + amount
+
+    def gauge(self, name: str, help_text: str, callback: Callable[[], object]):
+        """
+        Registrar un gauge calculado al exportar
+
+        Args:
+            name: Nombre de la métrica
+            help_text: Descripción
+            callback: Devuelve un número o un dict {etiquetas (tupla de pares): número}
+        """
+        self.describe(name, 'gauge', help_text)
+        self._gauges[name] = callback
+
+    @contextmanager
+    def time(self, name: str, **labels):
+        """Medir la duración del bloque y añadirla al histograma"""
+        started_at = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, time.perf_counter() - started_at, **labels)
+
+    def histogram_summary(self, name: str) -> Dict[str, Dict[str, float]]:
+        """Número de observaciones y media en ms por serie (para /status)"""
+        with self._lock:
+            series = dict(self._histograms.get(name, {}))
+            return {
+                ','.join(value for _, value in key) or name: {
+                    'count': histogram.count,
+                    'avg_ms': round(histogram.sum / histogram.count * 1000, 3) if histogram.count else 0.0
+                }
+                for key, histogram in sorted(series.items())
+            }
+
+    def _header(self, lines: List[str], name: str, default_kind: str):
+        kind, help_text = self._help.get(name, (default_kind, name))
+        lines.append(f'# HELP {name} {help_text}')
+        lines.append(f'# TYPE {name} {kind}')
+
+    def render(self) -> str:
+        """Exportar todas las métricas en formato de texto de Prometheus"""
+        lines: List[str] = []
+        with self._lock:
+            histograms = {name: {key: (list(h.counts), h.sum, h.count) for key, h in series.items()}
+                          for name, series in self._histograms.items()}
+            counters = {name: dict(series) for name, series in self._counters.items()}
+
+        for name in sorted(histograms):
+            self._header(lines, name, 'histogram')
+            for key, (counts, total, count) in sorted(histograms[name].items()):
+                cumulative = 0
+                for bound, bucket_count in zip(self.buckets + (float('inf'),), counts):
+                    cumulative += bucket_count
+                    le = '+Inf' if bound == float('inf') else repr(bound)
+                    lines.append(f'{name}_bucket{_format_labels(key + (("le", le),))} {cumulative}')
+                lines.append(f'{name}_sum{_format_labels(key)} {_format_value(total)}')
+                lines.append(f'{name}_count{_format_labels(key)} {count}')
+
+        for name in sorted(counters):
+            self._header(lines, name, 'counter')
+            for key, value in sorted(counters[name].items()):
+                lines.append(f'{name}{_format_labels(key)} {_format_value(value)}')
+
+        for name in sorted(self._gauges):
+            try:
+                value = self._gauges[name]()
+            except Exception as e:
+                print(f"Error leyendo la métrica {name}: {e}")
+                continue
+            if value is None:
+                continue
+            self._header(lines, name, 'gauge')
+            if isinstance(value, dict):
+                for key, item in sorted(value.items()):
+                    lines.append(f'{name}{_format_labels(key)} {_format_value(item)}')
+            else:
+                lines.append(f'{name} {_format_value(value)}')
+
+        return '\n'.join(lines) + '\n'
+
+
+# Registro del proceso, compartido por los módulos del pipeline
+metrics = MetricsRegistry()
+metrics.describe(STAGE_METRIC, 'histogram', 'Duración de cada etapa del pipeline de detección')
+
+
+def stage_timer(stage: str):
+    """Medir una etapa del pipeline (base64_decode, image_decode, mediapipe, cnn, ...)"""
+    return metrics.time(STAGE_METRIC, stage=stage)
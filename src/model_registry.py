@@ -0,0 +1,230 @@
+"""
+Registro de versiones del modelo ASL.
+
+Cada versión es una carpeta con el modelo, sus artefactos convertidos y el
+mapeo de clases, más un manifiesto con checksums, tamaño de entrada y clases:
+
+    models/registry/
+        active.json                 versión activa y anterior (para rollback)
+        20261017-101500/
+            manifest.json
+            model.h5                (y model.tflite, model.int8.tflite, model.onnx, ...)
+            class_mapping.json
+
+El servidor carga una versión en segundo plano, la calienta y cambia la
+referencia del reconocedor sin cortar los streams (ver /admin/models).
+"""
+
+import hashlib
+import json
+import os
+import re
+import shutil
+import tempfile
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Sequence
+
+from src.inference_backends import BACKEND_EXTENSIONS
+
+MANIFEST_FILE = 'manifest.json'
+ACTIVE_FILE = 'active.json'
+MODEL_BASENAME = 'model'
+CLASS_MAPPING_FILE = 'class_mapping.json'
+VERSION_PATTERN = re.compile(r'^[A-Za-z0-9][A-Za-z0-9._-]{0,63}$')
+
+
+class RegistryError(Exception):
+    """Versión inexistente, manifiesto inválido o checksum que no coincide"""
+
+
+def file_sha256(path: str, chunk_size: int = 1024 * 1024) -> str:
+    """Checksum SHA-256 de un archivo leído por bloques"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def load_class_names(class_mapping_path: str) -> List[str]:
+    """Clases ordenadas por índice a partir de un class_mapping.json"""
+    with open(class_mapping_path, 'r') as f:
+        class_mapping = json.load(f)
+    return [class_mapping[str(i)] for i in range(len(class_mapping))]
+
+
+def _write_json_atomic(path: str, data):
+    """Escribir JSON en un temporal y renombrarlo (nunca queda un archivo a medias)"""
+    directory = os.path.dirname(path) or '.'
+    fd, tmp_path = tempfile.mkstemp(dir=directory, suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'w') as f:
+            json.dump(data, f, indent=2)
+        os.replace(tmp_path, path)
+    except Exception:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+class ModelRegistry:
+    """
+    Versiones de modelo + mapeo de clases con manifiesto
+
+    - register() copia el modelo y sus artefactos hermanos (generados por
+      convert_model.py / quantize_model.py) y calcula los checksums
+    - verify() comprueba los checksums antes de cargar una versión
+    - active.json guarda la versión activa y la anterior para que un reinicio
+      cargue la misma versión que estaba sirviendo
+    """
+
+    def __init__(self, root: str = 'models/registry'):
+        self.root = root
+
+    def _version_dir(self, version: str) -> str:
+        if not VERSION_PATTERN.match(str(version)):
+            raise RegistryError(f'Nombre de versión inválido: {version}')
+        return os.path.join(self.root, version)
+
+    def versions(self) -> List[Dict[str, Any]]:
+        """Manifiestos de todas las versiones, de la más antigua a la más reciente"""
+        if not os.path.isdir(self.root):
+            return []
+        manifests = []
+        for name in os.listdir(self.root):
+            if os.path.exists(os.path.join(self.root, name, MANIFEST_FILE)):
+                try:
+                    manifests.append(self.manifest(name))
+                except RegistryError as e:
+                    print(f"Versión ignorada: {e}")
+        return sorted(manifests, key=lambda manifest: (manifest.get('created_at', ''), manifest['version']))
+
+    def manifest(self, version: str) -> Dict[str, Any]:
+        """Manifiesto de una versión"""
+        path = os.path.join(self._version_dir(version), MANIFEST_FILE)
+        if not os.path.exists(path):
+            raise RegistryError(f'La versión {version} no existe en {self.root}')
+        try:
+            with open(path, 'r') as f:
+                return json.load(f)
+        except ValueError as e:
+            raise RegistryError(f'Manifiesto inválido de {version}: {e}')
+
+    def model_path(self, version: str) -> str:
+        """Ruta del modelo principal (.h5) de una versión"""
+        return os.path.join(self._version_dir(version), self.manifest(version)['model_file'])
+
+    def class_mapping_path(self, version: str) -> str:
+        return os.path.join(self._version_dir(version), self.manifest(version)['class_mapping_file'])
+
+    def register(self, model_path: str, class_mapping_path: str, version: Optional[str] = None,
+                 input_size: Sequence[int] = (224, 224), notes: str = '') -> Dict[str, Any]:
+        """
+        Registrar una versión nueva copiando el modelo, sus artefactos y el mapeo
+
+        Args:
+            model_path: Modelo principal (.h5); se copian también los archivos
+                hermanos con extensión de backend (asl_quick_model.tflite, ...)
+            class_mapping_path: Mapeo de clases {"0": "A", ...}
+            version: Nombre de la versión (por defecto la fecha y hora)
+            input_size: (alto, ancho) de entrada del modelo
+            notes: Descripción libre (datos de entrenamiento, precisión, ...)
+
+        Returns:
+            dict: Manifiesto de la versión
+        """
+        if not os.path.exists(model_path):
+            raise RegistryError(f'Modelo no encontrado: {model_path}')
+        if not os.path.exists(class_mapping_path):
+            raise RegistryError(f'Mapeo de clases no encontrado: {class_mapping_path}')
+
+        version = version or datetime.now().strftime('%Y%m%d-%H%M%S')
+        version_dir = self._version_dir(version)
+        if os.path.exists(version_dir):
+            raise RegistryError(f'La versión {version} ya existe')
+        class_names = load_class_names(class_mapping_path)
+
+        # Artefactos hermanos: misma base y extensión de algún backend (incluye variantes .int8.tflite)
+        base, model_extension = os.path.splitext(model_path)
+        source_dir = os.path.dirname(model_path) or '.'
+        prefix = os.path.basename(base) + '.'
+        extensions = set(BACKEND_EXTENSIONS.values())
+        sources = [model_path] + [
+            os.path.join(source_dir, name) for name in sorted(os.listdir(source_dir))
+            if name.startswith(prefix) and os.path.splitext(name)[1] in extensions
+            and os.path.join(source_dir, name) != model_path
+        ]
+
+        os.makedirs(self.root, exist_ok=True)
+        staging_dir = tempfile.mkdtemp(prefix=f'.{version}-', dir=self.root)
+        try:
+            artifacts = {}
+            for source in sources:
+                name = MODEL_BASENAME + os.path.basename(source)[len(prefix) - 1:]
+                shutil.copy2(source, os.path.join(staging_dir, name))
+                artifacts[name] = file_sha256(os.path.join(staging_dir, name))
+            shutil.copy2(class_mapping_path, os.path.join(staging_dir, CLASS_MAPPING_FILE))
+
+            model_file = MODEL_BASENAME + model_extension
+            manifest = {
+                'version': version,
+                'created_at': datetime.now().isoformat(),
+                'source_model': model_path,
+                'model_file': model_file,
+                'class_mapping_file': CLASS_MAPPING_FILE,
+                'checksum': artifacts[model_file],
+                'artifacts': artifacts,
+                'input_size': [int(input_size[0]), int(input_size[1])],
+                'class_names': class_names,
+                'num_classes': len(class_names),
+                'notes': notes
+            }
+            _write_json_atomic(os.path.join(staging_dir, MANIFEST_FILE), manifest)
+            # La carpeta aparece completa de una vez
+            os.rename(staging_dir, version_dir)
+        except Exception:
+            shutil.rmtree(staging_dir, ignore_errors=True)
+            raise
+        return manifest
+
+    def verify(self, version: str) -> Dict[str, Any]:
+        """
+        Comprobar los checksums de los artefactos y el mapeo de clases de una versión
+
+        Returns:
+            dict: Manifiesto verificado
+
+        Raises:
+            RegistryError: Si falta un archivo o un checksum no coincide
+        """
+        manifest = self.manifest(version)
+        version_dir = self._version_dir(version)
+        for name, checksum in manifest.get('artifacts', {}).items():
+            path = os.path.join(version_dir, name)
+            if not os.path.exists(path):
+                raise RegistryError(f'Falta el artefacto {name} de la versión {version}')
+            if file_sha256(path) != checksum:
+                raise RegistryError(f'Checksum incorrecto en {name} de la versión {version}')
+        class_names = load_class_names(os.path.join(version_dir, manifest['class_mapping_file']))
+        if class_names != manifest['class_names']:
+            raise RegistryError(f'El mapeo de clases de {version} no coincide con el manifiesto')
+        return manifest
+
+    def active(self) -> Dict[str, Optional[str]]:
+        """Versión activa y anterior guardadas ({'version': None, ...} si no hay ninguna)"""
+        path = os.path.join(self.root, ACTIVE_FILE)
+        if not os.path.exists(path):
+            return {'version': None, 'previous': None, 'activated_at': None}
+        with open(path, 'r') as f:
+            return json.load(f)
+
+    def set_active(self, version: Optional[str], previous: Optional[str] = None):
+        """Guardar la versión activa (None: MODEL_PATH); la carga la hace el servidor"""
+        if version is not None:
+            self.manifest(version)
+        os.makedirs(self.root, exist_ok=True)
+        _write_json_atomic(os.path.join(self.root, ACTIVE_FILE), {
+            'version': version,
+            'previous': previous,
+            'activated_at': datetime.now().isoformat()
+        })
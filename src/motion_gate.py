@@ -0,0 +1,135 @@
+"""
+Compuerta de movimiento por stream.
+Mientras la mano no se mueve, la letra no cambia: si los landmarks apenas se
+desplazaron desde la última inferencia se reutiliza esa predicción en lugar de
+volver a recortar la mano y ejecutar el reconocedor.
+"""
+
+import time
+from typing import Any, Dict, Optional
+
+import numpy as np
+
+# Resultados de una consulta a la compuerta
+GATE_RESULTS = ('hit', 'moved', 'expired', 'empty')
+
+
+def landmark_displacement(previous: np.ndarray, current) -> float:
+    """
+    Desplazamiento máximo entre dos juegos de landmarks relativo al tamaño de la mano
+
+    Args:
+        previous: Array (21, 3) de landmarks normalizados de referencia
+        current: Landmarks (21, 3) normalizados del frame actual
+
+    Returns:
+        float: Mayor distancia 3D entre puntos homólogos dividida por la diagonal
+            (x, y) del bounding box de la mano de referencia
+    """
+    current = np.asarray(current, dtype=np.float32)
+    span = previous[:, :2].max(axis=0) - previous[:, :2].min(axis=0)
+    hand_size = max(float(np.hypot(span[0], span[1])), 1e-6)
+    return float(np.sqrt(((current - previous) ** 2).sum(axis=1)).max()) / hand_size
+
+
+class MotionGate:
+    """
+    Reutilización de la última predicción de un stream mientras la mano está quieta
+
+    - Se guarda la predicción de cada inferencia real junto con sus landmarks
+    - Un frame reutiliza esa predicción si ningún landmark se movió más de
+      threshold (relativo al tamaño de la mano) desde la inferencia
+    - Pasados max_age segundos desde la inferencia se vuelve a inferir aunque la
+      mano siga quieta (stable_max_age si la letra está estable), para que un
+      cambio lento de la mano o del modelo acabe apareciendo
+
+    No es thread-safe: se usa con StreamState.lock tomado.
+    """
+
+    def __init__(self, threshold: float = 0.05, max_age: float = 0.3, stable_max_age: float = 1.0):
+        """
+        Args:
+            threshold: Desplazamiento relativo máximo para reutilizar la predicción
+            max_age: Segundos máximos reutilizando una predicción
+            stable_max_age: Segundos máximos si la letra del stream está estable
+        """
+        self.threshold = float(threshold)
+        self.max_age = float(max_age)
+        self.stable_max_age = max(float(stable_max_age), self.max_age)
+
+        self.prediction: Any = None
+        self._anchor: Optional[np.ndarray] = None
+        self._anchor_time = 0.0
+        self.last_displacement: Optional[float] = None
+        # Resultado de la última consulta (uno de GATE_RESULTS)
+        self.last_result: Optional[str] = None
+
+        # Estadísticas
+        self.checks = 0
+        self.results = dict.fromkeys(GATE_RESULTS, 0)
+
+    def reset(self):
+        """Olvidar la predicción guardada (sin mano o cambio de modelo)"""
+        self.prediction = None
+        self._anchor = None
+        self.last_displacement = None
+
+    def check(self, landmarks, timestamp: Optional[float] = None, stable: bool = False) -> Optional[Any]:
+        """
+        Predicción a reutilizar para los landmarks del frame actual
+
+        Args:
+            landmarks: Landmarks (21, 3) normalizados del frame
+            timestamp: Segundos (time.time() por defecto)
+            stable: Si la letra del stream está estable (permite stable_max_age)
+
+        Returns:
+            La predicción guardada o None si hay que ejecutar el reconocedor
+        """
+        timestamp = time.time() if timestamp is None else timestamp
+        if self.prediction is None or self._anchor is None:
+            result = 'empty'
+        elif timestamp - self._anchor_time > (self.stable_max_age if stable else self.max_age):
+            result = 'expired'
+        else:
+            self.last_displacement = landmark_displacement(self._anchor, landmarks)
+            result = 'moved' if self.last_displacement > self.threshold else 'hit'
+
+        self.count(result)
+        return self.prediction if result == 'hit' else None
+
+    def count(self, result: str):
+        """
+        Registrar el resultado de una consulta
+
+        Lo usa check() y también el proceso web con las consultas que hizo la
+        compuerta de la sesión en un trabajador de inferencia, para que las
+        estadísticas del stream incluyan ambos caminos.
+        """
+        self.checks += 1
+        self.results[result] += 1
+        self.last_result = result
+
+    def record(self, landmarks, prediction: Any, timestamp: Optional[float] = None):
+        """Guardar la predicción de una inferencia real y sus landmarks"""
+        if prediction is None:
+            self.reset()
+            return
+        self.prediction = prediction
+        self._anchor = np.array(landmarks, dtype=np.float32)
+        self._anchor_time = time.time() if timestamp is None else timestamp
+
+    @property
+    def hits(self) -> int:
+        return self.results['hit']
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Consultas, aciertos por motivo y tasa de reutilización"""
+        return {
+            'gate_checks': self.checks,
+            'gate_hits': self.hits,
+            'gate_hit_rate': round(self.hits / self.checks, 4) if self.checks else 0.0,
+            'gate_moved': self.results['moved'],
+            'gate_expired': self.results['expired'],
+            'last_displacement': round(self.last_displacement, 4) if self.last_displacement is not None else None
+        }
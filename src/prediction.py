@@ -0,0 +1,113 @@
+"""
+Registro compacto de una inferencia del reconocedor ASL.
+Permite obtener letra, confianza y top-k a partir de un único forward pass.
+"""
+
+from dataclasses import dataclass
+from typing import List, Optional, Tuple
+
+import numpy as np
+
+
+@dataclass(frozen=True)
+class PredictionResult:
+    """
+    Resultado de una inferencia sobre una imagen.
+
+    Attributes:
+        letter: Letra con mayor probabilidad (None si el índice no tiene clase)
+        confidence: Probabilidad de la letra con mayor probabilidad
+        accepted: Si la confianza alcanza el umbral mínimo del reconocedor
+        top_predictions: Lista de (letra, confianza) ordenada de mayor a menor
+        probabilities: Vector de probabilidades crudo del modelo
+    """
+    letter: Optional[str]
+    confidence: float
+    accepted: bool
+    top_predictions: Tuple[Tuple[str, float], ...]
+    probabilities: np.ndarray
+
+    def as_tuple(self):
+        """
+        Vista compatible con predict().
+
+        Returns:
+            tuple: (letra, confianza), con letra None si no supera el umbral
+        """
+        if self.letter is None:
+            return None, 0.0
+        return (self.letter if self.accepted else None), self.confidence
+
+    def top(self, top_k=3) -> List[Tuple[str, float]]:
+        """
+        Vista compatible con get_top_predictions().
+
+        Args:
+            top_k: Número de predicciones
+
+        Returns:
+            list: Lista de (letra, confianza)
+        """
+        return list(self.top_predictions[:top_k])
+
+
+def top_k_indices(probabilities, top_k):
+    """
+    Índices de las top-k probabilidades ordenados de mayor a menor.
+
+    Usa argpartition para no ordenar el vector completo.
+
+    Args:
+        probabilities: Vector 1D de probabilidades
+        top_k: Número de índices a devolver
+
+    Returns:
+        numpy array: Índices ordenados por probabilidad descendente
+    """
+    n = probabilities.shape[0]
+    top_k = max(0, min(top_k, n))
+    if top_k == 0:
+        return np.empty(0, dtype=np.intp)
+    if top_k < n:
+        candidates = np.argpartition(probabilities, n - top_k)[n - top_k:]
+    else:
+        candidates = np.arange(n)
+    return candidates[np.argsort(probabilities[candidates])[::-1]]
+
+
+def build_prediction(probabilities, class_names, min_confidence, top_k=3):
+    """
+    Construye un PredictionResult a partir del vector de probabilidades.
+
+    Args:
+        probabilities: Vector 1D de salida del modelo
+        class_names: Lista de letras indexadas por clase
+        min_confidence: Umbral de confianza para aceptar la letra
+        top_k: Número de predicciones a conservar
+
+    Returns:
+        PredictionResult
+    """
+    probabilities = np.asarray(probabilities, dtype=np.float32).reshape(-1)
+    num_classes = len(class_names)
+
+    top_k = min(top_k, probabilities.shape[0], num_classes)
+    top_indices = top_k_indices(probabilities, top_k)
+    top_predictions = tuple(
+        (class_names[idx], float(probabilities[idx]))
+        for idx in top_indices
+        if idx < num_classes
+    )
+
+    predicted_idx = int(np.argmax(probabilities)) if probabilities.size else 0
+    if probabilities.size == 0 or predicted_idx >= num_classes:
+        return PredictionResult(None, 0.0, False, top_predictions, probabilities)
+
+    confidence = float(probabilities[predicted_idx])
+    return PredictionResult(
+        letter=class_names[predicted_idx],
+        confidence=confidence,
+        accepted=confidence >= min_confidence,
+        top_predictions=top_predictions,
+        probabilities=probabilities
+    )
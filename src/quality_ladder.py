@@ -0,0 +1,292 @@
+"""
+Escalera de calidad adaptativa por stream.
+En lugar de procesar siempre uno de cada FRAME_SKIP_RATE frames, cada stream sube
+o baja por una escalera de pasos (frames saltados, resolución de entrada de
+MediaPipe y reconocedor) según la latencia medida de sus frames y la CPU de la
+máquina frente a un objetivo de latencia.
+"""
+
+import os
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, Dict, Optional, Sequence, Tuple
+
+# Reconocedores: 'full' es el configurado (CNN), 'fast' el de landmarks si está disponible
+RECOGNIZER_TIERS = ('full', 'fast')
+
+
+@dataclass(frozen=True)
+class QualityStep:
+    """
+    Un peldaño de la escalera
+
+    Attributes:
+        skip_rate: Procesar uno de cada skip_rate frames del stream
+        input_width: Ancho máximo de la entrada de MediaPipe en píxeles (0 = sin reducir)
+        tier: Reconocedor ('full' o 'fast')
+    """
+    skip_rate: int
+    input_width: int
+    tier: str
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {'skip_rate': self.skip_rate, 'input_width': self.input_width, 'tier': self.tier}
+
+
+# De mejor a peor calidad: primero se saltan frames, luego se reduce la entrada
+# de MediaPipe y por último se cambia al reconocedor rápido
+DEFAULT_LADDER: Tuple[QualityStep, ...] = (
+    QualityStep(1, 640, 'full'),
+    QualityStep(2, 640, 'full'),
+    QualityStep(3, 640, 'full'),
+    QualityStep(3, 480, 'full'),
+    QualityStep(3, 320, 'full'),
+    QualityStep(4, 320, 'fast'),
+    QualityStep(6, 320, 'fast'),
+)
+
+
+def parse_ladder(spec: Optional[str]) -> Tuple[QualityStep, ...]:
+    """
+    Leer una escalera de la forma "1:640:full,2:640:full,3:320:fast"
+
+    Args:
+        spec: Pasos separados por comas (skip_rate:input_width:tier); vacío para DEFAULT_LADDER
+
+    Raises:
+        ValueError: Si algún paso no es válido
+    """
+    if not spec or not spec.strip():
+        return DEFAULT_LADDER
+    steps = []
+    for item in spec.split(','):
+        parts = item.strip().split(':')
+        if len(parts) != 3 or parts[2] not in RECOGNIZER_TIERS:
+            raise ValueError(f'Paso de calidad inválido: {item!r} (se espera skip_rate:input_width:full|fast)')
+        steps.append(QualityStep(max(1, int(parts[0])), max(0, int(parts[1])), parts[2]))
+    return tuple(steps)
+
+
+def step_for_skip_rate(ladder: Sequence[QualityStep], skip_rate: int) -> int:
+    """
+    Primer peldaño que salta al menos skip_rate frames
+
+    Sirve de peldaño inicial equivalente al FRAME_SKIP_RATE fijo anterior.
+    """
+    for index, step in enumerate(ladder):
+        if step.skip_rate >= skip_rate:
+            return index
+    return len(ladder) - 1
+
+
+def system_cpu_times() -> Optional[Tuple[float, float]]:
+    """
+    Tiempo ocupado y total de todos los núcleos de la máquina (Linux, /proc/stat)
+
+    Incluye los procesos trabajadores de inferencia y cualquier otro proceso.
+
+    Returns:
+        (ocupado, total) en ticks o None si /proc/stat no existe
+    """
+    try:
+        with open('/proc/stat', 'r') as f:
+            fields = [float(value) for value in f.readline().split()[1:]]
+    except (OSError, ValueError):
+        return None
+    if len(fields) < 4:
+        return None
+    # user nice system idle iowait irq softirq steal ...: idle + iowait es tiempo libre
+    idle = fields[3] + (fields[4] if len(fields) > 4 else 0.0)
+    total = sum(fields[:8])
+    return total - idle, total
+
+
+class StreamQuality:
+    """Peldaño actual y latencia medida de un stream (se modifica solo desde QualityController)"""
+
+    def __init__(self, controller: 'QualityController', step: int):
+        self.controller = controller
+        self.step = step
+        self.latency_ema: Optional[float] = None
+        self.last_change = time.monotonic()
+        self.downgrades = 0
+        self.upgrades = 0
+        self.shed = 0
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Peldaño actual del stream"""
+        return self.controller.stream_stats(self)
+
+
+class QualityController:
+    """
+    Controlador de la escalera de calidad compartido por todos los streams
+
+    - Cada frame procesado aporta su latencia (espera en la cola de admisión +
+      detección + reconocimiento) a una media móvil del stream
+    - Si la media supera target_latency_ms, la CPU de la máquina supera cpu_high
+      o un frame del stream se descarta por sobrecarga, el stream baja un peldaño
+    - Solo sube un peldaño cuando la media queda por debajo de
+      upgrade_ratio * target_latency_ms con la CPU bajo cpu_low durante
+      upgrade_after segundos (histéresis para no oscilar)
+    - Entre dos cambios del mismo stream pasan al menos adjust_interval segundos
+    """
+
+    def __init__(self,
+                 ladder: Sequence[QualityStep] = DEFAULT_LADDER,
+                 target_latency_ms: float = 150.0,
+                 cpu_high: float = 0.85,
+                 cpu_low: float = 0.6,
+                 upgrade_ratio: float = 0.5,
+                 adjust_interval: float = 1.0,
+                 upgrade_after: float = 3.0,
+                 initial_step: int = 0,
+                 ema_alpha: float = 0.3):
+        """
+        Args:
+            ladder: Peldaños de mejor a peor calidad
+            target_latency_ms: Objetivo de latencia por frame (SLO)
+            cpu_high: Uso de CPU de la máquina (0-1 del total de núcleos) que fuerza a bajar
+            cpu_low: Uso de CPU por debajo del cual se permite subir
+            upgrade_ratio: Fracción del objetivo bajo la que se permite subir
+            adjust_interval: Segundos mínimos entre cambios de un stream
+            upgrade_after: Segundos sin cambios antes de subir un peldaño
+            initial_step: Peldaño de los streams nuevos
+            ema_alpha: Peso del último frame en la media de latencia
+        """
+        if not ladder:
+            raise ValueError('La escalera de calidad necesita al menos un peldaño')
+        self.ladder = tuple(ladder)
+        self.target_latency = float(target_latency_ms) / 1000.0
+        self.cpu_high = float(cpu_high)
+        self.cpu_low = float(cpu_low)
+        self.upgrade_ratio = float(upgrade_ratio)
+        self.adjust_interval = float(adjust_interval)
+        self.upgrade_after = float(upgrade_after)
+        self.initial_step = min(max(0, int(initial_step)), len(self.ladder) - 1)
+        self.ema_alpha = float(ema_alpha)
+        # Tiers con reconocedor cargado; 'fast' se sirve con 'full' si falta
+        self.available_tiers = {'full'}
+
+        self._lock = threading.Lock()
+        self._cpu_count = os.cpu_count() or 1
+        self._cpu_sample = (time.monotonic(), self._cpu_counters())
+        self._cpu_usage = 0.0
+
+        # Estadísticas
+        self.downgrades = 0
+        self.upgrades = 0
+
+    def create_stream_state(self) -> StreamQuality:
+        """Estado de calidad de un stream nuevo (factory de StreamStateStore)"""
+        return StreamQuality(self, self.initial_step)
+
+    def step_for(self, quality: StreamQuality) -> QualityStep:
+        """Peldaño efectivo del stream (con el tier rápido degradado a 'full' si no está cargado)"""
+        step = self.ladder[min(quality.step, len(self.ladder) - 1)]
+        if step.tier not in self.available_tiers:
+            return QualityStep(step.skip_rate, step.input_width, 'full')
+        return step
+
+    def _cpu_counters(self) -> Tuple[float, float]:
+        """
+        (ocupado, total) acumulados para medir la CPU entre dos muestras
+
+        Usa la CPU de toda la máquina, que incluye los procesos trabajadores; sin
+        /proc/stat recurre al tiempo de CPU de este proceso frente al tiempo real.
+        """
+        times = system_cpu_times()
+        if times is not None:
+            return times
+        return time.process_time(), time.monotonic() * self._cpu_count
+
+    def cpu_usage(self) -> float:
+        """Uso de CPU de la máquina desde la muestra anterior, 0-1 del total de núcleos"""
+        now = time.monotonic()
+        with self._lock:
+            sampled_at, (busy, total) = self._cpu_sample
+            if now - sampled_at >= 0.5:
+                current_busy, current_total = self._cpu_counters()
+                if current_total > total:
+                    self._cpu_usage = (current_busy - busy) / (current_total - total)
+                self._cpu_sample = (now, (current_busy, current_total))
+            return self._cpu_usage
+
+    def observe(self, quality: StreamQuality, latency: float) -> int:
+        """
+        Registrar la latencia de un frame procesado y ajustar el peldaño del stream
+
+        Args:
+            quality: StreamQuality del stream
+            latency: Segundos desde que el frame pidió admisión hasta tener resultado
+
+        Returns:
+            int: Cambio de peldaño (+1 baja la calidad, -1 la sube, 0 sin cambio)
+        """
+        cpu = self.cpu_usage()
+        now = time.monotonic()
+        with self._lock:
+            if quality.latency_ema is None:
+                quality.latency_ema = latency
+            else:
+                quality.latency_ema += self.ema_alpha * (latency - quality.latency_ema)
+
+            since_change = now - quality.last_change
+            if since_change < self.adjust_interval:
+                return 0
+            if quality.latency_ema > self.target_latency or cpu > self.cpu_high:
+                return self._move(quality, 1, now)
+            if (quality.latency_ema < self.target_latency * self.upgrade_ratio and cpu < self.cpu_low
+                    and since_change >= self.upgrade_after):
+                return self._move(quality, -1, now)
+            return 0
+
+    def observe_shed(self, quality: StreamQuality) -> int:
+        """Un frame del stream se descartó por sobrecarga: bajar un peldaño"""
+        now = time.monotonic()
+        with self._lock:
+            quality.shed += 1
+            if now - quality.last_change < self.adjust_interval:
+                return 0
+            return self._move(quality, 1, now)
+
+    def _move(self, quality: StreamQuality, direction: int, now: float) -> int:
+        """Mover el stream un peldaño (con el lock tomado)"""
+        step = min(max(quality.step + direction, 0), len(self.ladder) - 1)
+        if step == quality.step:
+            return 0
+        quality.step = step
+        quality.last_change = now
+        if direction > 0:
+            quality.downgrades += 1
+            self.downgrades += 1
+        else:
+            quality.upgrades += 1
+            self.upgrades += 1
+        return direction
+
+    def stream_stats(self, quality: StreamQuality) -> Dict[str, Any]:
+        """Peldaño actual de un stream para /status"""
+        return {
+            'step': quality.step,
+            **self.step_for(quality).as_dict(),
+            'latency_ms': round(quality.latency_ema * 1000, 1) if quality.latency_ema is not None else None,
+            'downgrades': quality.downgrades,
+            'upgrades': quality.upgrades,
+            'shed': quality.shed
+        }
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Configuración de la escalera, CPU y cambios totales"""
+        return {
+            'ladder': [step.as_dict() for step in self.ladder],
+            'target_latency_ms': round(self.target_latency * 1000, 1),
+            'cpu_usage': round(self.cpu_usage(), 3),
+            'cpu_high': self.cpu_high,
+            'cpu_low': self.cpu_low,
+            'available_tiers': sorted(self.available_tiers),
+            'initial_step': self.initial_step,
+            'downgrades': self.downgrades,
+            'upgrades': self.upgrades
+        }
@@ -0,0 +1,179 @@
+"""
+Seguimiento de la región de la mano (ROI) por stream.
+Tras una detección en el frame completo, los frames siguientes se procesan con
+MediaPipe solo en una ventana fija ampliada alrededor de esa mano, volviendo al
+frame completo (y recolocando la ventana) cuando la mano se pierde, se acerca
+al borde de la ventana o la confianza baja.
+"""
+
+from typing import Any, Dict, Optional, Tuple
+
+from src.hand_detector import FrameAnalysis
+
+
+class HandROITracker:
+    """
+    Ventana de búsqueda de la mano de un único stream
+
+    - La ventana es un cuadrado centrado en la bounding box de la última búsqueda
+      completa, con lado expansion veces el mayor lado de la caja (mínimo
+      min_size píxeles)
+    - La ventana no se mueve mientras la mano siga dentro: el detector en modo
+      tracking recibe siempre la misma región y su seguimiento sigue siendo válido
+    - Si MediaPipe no encuentra la mano en la ventana, su confianza es menor que
+      min_confidence o la mano queda a menos de edge_margin del borde de la
+      ventana, el mismo frame se vuelve a buscar completo y la ventana se recoloca
+    - Cada full_frame_interval frames se fuerza una búsqueda completa para
+      recuperar manos que hayan entrado por fuera de la ventana
+    - Cada vez que cambia la región entregada a MediaPipe (otra ventana o el
+      frame completo) se reinicia el tracking del detector
+
+    No es thread-safe: se usa dentro de HandDetectorPool.acquire del mismo stream.
+    """
+
+    def __init__(self,
+                 expansion: float = 2.0,
+                 min_size: int = 128,
+                 min_confidence: float = 0.5,
+                 full_frame_interval: int = 30,
+                 edge_margin: float = 0.05):
+        """
+        Args:
+            expansion: Lado de la ventana respecto al mayor lado de la bounding box
+            min_size: Lado mínimo de la ventana en píxeles
+            min_confidence: Confianza mínima de MediaPipe para aceptar la ventana
+            full_frame_interval: Frames máximos seguidos buscando solo en la ventana
+            edge_margin: Distancia mínima de la mano al borde de la ventana (fracción
+                de su lado) para seguir usándola
+        """
+        self.expansion = float(expansion)
+        self.min_size = int(min_size)
+        self.min_confidence = float(min_confidence)
+        self.full_frame_interval = max(1, int(full_frame_interval))
+        self.edge_margin = float(edge_margin)
+
+        self.roi: Optional[Tuple[int, int, int, int]] = None
+        self.frame_shape: Optional[Tuple[int, int]] = None
+        self.frames_since_full = 0
+        # Región entregada al detector en la llamada anterior (None: frame completo)
+        self._input_window: Optional[Tuple[int, int, int, int]] = None
+
+        # Estadísticas
+        self.roi_searches = 0
+        self.roi_fallbacks = 0
+        self.full_searches = 0
+        self.pixels_processed = 0
+        self.pixels_full_frame = 0
+        self.tracking_resets = 0
+
+    def search_window(self, box: Dict[str, int], frame_shape: Tuple[int, int]) -> Optional[Tuple[int, int, int, int]]:
+        """
+        Ventana ampliada (x0, y0, x1, y1) alrededor de una bounding box
+
+        Returns:
+            Ventana recortada al frame o None si cubriría casi todo el frame
+        """
+        height, width = frame_shape
+        side = max(box['width'], box['height']) * self.expansion
+        side = max(side, self.min_size)
+        center_x = (box['min_x'] + box['max_x']) / 2.0
+        center_y = (box['min_y'] + box['max_y']) / 2.0
+
+        x0 = max(0, int(center_x - side / 2))
+        y0 = max(0, int(center_y - side / 2))
+        x1 = min(width, int(center_x + side / 2))
+        y1 = min(height, int(center_y + side / 2))
+
+        if x1 - x0 < 2 or y1 - y0 < 2:
+            return None
+        # Si la ventana ocupa casi todo el frame no compensa recortar
+        if (x1 - x0) * (y1 - y0) >= 0.8 * width * height:
+            return None
+        return x0, y0, x1, y1
+
+    def _near_edge(self, box: Dict[str, int], frame_shape: Tuple[int, int]) -> bool:
+        """Si la mano toca el borde de la ventana (los bordes del frame no cuentan)"""
+        height, width = frame_shape
+        x0, y0, x1, y1 = self.roi
+        margin_x = self.edge_margin * (x1 - x0)
+        margin_y = self.edge_margin * (y1 - y0)
+        return ((x0 > 0 and box['min_x'] - x0 < margin_x)
+                or (y0 > 0 and box['min_y'] - y0 < margin_y)
+                or (x1 < width and x1 - box['max_x'] < margin_x)
+                or (y1 < height and y1 - box['max_y'] < margin_y))
+
+    def _accept(self, analysis: FrameAnalysis) -> bool:
+        if not analysis.hands_detected:
+            return False
+        score = analysis.primary_score
+        if score is not None and score < self.min_confidence:
+            return False
+        return not self._near_edge(analysis.primary_bounding_box, analysis.frame_shape)
+
+    def _update(self, analysis: FrameAnalysis):
+        box = analysis.primary_bounding_box
+        self.roi = self.search_window(box, analysis.frame_shape) if box else None
+
+    def _detect(self, detector, frame, window, max_input_width) -> FrameAnalysis:
+        """Procesar la región indicada reiniciando el tracking si cambió respecto a la anterior"""
+        if window != self._input_window:
+            detector.reset_tracking()
+            self.tracking_resets += 1
+            self._input_window = window
+        return detector.analyze_frame(frame, roi=window, max_input_width=max_input_width)
+
+    def analyze(self, detector, frame, max_input_width: Optional[int] = None) -> FrameAnalysis:
+        """
+        Analizar un frame buscando primero en la ventana fija de la mano
+
+        Args:
+            detector: HandDetector del stream
+            frame: Frame BGR completo
+            max_input_width: Ancho máximo de la entrada de MediaPipe (ver HandDetector.analyze_frame)
+
+        Returns:
+            FrameAnalysis en coordenadas del frame completo
+        """
+        frame_shape = frame.shape[:2]
+        full_pixels = frame_shape[0] * frame_shape[1]
+        self.pixels_full_frame += full_pixels
+
+        # Un cambio de resolución invalida la ventana anterior
+        if frame_shape != self.frame_shape:
+            self.frame_shape = frame_shape
+            self.roi = None
+
+        if self.roi is not None and self.frames_since_full < self.full_frame_interval:
+            x0, y0, x1, y1 = self.roi
+            self.roi_searches += 1
+            self.pixels_processed += (x1 - x0) * (y1 - y0)
+            analysis = self._detect(detector, frame, self.roi, max_input_width)
+            if self._accept(analysis):
+                # La ventana se queda donde está mientras la mano siga dentro
+                self.frames_since_full += 1
+                return analysis
+            self.roi_fallbacks += 1
+
+        self.full_searches += 1
+        self.frames_since_full = 0
+        self.pixels_processed += full_pixels
+        analysis = self._detect(detector, frame, None, max_input_width)
+        self._update(analysis)
+        return analysis
+
+    def reset(self):
+        """Olvidar la ventana actual (la próxima búsqueda será completa)"""
+        self.roi = None
+        self.frames_since_full = 0
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Estadísticas de búsquedas en ventana y en frame completo"""
+        return {
+            'roi_active': self.roi is not None,
+            'roi_searches': self.roi_searches,
+            'roi_fallbacks': self.roi_fallbacks,
+            'full_searches': self.full_searches,
+            'tracking_resets': self.tracking_resets,
+            'roi_hit_rate': ((self.roi_searches - self.roi_fallbacks) / self.roi_searches) if self.roi_searches else 0.0,
+            'pixel_ratio': (self.pixels_processed / self.pixels_full_frame) if self.pixels_full_frame else 1.0
+        }
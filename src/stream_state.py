@@ -0,0 +1,420 @@
+"""
+Estado por stream de cámara: contador de frames, frame skipping, caché de resultados,
+ventana de búsqueda de la mano, estabilidad temporal de la letra, compuerta de
+movimiento y peldaño de calidad. Reemplaza las variables globales compartidas por
+todos los clientes.
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Optional
+
+import cv2
+import numpy as np
+
+# Distancia de Hamming máxima (de 64 bits) para considerar dos frames equivalentes
+DEFAULT_HASH_MAX_DISTANCE = 5
+
+# Peso del último intervalo en la media de FPS medidos y segundos sin frames
+# tras los que un stream deja de contar en los FPS globales
+FPS_EMA_ALPHA = 0.2
+FPS_ACTIVE_WINDOW = 2.0
+
+
+def generate_frame_hash(frame, hash_size=8):
+    """
+    Generar hash perceptual (dHash) del frame para detectar cambios significativos
+
+    Reduce el frame a (hash_size + 1) x hash_size en escala de grises y codifica
+    si cada píxel es más claro que su vecino derecho. El ruido del sensor y la
+    recompresión JPEG apenas cambian unos pocos bits, a diferencia de un MD5.
+
+    Returns:
+        int de hash_size * hash_size bits o None si el frame no es válido
+    """
+    try:
+        small_frame = cv2.resize(frame, (hash_size + 1, hash_size), interpolation=cv2.INTER_AREA)
+        if small_frame.ndim == 3:
+            small_frame = cv2.cvtColor(small_frame, cv2.COLOR_BGR2GRAY)
+        bits = small_frame[:, 1:] > small_frame[:, :-1]
+        return int.from_bytes(np.packbits(bits).tobytes(), 'big')
+    except Exception:
+        return None
+
+
+def hamming_distance(hash_a, hash_b):
+    """Número de bits distintos entre dos hashes perceptuales"""
+    return bin(hash_a ^ hash_b).count('1')
+
+
+def _result_letter(result):
+    return result.get('letter') if result else None
+
+
+def _update_interval(ema: Optional[float], last_time: float, now: float) -> Optional[float]:
+    """Media móvil del intervalo entre frames (None hasta tener dos frames)"""
+    if not last_time:
+        return ema
+    interval = now - last_time
+    return interval if ema is None else ema + FPS_EMA_ALPHA * (interval - ema)
+
+
+def _fps(interval_ema: Optional[float]) -> float:
+    return round(1.0 / interval_ema, 2) if interval_ema else 0.0
+
+
+class StreamState:
+    """
+    Estado de detección de un único stream (sesión)
+
+    Todas las operaciones se hacen con self.lock tomado por el llamador
+    o a través de los métodos de esta clase, que lo toman internamente.
+    """
+
+    def __init__(self, stream_id: str, hash_max_distance: int = DEFAULT_HASH_MAX_DISTANCE,
+                 roi_tracker: Any = None, stability: Any = None, quality: Any = None,
+                 motion_gate: Any = None):
+        self.stream_id = stream_id
+        self.hash_max_distance = hash_max_distance
+        # Ventana de búsqueda de la mano (HandROITracker) o None si está deshabilitada
+        self.roi_tracker = roi_tracker
+        # Estabilidad temporal de la letra (TemporalStabilityEngine) o None
+        self.stability = stability
+        # Peldaño de la escalera de calidad (StreamQuality) o None si FRAME_SKIP_RATE es fijo
+        self.quality = quality
+        # Reutilización de la última predicción con la mano quieta (MotionGate) o None
+        self.motion_gate = motion_gate
+        self.lock = threading.RLock()
+        self.created_at = time.time()
+        self.last_seen = self.created_at
+
+        # Frame skipping
+        self.frame_counter = 0
+        self.last_detection_result: Optional[Dict[str, Any]] = None
+        self.last_detection_time = 0.0
+
+        # Caché de resultados por similitud de frame
+        self.result_cache: Dict[str, Any] = {
+            'result': None,
+            'timestamp': 0,
+            'frame_hash': None
+        }
+
+        # Estadísticas
+        self.cache_hits = 0
+        self.frames_skipped = 0
+        self.frames_processed = 0
+        # Frames procesados que el cache habría considerado equivalentes al anterior
+        # y, de ellos, cuántos dieron otra letra (reutilización errónea estimada)
+        self.reuse_checks = 0
+        self.false_reuse = 0
+
+        # FPS medidos: frames recibidos y frames procesados (intervalos medios)
+        self.input_interval: Optional[float] = None
+        self.processed_interval: Optional[float] = None
+        self.last_frame_time = 0.0
+        self.last_processed_time = 0.0
+
+    def next_frame(self) -> int:
+        """Registrar un frame nuevo y devolver su número dentro del stream"""
+        with self.lock:
+            now = time.time()
+            self.frame_counter += 1
+            self.input_interval = _update_interval(self.input_interval, self.last_frame_time, now)
+            self.last_frame_time = now
+            self.last_seen = now
+            return self.frame_counter
+
+    @property
+    def input_fps(self) -> float:
+        return _fps(self.input_interval)
+
+    @property
+    def processed_fps(self) -> float:
+        return _fps(self.processed_interval)
+
+    def is_similar(self, frame_hash: Optional[int]) -> bool:
+        """Si el frame está dentro de la distancia de Hamming del frame cacheado"""
+        cached_hash = self.result_cache['frame_hash']
+        if frame_hash is None or cached_hash is None:
+            return False
+        return hamming_distance(frame_hash, cached_hash) <= self.hash_max_distance
+
+    def is_cache_valid(self, current_time: float, frame_hash: Optional[int], cache_duration: float) -> bool:
+        """
+        Verificar si el cache es válido basado en tiempo y similitud del frame
+        """
+        with self.lock:
+            cache = self.result_cache
+
+            # Verificar si el cache existe y no ha expirado
+            time_valid = (current_time - cache['timestamp']) < cache_duration
+
+            # Verificar si el frame es perceptualmente similar al anterior
+            return bool(time_valid and cache['result'] is not None and self.is_similar(frame_hash))
+
+    def get_cached_result(self, current_time: float) -> Dict[str, Any]:
+        """Copia del resultado cacheado marcada como proveniente del cache"""
+        with self.lock:
+            self.cache_hits += 1
+            cached_result = self.result_cache['result'].copy()
+            cached_result['from_cache'] = True
+            cached_result['cache_age_ms'] = int((current_time - self.result_cache['timestamp']) * 1000)
+            return cached_result
+
+    def should_skip(self, frame_number: int, frame_skip_rate: int) -> bool:
+        """Procesar solo cada frame_skip_rate frames del stream"""
+        return frame_skip_rate > 1 and frame_number % frame_skip_rate != 0
+
+    def get_skipped_result(self, current_time: float, frame_number: int,
+                           max_age: float = 0.5) -> Dict[str, Any]:
+        """
+        Respuesta para un frame saltado: último resultado si es reciente o estado de espera
+        """
+        with self.lock:
+            self.frames_skipped += 1
+            if self.last_detection_result and (current_time - self.last_detection_time) < max_age:
+                skipped_result = self.last_detection_result.copy()
+                skipped_result['frame_skipped'] = True
+                skipped_result['frame_number'] = frame_number
+                return skipped_result
+
+        # Si no hay resultado reciente, devolver estado de espera
+        return {
+            'success': False,
+            'message': 'Procesando frame...',
+            'gesture': None,
+            'confidence': 0.0,
+            'hands_detected': False,
+            'frame_skipped': True,
+            'frame_number': frame_number
+        }
+
+    def update_cache(self, result: Dict[str, Any], timestamp: float, frame_hash: Optional[int]):
+        """
+        Actualizar el cache y el último resultado con un frame procesado
+        """
+        with self.lock:
+            self.frames_processed += 1
+            now = time.time()
+            self.processed_interval = _update_interval(self.processed_interval, self.last_processed_time, now)
+            self.last_processed_time = now
+
+            # Si el frame era "equivalente" al cacheado, comprobar si la letra cambió
+            if self.result_cache['result'] is not None and self.is_similar(frame_hash):
+                self.reuse_checks += 1
+                if _result_letter(result) != _result_letter(self.result_cache['result']):
+                    self.false_reuse += 1
+
+            self.last_detection_result = result.copy() if result else None
+            self.last_detection_time = timestamp
+            self.result_cache = {
+                'result': result.copy() if result else None,
+                'timestamp': timestamp,
+                'frame_hash': frame_hash
+            }
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Estadísticas de cache, skipping, ventana de búsqueda, calidad y FPS del stream"""
+        with self.lock:
+            total = max(self.frame_counter, 1)
+            roi_stats = self.roi_tracker.get_stats() if self.roi_tracker else {}
+            stability_stats = self.stability.get_stats() if self.stability else {}
+            gate_stats = self.motion_gate.get_stats() if self.motion_gate else {}
+            return {
+                'frames': self.frame_counter,
+                'frames_processed': self.frames_processed,
+                'frames_skipped': self.frames_skipped,
+                'cache_hits': self.cache_hits,
+                'cache_hit_rate': self.cache_hits / total,
+                'skip_rate': self.frames_skipped / total,
+                'reuse_checks': self.reuse_checks,
+                'false_reuse': self.false_reuse,
+                'false_reuse_rate': (self.false_reuse / self.reuse_checks) if self.reuse_checks else 0.0,
+                'hash_max_distance': self.hash_max_distance,
+                'cache_valid': self.result_cache['result'] is not None,
+                'cache_age_ms': int((time.time() - self.result_cache['timestamp']) * 1000) if self.result_cache['result'] else 0,
+                'idle_s': round(time.time() - self.last_seen, 1),
+                'roi_searches': roi_stats.get('roi_searches', 0),
+                'roi_fallbacks': roi_stats.get('roi_fallbacks', 0),
+                'full_searches': roi_stats.get('full_searches', 0),
+                'roi': roi_stats or None,
+                'stable_letter': stability_stats.get('stable_letter'),
+                'gate_checks': gate_stats.get('gate_checks', 0),
+                'gate_hits': gate_stats.get('gate_hits', 0),
+                'gate_hit_rate': gate_stats.get('gate_hit_rate', 0.0),
+                'motion_gate': gate_stats or None,
+                'input_fps': self.input_fps,
+                'processed_fps': self.processed_fps,
+                'quality': self.quality.get_stats() if self.quality else None
+            }
+
+
+class StreamStateStore:
+    """
+    Almacén thread-safe de StreamState por sesión
+
+    - Expira streams sin actividad durante ttl segundos
+    - Limita el número de streams vivos (max_streams) desalojando el menos
+      reciente, lo que acota la memoria total de resultados cacheados
+    """
+
+    def __init__(self, ttl: float = 300.0, max_streams: int = 1000,
+                 hash_max_distance: int = DEFAULT_HASH_MAX_DISTANCE,
+                 roi_tracker_factory: Optional[Callable[[], Any]] = None,
+                 stability_factory: Optional[Callable[[], Any]] = None,
+                 quality_factory: Optional[Callable[[], Any]] = None,
+                 motion_gate_factory: Optional[Callable[[], Any]] = None):
+        self.ttl = float(ttl)
+        self.max_streams = max(1, int(max_streams))
+        self.hash_max_distance = int(hash_max_distance)
+        self.roi_tracker_factory = roi_tracker_factory
+        self.stability_factory = stability_factory
+        self.quality_factory = quality_factory
+        self.motion_gate_factory = motion_gate_factory
+        self._streams: "OrderedDict[str, StreamState]" = OrderedDict()
+        self._lock = threading.Lock()
+
+        # Totales de streams ya desalojados para que las métricas globales no retrocedan
+        self.evicted = 0
+        self._retired_totals = {'frames': 0, 'frames_processed': 0, 'frames_skipped': 0,
+                                'cache_hits': 0, 'reuse_checks': 0, 'false_reuse': 0,
+                                'roi_searches': 0, 'roi_fallbacks': 0, 'full_searches': 0,
+                                'gate_checks': 0, 'gate_hits': 0}
+
+    def get(self, stream_id: str) -> StreamState:
+        """Obtener (o crear) el estado del stream"""
+        with self._lock:
+            self._evict_expired()
+            state = self._streams.get(stream_id)
+            if state is None:
+                roi_tracker = self.roi_tracker_factory() if self.roi_tracker_factory else None
+                stability = self.stability_factory() if self.stability_factory else None
+                quality = self.quality_factory() if self.quality_factory else None
+                motion_gate = self.motion_gate_factory() if self.motion_gate_factory else None
+                state = StreamState(stream_id, self.hash_max_distance, roi_tracker, stability, quality,
+                                    motion_gate)
+                self._streams[stream_id] = state
+                while len(self._streams) > self.max_streams:
+                    _, oldest = self._streams.popitem(last=False)
+                    self._retire(oldest)
+            else:
+                self._streams.move_to_end(stream_id)
+            state.last_seen = time.time()
+            return state
+
+    def peek(self, stream_id: str) -> Optional[StreamState]:
+        """Estado del stream si existe, sin crearlo ni contarlo como actividad"""
+        with self._lock:
+            return self._streams.get(stream_id)
+
+    def _evict_expired(self):
+        """Quitar streams inactivos (con el lock tomado)"""
+        if self.ttl <= 0:
+            return
+        now = time.time()
+        for stream_id, state in list(self._streams.items()):
+            if now - state.last_seen < self.ttl:
+                break  # Ordenado por último uso
+            del self._streams[stream_id]
+            self._retire(state)
+
+    def _retire(self, state: StreamState):
+        self.evicted += 1
+        self._retired_totals['frames'] += state.frame_counter
+        self._retired_totals['frames_processed'] += state.frames_processed
+        self._retired_totals['frames_skipped'] += state.frames_skipped
+        self._retired_totals['cache_hits'] += state.cache_hits
+        self._retired_totals['reuse_checks'] += state.reuse_checks
+        self._retired_totals['false_reuse'] += state.false_reuse
+        if state.roi_tracker is not None:
+            self._retired_totals['roi_searches'] += state.roi_tracker.roi_searches
+            self._retired_totals['roi_fallbacks'] += state.roi_tracker.roi_fallbacks
+            self._retired_totals['full_searches'] += state.roi_tracker.full_searches
+        if state.motion_gate is not None:
+            self._retired_totals['gate_checks'] += state.motion_gate.checks
+            self._retired_totals['gate_hits'] += state.motion_gate.hits
+
+    def remove(self, stream_id: str):
+        """Eliminar el estado de un stream (por ejemplo al cerrar sesión)"""
+        with self._lock:
+            state = self._streams.pop(stream_id, None)
+            if state is not None:
+                self._retire(state)
+
+    def gate_totals(self) -> Dict[str, int]:
+        """Consultas y aciertos de la compuerta de movimiento de todos los streams (para /metrics)"""
+        with self._lock:
+            checks = self._retired_totals['gate_checks']
+            hits = self._retired_totals['gate_hits']
+            for state in self._streams.values():
+                if state.motion_gate is not None:
+                    checks += state.motion_gate.checks
+                    hits += state.motion_gate.hits
+        return {'checks': checks, 'hits': hits}
+
+    def __len__(self) -> int:
+        """Número de streams vivos"""
+        with self._lock:
+            return len(self._streams)
+
+    def get_stats(self, max_sessions: int = 50) -> Dict[str, Any]:
+        """
+        Estadísticas globales y por sesión
+
+        Args:
+            max_sessions: Número máximo de sesiones (las más recientes) a detallar
+                (0: solo los totales)
+        """
+        with self._lock:
+            states = list(self._streams.values())
+            totals = dict(self._retired_totals)
+            evicted = self.evicted
+
+        sessions = {}
+        now = time.time()
+        input_fps = processed_fps = 0.0
+        live_streams = 0
+        for state in states:
+            stats = state.get_stats()
+            for key in totals:
+                totals[key] += stats[key]
+            sessions[state.stream_id[:8]] = stats
+            if now - state.last_seen < FPS_ACTIVE_WINDOW:
+                live_streams += 1
+                input_fps += stats['input_fps']
+                processed_fps += stats['processed_fps']
+
+        recent = list(sessions.items())[-max_sessions:] if max_sessions > 0 else []
+        frames = max(totals['frames'], 1)
+        return {
+            'active_streams': len(states),
+            'max_streams': self.max_streams,
+            'ttl_s': self.ttl,
+            'evicted_streams': evicted,
+            'total_frames': totals['frames'],
+            'total_frames_processed': totals['frames_processed'],
+            'total_frames_skipped': totals['frames_skipped'],
+            'total_cache_hits': totals['cache_hits'],
+            'cache_hit_rate': totals['cache_hits'] / frames,
+            'skip_rate': totals['frames_skipped'] / frames,
+            'total_reuse_checks': totals['reuse_checks'],
+            'total_false_reuse': totals['false_reuse'],
+            'false_reuse_rate': (totals['false_reuse'] / totals['reuse_checks']) if totals['reuse_checks'] else 0.0,
+            'hash_max_distance': self.hash_max_distance,
+            'roi_tracking': self.roi_tracker_factory is not None,
+            'total_roi_searches': totals['roi_searches'],
+            'total_roi_fallbacks': totals['roi_fallbacks'],
+            'total_full_searches': totals['full_searches'],
+            'stability': self.stability_factory is not None,
+            'quality_ladder': self.quality_factory is not None,
+            'motion_gate': self.motion_gate_factory is not None,
+            'total_gate_checks': totals['gate_checks'],
+            'total_gate_hits': totals['gate_hits'],
+            'gate_hit_rate': (totals['gate_hits'] / totals['gate_checks']) if totals['gate_checks'] else 0.0,
+            'live_streams': live_streams,
+            'total_input_fps': round(input_fps, 2),
+            'total_processed_fps': round(processed_fps, 2),
+            'sessions': dict(recent)
+        }
@@ -0,0 +1,157 @@
+"""
+Estabilidad temporal de las predicciones por stream.
+Suaviza las probabilidades del reconocedor entre frames para decidir cuándo
+una letra está estable (y desde cuándo) en lugar de fiarse de un solo frame.
+"""
+
+import time
+from typing import Any, Dict, List, Optional, Sequence
+
+import numpy as np
+
+
+class TemporalStabilityEngine:
+    """
+    Decisión de letra estable a partir de los últimos frames de un stream
+
+    - Anillo NumPy de tamaño fijo (window, clases) con los vectores de probabilidad
+    - EMA de las probabilidades y votación por mayoría (argmax de cada frame del anillo)
+    - Histéresis: una letra pasa a estable con EMA >= enter_threshold y al menos
+      min_votes votos, y solo deja de serlo si su EMA cae por debajo de exit_threshold
+    """
+
+    def __init__(self, window: int = 8, ema_alpha: float = 0.4,
+                 enter_threshold: float = 0.7, exit_threshold: float = 0.45,
+                 min_votes: int = 5):
+        """
+        Args:
+            window: Frames del anillo de probabilidades
+            ema_alpha: Peso del frame nuevo en la EMA (0-1)
+            enter_threshold: EMA mínima para que una letra pase a estable
+            exit_threshold: EMA por debajo de la cual la letra estable se suelta
+            min_votes: Votos mínimos en el anillo para pasar a estable
+        """
+        self.window = max(1, int(window))
+        self.ema_alpha = float(ema_alpha)
+        self.enter_threshold = float(enter_threshold)
+        self.exit_threshold = min(float(exit_threshold), self.enter_threshold)
+        self.min_votes = max(1, min(int(min_votes), self.window))
+
+        self.class_names: List[str] = []
+        self._buffer: Optional[np.ndarray] = None
+        self._ema: Optional[np.ndarray] = None
+        self._count = 0
+        self._next = 0
+
+        self.stable_index: Optional[int] = None
+        self.stable_since: Optional[float] = None
+        self.last_update = 0.0
+
+        # Estadísticas
+        self.updates = 0
+        self.transitions = 0
+
+    def reset(self):
+        """Olvidar el historial (sin mano, cambio de modelo o de usuario)"""
+        self._buffer = None
+        self._ema = None
+        self._count = 0
+        self._next = 0
+        self.stable_index = None
+        self.stable_since = None
+
+    def update(self, probabilities, class_names: Sequence[str],
+               timestamp: Optional[float] = None) -> Dict[str, Any]:
+        """
+        Añadir el vector de probabilidades de un frame
+
+        Args:
+            probabilities: Vector de probabilidades del reconocedor
+            class_names: Letras indexadas como el vector
+            timestamp: Segundos (time.time() por defecto)
+
+        Returns:
+            dict: Estado de estabilidad tras el frame (ver get_info)
+        """
+        timestamp = time.time() if timestamp is None else timestamp
+        probabilities = np.asarray(probabilities, dtype=np.float32).reshape(-1)
+        if self._buffer is None or list(class_names) != self.class_names \
+                or probabilities.shape[0] != self._buffer.shape[1]:
+            # Primer frame o modelo distinto: el historial anterior no es comparable
+            self.reset()
+            self.class_names = list(class_names)
+            self._buffer = np.zeros((self.window, probabilities.shape[0]), dtype=np.float32)
+            self._ema = probabilities.copy()
+        else:
+            self._ema += self.ema_alpha * (probabilities - self._ema)
+
+        self._buffer[self._next] = probabilities
+        self._next = (self._next + 1) % self.window
+        self._count = min(self._count + 1, self.window)
+        self.updates += 1
+        self.last_update = timestamp
+
+        votes = np.bincount(np.argmax(self._buffer[:self._count], axis=1), minlength=self._buffer.shape[1])
+        candidate = int(np.argmax(self._ema))
+
+        if self.stable_index is not None and self._ema[self.stable_index] < self.exit_threshold:
+            self.stable_index = None
+            self.stable_since = None
+        if (candidate != self.stable_index and self._ema[candidate] >= self.enter_threshold
+                and votes[candidate] >= self.min_votes and candidate < len(self.class_names)):
+            self.stable_index = candidate
+            self.stable_since = timestamp
+            self.transitions += 1
+
+        return self.get_info(timestamp)
+
+    @property
+    def is_stable(self) -> bool:
+        return self.stable_index is not None
+
+    @property
+    def stable_letter(self) -> Optional[str]:
+        return self.class_names[self.stable_index] if self.stable_index is not None else None
+
+    def get_info(self, timestamp: Optional[float] = None) -> Dict[str, Any]:
+        """
+        Estado de estabilidad para la respuesta de detección
+
+        Returns:
+            dict: stable, letter, confidence (EMA), votes, hold_ms y message
+        """
+        timestamp = time.time() if timestamp is None else timestamp
+        if self._ema is None:
+            return {'stable': False, 'letter': None, 'confidence': 0.0, 'votes': 0,
+                    'window': self.window, 'hold_ms': 0, 'message': 'Analizando estabilidad...'}
+
+        if self.stable_index is not None:
+            index = self.stable_index
+        else:
+            index = int(np.argmax(self._ema))
+        votes = int(np.count_nonzero(np.argmax(self._buffer[:self._count], axis=1) == index))
+        letter = self.class_names[index] if index < len(self.class_names) else None
+
+        if self.stable_index is not None:
+            hold_ms = int((timestamp - self.stable_since) * 1000)
+            message = f'Letra {letter} estable ({hold_ms / 1000:.1f} s)'
+        else:
+            hold_ms = 0
+            message = f'Mantenga la posición ({min(votes, self.min_votes)}/{self.min_votes})' if letter else 'Analizando estabilidad...'
+
+        return {
+            'stable': self.stable_index is not None,
+            'letter': letter,
+            'confidence': round(float(self._ema[index]), 4),
+            'votes': votes,
+            'window': self.window,
+            'hold_ms': hold_ms,
+            'message': message
+        }
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            'stability_updates': self.updates,
+            'stability_transitions': self.transitions,
+            'stable_letter': self.stable_letter
+        }
@@ -0,0 +1,461 @@
+"""
+Pool de procesos de inferencia con entrega de frames por memoria compartida.
+Cada proceso tiene su propio HandDetector y reconocedor, así MediaPipe y el CNN
+no compiten por el GIL del proceso web.
+"""
+
+import atexit
+import itertools
+import os
+import socket
+import subprocess
+import sys
+import threading
+import time
+import zlib
+from collections import deque
+from dataclasses import dataclass
+from multiprocessing.connection import Connection
+from multiprocessing.shared_memory import SharedMemory
+from typing import Any, Dict, Optional, Tuple
+
+import numpy as np
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+
+# Ventana (s) para la utilización reciente de cada trabajador
+UTILIZATION_WINDOW = 10.0
+
+
+@dataclass
+class WorkerResult:
+    """
+    Resultado de un frame procesado en un trabajador
+
+    Attributes:
+        analysis: FrameAnalysis en coordenadas del frame completo (sin results de MediaPipe)
+        prediction: PredictionResult o None si no hubo mano o predicción
+        hand_region_size: (ancho, alto) del recorte usado por el CNN o None
+        worker_id: Trabajador que procesó el frame
+        tier: Reconocedor usado ('full' o 'fast')
+        gate_result: Resultado de la compuerta de movimiento del trabajador
+            ('hit', 'moved', 'expired', 'empty') o None si no se consultó
+    """
+    analysis: Any
+    prediction: Any
+    hand_region_size: Optional[Tuple[int, int]]
+    worker_id: int
+    tier: str = 'full'
+    gate_result: Optional[str] = None
+
+    @property
+    def reused(self) -> bool:
+        """Si la predicción es la anterior de la sesión (mano quieta)"""
+        return self.gate_result == 'hit'
+
+
+class _PendingFrame:
+    """Frame enviado a un trabajador en espera de su resultado."""
+
+    __slots__ = ('event', 'result')
+
+    def __init__(self):
+        self.event = threading.Event()
+        self.result = None
+
+
+class _Worker:
+    """Proceso trabajador y su anillo de ranuras en memoria compartida."""
+
+    def __init__(self, worker_id, num_slots, slot_bytes):
+        self.worker_id = worker_id
+        self.num_slots = num_slots
+        self.slot_bytes = slot_bytes
+        self.shm = SharedMemory(create=True, size=num_slots * slot_bytes)
+
+        self.process = None
+        self.conn = None
+        self.ready = False
+        self.warmup_ms = None
+        self.model_version = None
+        self.send_lock = threading.Lock()
+        self.state_lock = threading.Lock()
+        self.pending: Dict[int, _PendingFrame] = {}
+        self.free_slots = deque(range(num_slots))
+        # Se incrementa en cada caída para descartar ranuras tomadas del proceso anterior
+        self.generation = 0
+
+        # Estadísticas
+        self.started_at = None
+        self.restarts = 0
+        self.frames = 0
+        self.errors = 0
+        self.busy_time = 0.0
+        self.recent_busy = deque()
+
+    def take_slot(self) -> Optional[Tuple[int, int]]:
+        """Siguiente ranura libre del anillo y generación actual, o None si están todas ocupadas"""
+        with self.state_lock:
+            if not self.ready or not self.free_slots:
+                return None
+            return self.free_slots.popleft(), self.generation
+
+    def frame_view(self, slot, shape):
+        return np.ndarray(shape, dtype=np.uint8, buffer=self.shm.buf, offset=slot * self.slot_bytes)
+
+
+class InferenceWorkerPool:
+    """
+    Pool de N procesos de inferencia con despacho por sesión
+
+    - Cada sesión se asigna siempre al mismo trabajador (crc32 de la clave),
+      así el tracking de MediaPipe y la ventana de la mano siguen calientes
+    - El proceso web copia el frame decodificado en una ranura libre del
+      anillo de memoria compartida del trabajador y solo envía su índice
+    - Un hilo lector por trabajador recibe los resultados y, si el proceso
+      muere, falla sus peticiones en curso y lo vuelve a lanzar
+    - Los procesos se lanzan al primer uso (no en el proceso del reloader)
+    """
+
+    def __init__(self,
+                 num_workers: int = 2,
+                 slots_per_worker: int = 4,
+                 max_frame_shape: Tuple[int, int, int] = (480, 640, 3),
+                 max_sessions_per_worker: int = 16,
+                 request_timeout: float = 5.0):
+        """
+        Args:
+            num_workers: Número de procesos trabajadores
+            slots_per_worker: Ranuras de frame en memoria compartida por trabajador
+            max_frame_shape: (alto, ancho, canales) máximo de los frames
+            max_sessions_per_worker: Detectores vivos por trabajador
+            request_timeout: Tiempo máximo de espera de un resultado (s)
+        """
+        self.num_workers = max(1, int(num_workers))
+        self.slots_per_worker = max(1, int(slots_per_worker))
+        self.max_frame_shape = tuple(max_frame_shape)
+        self.slot_bytes = int(np.prod(self.max_frame_shape))
+        self.max_sessions_per_worker = int(max_sessions_per_worker)
+        self.request_timeout = float(request_timeout)
+
+        self._workers = []
+        self._request_ids = itertools.count(1)
+        self._start_lock = threading.Lock()
+        self._started = False
+        self._running = False
+        # Versión del CNN del registro que usan los trabajadores: (versión, modelo, mapeo) o None (MODEL_PATH)
+        self._model = None
+
+        # Estadísticas globales
+        self.slot_waits = 0
+        self.timeouts = 0
+        self.fallbacks = 0
+
+    # ------------------------------------------------------------------
+    # Ciclo de vida
+    # ------------------------------------------------------------------
+
+    def start(self):
+        """Crear la memoria compartida y lanzar los trabajadores (idempotente)"""
+        with self._start_lock:
+            if self._started:
+                return
+            self._started = True
+            self._running = True
+            atexit.register(self.shutdown)
+            for worker_id in range(self.num_workers):
+                worker = _Worker(worker_id, self.slots_per_worker, self.slot_bytes)
+                self._workers.append(worker)
+                threading.Thread(
+                    target=self._supervise, args=(worker,),
+                    name=f'inference-worker-{worker_id}', daemon=True
+                ).start()
+            print(f"Pool de inferencia: {self.num_workers} procesos, "
+                  f"{self.slots_per_worker} ranuras de {self.slot_bytes // 1024} KB por proceso")
+
+    def _launch(self, worker: _Worker):
+        """Lanzar el proceso de un trabajador conectado por un socketpair"""
+        env = dict(os.environ)
+        model = self._model
+        if model is not None:
+            # Un trabajador reiniciado arranca directamente con la versión activa
+            env['MODEL_PATH'], env['CLASS_MAPPING_PATH'] = model[1], model[2]
+        parent_sock, child_sock = socket.socketpair()
+        try:
+            process = subprocess.Popen(
+                [sys.executable, '-m', 'src.inference_worker',
+                 '--fd', str(child_sock.fileno()),
+                 '--shm', worker.shm.name,
+                 '--slot-bytes', str(worker.slot_bytes),
+                 '--max-sessions', str(self.max_sessions_per_worker)],
+                cwd=PROJECT_ROOT,
+                env=env,
+                pass_fds=(child_sock.fileno(),)
+            )
+        finally:
+            child_sock.close()
+        worker.process = process
+        worker.conn = Connection(parent_sock.detach())
+        worker.model_version = model[0] if model is not None else None
+
+    def _supervise(self, worker: _Worker):
+        """Hilo lector de un trabajador: entrega resultados y reinicia el proceso si muere"""
+        while self._running:
+            try:
+                self._launch(worker)
+            except Exception as e:
+                print(f"Error lanzando trabajador de inferencia {worker.worker_id}: {e}")
+                time.sleep(5.0)
+                continue
+
+            launched_at = time.monotonic()
+            try:
+                while True:
+                    message = worker.conn.recv()
+                    if message[0] == 'result':
+                        self._deliver(worker, *message[1:])
+                    elif message[0] == 'ready':
+                        with worker.state_lock:
+                            worker.ready = True
+                            worker.warmup_ms = message[2].get('warmup_ms')
+                            if worker.started_at is None:
+                                worker.started_at = time.monotonic()
+                        print(f"Trabajador de inferencia {worker.worker_id} listo (pid {message[1]}, "
+                              f"{message[2].get('recognizer_mode')}, calentamiento "
+                              f"{message[2].get('warmup_ms')} ms)")
+                        model = self._model
+                        if model is not None and model[0] != worker.model_version:
+                            # Se cambió de versión mientras el proceso arrancaba
+                            with worker.send_lock:
+                                worker.conn.send(('load_model',) + model)
+                    elif message[0] == 'model_loaded':
+                        _, version, error = message
+                        if error:
+                            print(f"Trabajador de inferencia {worker.worker_id} no cargó el modelo {version}: {error}")
+                        else:
+                            worker.model_version = version
+            except (EOFError, OSError):
+                pass
+
+            self._handle_exit(worker)
+            if not self._running:
+                break
+
+            worker.restarts += 1
+            print(f"Trabajador de inferencia {worker.worker_id} terminó "
+                  f"(código {worker.process.returncode}); reiniciando")
+            # Evitar reinicios en bucle si el proceso falla al arrancar
+            if time.monotonic() - launched_at < 5.0:
+                time.sleep(2.0)
+
+    def _deliver(self, worker: _Worker, request_id, slot, payload, error, busy_s):
+        """Registrar el resultado de un frame y despertar a la petición"""
+        now = time.monotonic()
+        with worker.state_lock:
+            worker.free_slots.append(slot)
+            pending = worker.pending.pop(request_id, None)
+            worker.frames += 1
+            worker.busy_time += busy_s
+            worker.recent_busy.append((now, busy_s))
+            while worker.recent_busy and now - worker.recent_busy[0][0] > UTILIZATION_WINDOW:
+                worker.recent_busy.popleft()
+            if error:
+                worker.errors += 1
+
+        if error:
+            print(f"Error en trabajador de inferencia {worker.worker_id}: {error}")
+        if pending is not None and payload is not None:
+            pending.result = WorkerResult(
+                analysis=payload['analysis'],
+                prediction=payload['prediction'],
+                hand_region_size=payload['hand_region_size'],
+                worker_id=worker.worker_id,
+                tier=payload['tier'],
+                gate_result=payload['gate_result']
+            )
+        if pending is not None:
+            pending.event.set()
+
+    def _handle_exit(self, worker: _Worker):
+        """Fallar las peticiones en curso y liberar las ranuras de un trabajador caído"""
+        with worker.state_lock:
+            worker.ready = False
+            pending = list(worker.pending.values())
+            worker.pending.clear()
+            worker.free_slots = deque(range(worker.num_slots))
+            worker.generation += 1
+        for item in pending:
+            item.event.set()
+
+        try:
+            worker.conn.close()
+        except Exception:
+            pass
+        if worker.process.poll() is None:
+            worker.process.kill()
+        worker.process.wait()
+
+    def shutdown(self):
+        """Detener los trabajadores y liberar la memoria compartida (idempotente)"""
+        if not self._running:
+            return
+        self._running = False
+        for worker in self._workers:
+            try:
+                with worker.send_lock:
+                    worker.conn.send(('stop',))
+            except Exception:
+                pass
+        for worker in self._workers:
+            if worker.process is not None:
+                try:
+                    worker.process.wait(timeout=5.0)
+                except subprocess.TimeoutExpired:
+                    worker.process.kill()
+            try:
+                worker.shm.close()
+                worker.shm.unlink()
+            except (BufferError, FileNotFoundError):
+                pass
+
+    # ------------------------------------------------------------------
+    # Despacho
+    # ------------------------------------------------------------------
+
+    def worker_for(self, session_key: str) -> _Worker:
+        """Trabajador asignado a una sesión (estable entre reinicios)"""
+        return self._workers[zlib.crc32(session_key.encode('utf-8')) % self.num_workers]
+
+    def analyze(self, session_key: str, frame, top_k: int = 3, max_input_width: Optional[int] = None,
+                tier: str = 'full', motion_gate: bool = False, stable: bool = False) -> Optional[WorkerResult]:
+        """
+        Detectar la mano y reconocer la letra de un frame en el trabajador de la sesión
+
+        Args:
+            session_key: Identificador del stream
+            frame: Frame BGR uint8 no mayor que max_frame_shape
+            top_k: Número de predicciones a conservar
+            max_input_width: Ancho máximo de la entrada de MediaPipe (peldaño de calidad)
+            tier: Reconocedor del peldaño ('full' o 'fast')
+            motion_gate: Si el trabajador puede reutilizar la predicción anterior de la sesión
+            stable: Si la letra del stream está estable (alarga la reutilización)
+
+        Returns:
+            WorkerResult o None si el trabajador no está listo, no hay ranura libre,
+            el frame no cabe, el proceso cayó o expiró el tiempo (el llamador
+            debe procesar el frame en el propio proceso)
+        """
+        self.start()
+        if frame.dtype != np.uint8 or frame.nbytes > self.slot_bytes:
+            self.fallbacks += 1
+            return None
+
+        worker = self.worker_for(session_key)
+        taken = worker.take_slot()
+        if taken is None:
+            self.slot_waits += 1
+            self.fallbacks += 1
+            return None
+        slot, generation = taken
+
+        worker.frame_view(slot, frame.shape)[...] = frame
+
+        request_id = next(self._request_ids)
+        pending = _PendingFrame()
+        with worker.state_lock:
+            if generation != worker.generation:
+                # El proceso cayó mientras se copiaba el frame
+                self.fallbacks += 1
+                return None
+            worker.pending[request_id] = pending
+        try:
+            with worker.send_lock:
+                worker.conn.send(('analyze', request_id, slot, frame.shape, session_key, top_k, {
+                    'max_input_width': max_input_width,
+                    'tier': tier,
+                    'motion_gate': motion_gate,
+                    'stable': stable
+                }))
+        except (OSError, ValueError):
+            # El hilo lector detectará la caída y liberará la ranura
+            with worker.state_lock:
+                worker.pending.pop(request_id, None)
+            self.fallbacks += 1
+            return None
+
+        # Si expira, la ranura se libera cuando llegue el resultado
+        if not pending.event.wait(self.request_timeout):
+            self.timeouts += 1
+            return None
+        return pending.result
+
+    def release(self, session_key: str):
+        """Liberar el detector de una sesión en su trabajador"""
+        if not self._started:
+            return
+        worker = self.worker_for(session_key)
+        try:
+            with worker.send_lock:
+                if worker.ready:
+                    worker.conn.send(('release', session_key))
+        except (OSError, ValueError):
+            pass
+
+    def load_model(self, version: str, model_path: str, class_mapping_path: str):
+        """
+        Cambiar el CNN de los trabajadores a otra versión del registro
+
+        Cada trabajador carga y calienta el modelo nuevo por su cuenta; los que
+        se reinicien después arrancan ya con esta versión.
+        """
+        self._model = (version, model_path, class_mapping_path)
+        if not self._started:
+            return
+        for worker in self._workers:
+            try:
+                with worker.send_lock:
+                    if worker.ready:
+                        worker.conn.send(('load_model', version, model_path, class_mapping_path))
+            except (OSError, ValueError):
+                pass
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Estadísticas del pool y utilización por trabajador
+
+        Returns:
+            Dict con totales y, por trabajador, pid, estado, frames y utilización
+        """
+        now = time.monotonic()
+        workers = []
+        for worker in self._workers:
+            with worker.state_lock:
+                uptime = (now - worker.started_at) if worker.started_at else 0.0
+                recent = sum(busy for ts, busy in worker.recent_busy if now - ts <= UTILIZATION_WINDOW)
+                workers.append({
+                    'worker_id': worker.worker_id,
+                    'pid': worker.process.pid if worker.process else None,
+                    'alive': bool(worker.process and worker.process.poll() is None),
+                    'ready': worker.ready,
+                    'warmup_ms': worker.warmup_ms,
+                    'model_version': worker.model_version,
+                    'restarts': worker.restarts,
+                    'frames': worker.frames,
+                    'errors': worker.errors,
+                    'in_flight': len(worker.pending),
+                    'free_slots': len(worker.free_slots),
+                    'busy_s': round(worker.busy_time, 3),
+                    'utilization': round(worker.busy_time / uptime, 3) if uptime else 0.0,
+                    'recent_utilization': round(recent / min(UTILIZATION_WINDOW, uptime), 3) if uptime else 0.0
+                })
+
+        return {
+            'started': self._started,
+            'num_workers': self.num_workers,
+            'slots_per_worker': self.slots_per_worker,
+            'slot_bytes': self.slot_bytes,
+            'timeouts': self.timeouts,
+            'slot_waits': self.slot_waits,
+            'fallbacks': self.fallbacks,
+            'workers': workers
+        }
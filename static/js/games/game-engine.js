@@ -37,6 +37,9 @@ class GameEngine {
       videoHeight: options.videoHeight || 480,
       enableVisualFeedback: options.enableVisualFeedback !== false, // Feedback visual habilitado por defecto
       enableSounds: options.enableSounds || false, // Sonidos deshabilitados por defecto
+      // 'client': MediaPipe en el navegador y solo landmarks al servidor; 'server': frames completos
+      handTracking: options.handTracking ||
+        (new URLSearchParams(window.location.search).get('tracking') === 'client' ? 'client' : 'server'),
       ...options
     };
 
@@ -54,6 +57,13 @@ class GameEngine {
     this.detectionLoopId = null;
     this.lastDetectionTime = 0; // Para debounce
 
+    // Stream WebSocket persistente para los frames (HTTP POST como respaldo)
+    // (FrameSocket viene de static/js/hand-client.js)
+    this.frameSocket = new FrameSocket();
+
+    // Seguimiento de la mano en el navegador (modo handTracking: 'client')
+    this.handClient = null;
+
     // Sistema de mensajes de estado
     this.statusMessage = '';
     this.statusElement = null;
@@ -164,6 +174,8 @@ class GameEngine {
       clearTimeout(this.detectionLoopId);
       this.detectionLoopId = null;
     }
+
+    this.frameSocket.close();
     
     console.log('Detection stopped');
   }
@@ -194,18 +206,30 @@ class GameEngine {
         return;
       }
 
-      // Capturar frame del video
-      const imageData = this.captureFrame();
+      // Modo cliente: detectar la mano en el navegador y enviar solo landmarks
+      let result = this.config.handTracking === 'client' ? await this.detectWithBrowserHands() : null;
 
-      if (!imageData || imageData === 'data:,') {
-        console.log('Invalid image data, retrying...');
-        this.updateStatus('waiting', 'Preparando detección...');
-        this.detectionLoopId = setTimeout(() => this.detectLoop(), 500);
-        return;
+      if (!result) {
+        // Capturar frame del video
+        const imageData = await this.captureFrame();
+
+        if (!imageData || imageData === 'data:,') {
+          console.log('Invalid image data, retrying...');
+          this.updateStatus('waiting', 'Preparando detección...');
+          this.detectionLoopId = setTimeout(() => this.detectLoop(), 500);
+          return;
+        }
+
+        // Detectar gesto usando API existente
+        result = await this.detectGesture(imageData);
       }
 
-      // Detectar gesto usando API existente
-      const result = await this.detectGesture(imageData);
+      // Frame descartado por sobrecarga: esperar lo sugerido por el servidor
+      if (this.isOverloaded(result)) {
+        const retryMs = result.retry_after_ms || 1000;
+        this.detectionLoopId = setTimeout(() => this.detectLoop(), Math.max(this.config.detectionInterval, retryMs));
+        return;
+      }
 
       // Procesar resultado y proporcionar feedback visual
       if (result) {
@@ -248,10 +272,11 @@ class GameEngine {
   }
 
   /**
-   * Capturar frame actual del video como imagen base64
-   * @returns {string} - Imagen en formato base64
+   * Capturar frame actual del video como JPEG binario
+   * Usa canvas.toBlob (sin base64); si no está disponible devuelve un data URL
+   * @returns {Promise<Blob|string>} - Imagen JPEG como Blob o data URL base64
    */
-  captureFrame() {
+  async captureFrame() {
     try {
       if (!this.canvas) {
         this.canvas = document.createElement('canvas');
@@ -262,6 +287,13 @@ class GameEngine {
       this.canvas.height = this.video.videoHeight;
       this.ctx.drawImage(this.video, 0, 0);
 
+      if (typeof this.canvas.toBlob === 'function') {
+        const blob = await new Promise(resolve => this.canvas.toBlob(resolve, 'image/jpeg', 0.8));
+        if (blob) {
+          return blob;
+        }
+      }
+
       return this.canvas.toDataURL('image/jpeg', 0.8);
     } catch (error) {
       console.error('Error capturing frame:', error);
@@ -270,15 +302,32 @@ class GameEngine {
   }
 
   /**
-   * Detectar gesto usando el endpoint /detect_gesture existente
-   * Reutiliza la API existente sin modificarla
+   * Detectar gesto usando el endpoint /detect_gesture
+   * Envía el JPEG como cuerpo binario; los data URL se envían en el JSON original
    * 
-   * @param {string} imageData - Imagen en formato base64
+   * @param {Blob|string} imageData - Imagen JPEG como Blob o data URL base64
    * @returns {Promise<Object>} - Resultado de la detección
    */
   async detectGesture(imageData) {
     try {
-      const response = await fetch('/detect_gesture', {
+      const isBlob = typeof Blob !== 'undefined' && imageData instanceof Blob;
+
+      // Preferir el stream WebSocket; si no está abierto se usa el POST de siempre
+      const streamResult = isBlob ? await this.frameSocket.detect(imageData) : null;
+      if (streamResult) {
+        if (streamResult.success) {
+          streamResult.timestamp = Date.now();
+        }
+        return streamResult;
+      }
+
+      const response = await fetch('/detect_gesture', isBlob ? {
+        method: 'POST',
+        headers: {
+          'Content-Type': imageData.type || 'image/jpeg',
+        },
+        body: imageData
+      } : {
         method: 'POST',
         headers: {
           'Content-Type': 'application/json',
@@ -286,6 +335,11 @@ class GameEngine {
         body: JSON.stringify({ image: imageData })
       });
 
+      if (response.status === 429 || response.status === 503) {
+        // Servidor sobrecargado o cargando modelos: el JSON trae retry_after_ms
+        return await response.json();
+      }
+
       if (!response.ok) {
         console.error('HTTP Error:', response.status, response.statusText);
         return null;
@@ -306,6 +360,41 @@ class GameEngine {
     }
   }
 
+  /**
+   * Indica si el servidor descartó el frame por sobrecarga (429 / 'overloaded')
+   * o porque aún está cargando los modelos (503 / 'warming_up')
+   * @param {Object|null} result - Resultado de la detección
+   * @returns {boolean}
+   */
+  isOverloaded(result) {
+    return Boolean(result && (result.error === 'overloaded' || result.error === 'warming_up'));
+  }
+
+  /**
+   * Detectar la mano en el navegador y clasificar sus landmarks en /classify_landmarks
+   * Usa HandClient de static/js/hand-client.js
+   * @returns {Promise<Object|null>} - Resultado o null si hay que enviar el frame completo
+   */
+  async detectWithBrowserHands() {
+    try {
+      if (!this.handClient) {
+        this.handClient = new HandClient(this.video);
+      }
+      this.handClient.video = this.video;
+
+      const result = await this.handClient.detect();
+      if (result && result.success) {
+        result.timestamp = Date.now();
+      }
+      return result;
+
+    } catch (error) {
+      console.warn('Browser hand tracking not available, sending frames to the server:', error);
+      this.config.handTracking = 'server';
+      return null;
+    }
+  }
+
   /**
    * Iniciar sesión de juego
    */
@@ -512,6 +601,11 @@ class GameEngine {
     this.stopDetection();
     this.stopCamera();
     this.reset();
+
+    if (this.handClient) {
+      this.handClient.close();
+      this.handClient = null;
+    }
     
     // Limpiar referencias
     this.video = null;
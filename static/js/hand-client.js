@@ -0,0 +1,278 @@
+/**
+ * Cliente de detección compartido por la página principal y los mini-juegos
+ *
+ * HandClient: MediaPipe Hands en el navegador y solo landmarks a /classify_landmarks
+ * FrameSocket: WebSocket persistente /ws/detect para los frames (HTTP POST como respaldo)
+ */
+
+class HandClient {
+    /**
+     * @param {HTMLVideoElement} video - Video de la cámara
+     */
+    constructor(video) {
+        this.video = video;
+        this.hands = null;
+        this.results = null;
+        this.sendHandCrop = false;
+    }
+
+    /**
+     * Cargar MediaPipe Hands en el navegador (una sola vez)
+     * @returns {Promise<Object>} - Instancia de Hands lista para procesar frames
+     */
+    async load() {
+        if (this.hands) return this.hands;
+
+        const baseUrl = 'https://cdn.jsdelivr.net/npm/@mediapipe/hands';
+        if (typeof Hands === 'undefined') {
+            await new Promise((resolve, reject) => {
+                const script = document.createElement('script');
+                script.src = `${baseUrl}/hands.js`;
+                script.crossOrigin = 'anonymous';
+                script.onload = resolve;
+                script.onerror = reject;
+                document.head.appendChild(script);
+            });
+        }
+
+        const hands = new Hands({ locateFile: (file) => `${baseUrl}/${file}` });
+        hands.setOptions({
+            maxNumHands: 1,
+            modelComplexity: 0,
+            minDetectionConfidence: 0.5,
+            minTrackingConfidence: 0.5
+        });
+        hands.onResults((results) => {
+            this.results = results;
+        });
+        await hands.initialize();
+
+        this.hands = hands;
+        return hands;
+    }
+
+    /**
+     * Detectar la mano en el navegador y clasificar sus landmarks en /classify_landmarks
+     * Lanza una excepción si MediaPipe no se puede cargar en este navegador
+     * @returns {Promise<Object|null>} - Resultado de la clasificación (null si falla la petición)
+     */
+    async detect() {
+        const hands = await this.load();
+        this.results = null;
+        await hands.send({ image: this.video });
+
+        const results = this.results;
+        if (!results || !results.multiHandLandmarks || results.multiHandLandmarks.length === 0) {
+            // Sin mano no hace falta consultar al servidor
+            return {
+                success: false,
+                message: 'No se detectaron manos en la imagen',
+                letter: null,
+                gesture: null,
+                confidence: 0.0,
+                hands_detected: false,
+                error: 'no_hands_detected'
+            };
+        }
+
+        const landmarks = results.multiHandLandmarks[0].map(point => [point.x, point.y, point.z]);
+        const handedness = results.multiHandedness && results.multiHandedness[0]
+            ? results.multiHandedness[0].label
+            : null;
+
+        let result = await this.classifyLandmarks(landmarks, handedness);
+        if (result && result.error === 'hand_crop_required' && !this.sendHandCrop) {
+            // El servidor usa el CNN: desde ahora se adjunta un recorte pequeño de la mano
+            this.sendHandCrop = true;
+            result = await this.classifyLandmarks(landmarks, handedness);
+        }
+        return result;
+    }
+
+    /**
+     * Enviar landmarks (y opcionalmente el recorte de la mano) a /classify_landmarks
+     * @param {Array} landmarks - 21 puntos [x, y, z] normalizados
+     * @param {string|null} handedness - 'Left' o 'Right'
+     * @returns {Promise<Object|null>} - Resultado de la clasificación
+     */
+    async classifyLandmarks(landmarks, handedness) {
+        const payload = {
+            landmarks: landmarks,
+            handedness: handedness,
+            image_width: this.video.videoWidth,
+            image_height: this.video.videoHeight
+        };
+        if (this.sendHandCrop) {
+            payload.hand_crop = this.cropHandImage(landmarks);
+        }
+
+        try {
+            const response = await fetch('/classify_landmarks', {
+                method: 'POST',
+                headers: {
+                    'Content-Type': 'application/json'
+                },
+                body: JSON.stringify(payload)
+            });
+            return await response.json();
+        } catch (error) {
+            console.error('Error enviando landmarks:', error);
+            return null;
+        }
+    }
+
+    /**
+     * Recortar la mano del video como JPEG pequeño
+     * Usa el mismo margen del 20% que extract_hand_region en el servidor
+     * @param {Array} landmarks - 21 puntos [x, y, z] normalizados
+     * @param {number} maxSize - Lado máximo del recorte en píxeles
+     * @returns {string} - Data URL JPEG
+     */
+    cropHandImage(landmarks, maxSize = 160) {
+        const width = this.video.videoWidth;
+        const height = this.video.videoHeight;
+        const xs = landmarks.map(point => point[0] * width);
+        const ys = landmarks.map(point => point[1] * height);
+
+        const marginX = (Math.max(...xs) - Math.min(...xs)) * 0.2;
+        const marginY = (Math.max(...ys) - Math.min(...ys)) * 0.2;
+        const minX = Math.max(0, Math.min(...xs) - marginX);
+        const minY = Math.max(0, Math.min(...ys) - marginY);
+        const cropWidth = Math.max(1, Math.min(width, Math.max(...xs) + marginX) - minX);
+        const cropHeight = Math.max(1, Math.min(height, Math.max(...ys) + marginY) - minY);
+
+        const scale = Math.min(1, maxSize / Math.max(cropWidth, cropHeight));
+        const cropCanvas = document.createElement('canvas');
+        cropCanvas.width = Math.round(cropWidth * scale);
+        cropCanvas.height = Math.round(cropHeight * scale);
+        cropCanvas.getContext('2d').drawImage(
+            this.video, minX, minY, cropWidth, cropHeight, 0, 0, cropCanvas.width, cropCanvas.height
+        );
+        return cropCanvas.toDataURL('image/jpeg', 0.7);
+    }
+
+    /**
+     * Liberar MediaPipe Hands
+     */
+    close() {
+        if (this.hands) {
+            this.hands.close();
+            this.hands = null;
+        }
+    }
+}
+
+class FrameSocket {
+    /**
+     * @param {number} replyTimeoutMs - Espera máxima de la respuesta a un frame
+     */
+    constructor(replyTimeoutMs = 2000) {
+        this.replyTimeoutMs = replyTimeoutMs;
+        this.socket = null;
+        this.pending = null;
+        this.unavailable = false;
+    }
+
+    /**
+     * Hay un frame en vuelo esperando respuesta
+     * @returns {boolean}
+     */
+    get busy() {
+        return Boolean(this.pending);
+    }
+
+    /**
+     * Abrir (o reutilizar) el WebSocket /ws/detect de esta cámara
+     * El servidor mantiene el detector y el cache de la conexión mientras esté abierta
+     * @returns {WebSocket|null} - Socket o null si el servidor no lo soporta
+     */
+    open() {
+        if (this.unavailable || typeof WebSocket === 'undefined') return null;
+        if (this.socket) return this.socket;
+
+        const protocol = window.location.protocol === 'https:' ? 'wss:' : 'ws:';
+        const socket = new WebSocket(`${protocol}//${window.location.host}/ws/detect`);
+        let opened = false;
+
+        socket.onopen = () => {
+            opened = true;
+        };
+
+        socket.onmessage = (event) => {
+            // Respuesta tardía de un socket ya cerrado por timeout
+            if (this.socket !== socket) return;
+            const pending = this.takePending();
+            if (!pending) return;
+            try {
+                pending.resolve(JSON.parse(event.data));
+            } catch (error) {
+                pending.resolve(null);
+            }
+        };
+
+        socket.onclose = () => {
+            if (this.socket !== socket) return;
+            // Si nunca llegó a abrirse, el servidor no tiene WebSocket: quedarse en HTTP
+            if (!opened) {
+                this.unavailable = true;
+                console.warn('WebSocket no disponible, usando HTTP para la detección');
+            }
+            this.socket = null;
+            const pending = this.takePending();
+            if (pending) pending.resolve(null);
+        };
+
+        this.socket = socket;
+        return socket;
+    }
+
+    /**
+     * Enviar un frame por el WebSocket y esperar su resultado
+     * Si la respuesta no llega en replyTimeoutMs se cierra el socket y se devuelve null
+     * @param {Blob} blob - Imagen JPEG
+     * @returns {Promise<Object|null>} - Resultado o null si hay que usar HTTP
+     */
+    detect(blob) {
+        const socket = this.open();
+        if (!socket || socket.readyState !== WebSocket.OPEN || this.pending) {
+            return Promise.resolve(null);
+        }
+
+        return new Promise((resolve) => {
+            const timer = setTimeout(() => {
+                if (this.pending !== pending) return;
+                console.warn('Sin respuesta del WebSocket, reabriendo la conexión');
+                this.close();
+            }, this.replyTimeoutMs);
+            const pending = { resolve, timer };
+            this.pending = pending;
+            socket.send(blob);
+        });
+    }
+
+    /**
+     * Quitar el frame en vuelo y cancelar su timeout
+     * @returns {Object|null} - Frame pendiente
+     */
+    takePending() {
+        const pending = this.pending;
+        this.pending = null;
+        if (pending) clearTimeout(pending.timer);
+        return pending;
+    }
+
+    /**
+     * Cerrar el WebSocket de frames; el frame en vuelo se resuelve con null
+     */
+    close() {
+        const socket = this.socket;
+        this.socket = null;
+        if (socket) socket.close();
+        const pending = this.takePending();
+        if (pending) pending.resolve(null);
+    }
+}
+
+// Exportar para uso global
+window.HandClient = HandClient;
+window.FrameSocket = FrameSocket;
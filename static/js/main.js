@@ -6,6 +6,20 @@ class GestureDetectionApp {
         this.isDetecting = false;
         this.stream = null;
         this.detectionInterval = null;
+        
+        // Stream WebSocket persistente para los frames (HTTP POST como respaldo)
+        // (FrameSocket viene de static/js/hand-client.js)
+        this.frameSocket = new FrameSocket();
+        
+        // Con el servidor sobrecargado (429 / 'overloaded') o cargando modelos (503 / 'warming_up')
+        // no se envían frames hasta esta hora
+        this.backoffUntil = 0;
+        
+        // Seguimiento de la mano en el navegador (?tracking=client): solo se envían landmarks
+        this.handTrackingMode = new URLSearchParams(window.location.search).get('tracking') === 'client' ? 'client' : 'server';
+        // (HandClient viene de static/js/hand-client.js)
+        this.handClient = new HandClient(this.video);
+        this.landmarkRequestPending = false;
         this.gestureHistory = [];
         this.maxHistorySize = 5;
         
@@ -358,6 +372,8 @@ class GestureDetectionApp {
             this.detectionInterval = null;
         }
         
+        this.frameSocket.close();
+        
         if (this.stream) {
             this.stream.getTracks().forEach(track => track.stop());
             this.stream = null;
@@ -380,6 +396,23 @@ class GestureDetectionApp {
     async captureAndDetect() {
         if (!this.isDetecting || !this.video.videoWidth) return;
         
+        // Un solo frame en vuelo por el WebSocket: descartar este si el anterior no ha vuelto
+        if (this.frameSocket.busy || this.landmarkRequestPending) return;
+        
+        // Respetar el tiempo de reintento que pidió el servidor
+        if (Date.now() < this.backoffUntil) return;
+        
+        // Modo cliente: MediaPipe en el navegador y solo landmarks al servidor
+        if (this.handTrackingMode === 'client') {
+            const result = await this.detectWithBrowserHands();
+            if (result) {
+                if (!this.handleOverload(result)) {
+                    this.handleDetectionResult(result);
+                }
+                return;
+            }
+        }
+        
         try {
             // Crear canvas temporal para capturar el frame
             const tempCanvas = document.createElement('canvas');
@@ -390,24 +423,34 @@ class GestureDetectionApp {
             // Dibujar el frame actual
             tempCtx.drawImage(this.video, 0, 0);
             
-            // Convertir a base64 para enviar al servidor
-            const imageData = tempCanvas.toDataURL('image/jpeg', 0.8);
+            // Enviar el JPEG como binario (sin base64); JSON solo si toBlob no está disponible
+            const request = await this.buildFrameRequest(tempCanvas);
+            
+            // Preferir el stream WebSocket; si no está abierto se usa el POST de siempre
+            if (request.body instanceof Blob) {
+                const result = await this.frameSocket.detect(request.body);
+                if (result) {
+                    if (!this.handleOverload(result)) {
+                        this.handleDetectionResult(result);
+                    }
+                    this.updateConnectionStatus(true);
+                    return;
+                }
+            }
             
             try {
-                const response = await fetch('/detect_gesture', {
-                    method: 'POST',
-                    headers: {
-                        'Content-Type': 'application/json'
-                    },
-                    body: JSON.stringify({
-                        image: imageData
-                    })
-                });
+                const response = await fetch('/detect_gesture', request);
                 
                 if (response.ok) {
                     const result = await response.json();
                     this.handleDetectionResult(result);
                     this.updateConnectionStatus(true);
+                } else if (response.status === 429 || response.status === 503) {
+                    const result = await response.json();
+                    if (!this.handleOverload(result, response.headers.get('Retry-After'))) {
+                        console.error('Error en la detección:', result.message || response.statusText);
+                        this.updateConnectionStatus(false);
+                    }
                 } else {
                     console.error('Error en la detección:', response.statusText);
                     this.updateConnectionStatus(false);
@@ -422,6 +465,64 @@ class GestureDetectionApp {
         }
     }
 
+    handleOverload(result, retryAfterHeader = null) {
+        if (!result || (result.error !== 'overloaded' && result.error !== 'warming_up')) return false;
+        
+        // El frame se descartó en el servidor: esperar lo sugerido antes del siguiente
+        const retryMs = result.retry_after_ms || (Number(retryAfterHeader) || 1) * 1000;
+        this.backoffUntil = Date.now() + retryMs;
+        return true;
+    }
+
+    async detectWithBrowserHands() {
+        this.landmarkRequestPending = true;
+        try {
+            const result = await this.handClient.detect();
+            this.updateConnectionStatus(Boolean(result));
+            return result;
+            
+        } catch (error) {
+            console.warn('MediaPipe en el navegador no disponible, enviando frames al servidor:', error);
+            this.handTrackingMode = 'server';
+            return null;
+        } finally {
+            this.landmarkRequestPending = false;
+        }
+    }
+
+    buildFrameRequest(canvas) {
+        return new Promise((resolve) => {
+            const jsonRequest = () => ({
+                method: 'POST',
+                headers: {
+                    'Content-Type': 'application/json'
+                },
+                body: JSON.stringify({
+                    image: canvas.toDataURL('image/jpeg', 0.8)
+                })
+            });
+            
+            if (typeof canvas.toBlob !== 'function') {
+                resolve(jsonRequest());
+                return;
+            }
+            
+            canvas.toBlob((blob) => {
+                if (!blob) {
+                    resolve(jsonRequest());
+                    return;
+                }
+                resolve({
+                    method: 'POST',
+                    headers: {
+                        'Content-Type': blob.type || 'image/jpeg'
+                    },
+                    body: blob
+                });
+            }, 'image/jpeg', 0.8);
+        });
+    }
+
     handleDetectionResult(result) {
         const currentTime = Date.now();
         
@@ -0,0 +1,6 @@
+"""Configuración de pytest: los módulos se importan como src.* desde la raíz del repo"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
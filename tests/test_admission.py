@@ -0,0 +1,113 @@
+"""Tests de la cola acotada con plazo de src/admission.py"""
+
+import threading
+import time
+
+import pytest
+
+from src.admission import AdmissionController, AdmissionRejected
+
+
+def hold_slot(controller, started, release):
+    """Ocupar un turno de procesamiento hasta que se libere release"""
+    with controller.admit():
+        started.set()
+        release.wait(5)
+
+
+def start_holder(controller):
+    started, release = threading.Event(), threading.Event()
+    thread = threading.Thread(target=hold_slot, args=(controller, started, release))
+    thread.start()
+    assert started.wait(5)
+    return thread, release
+
+
+def test_admits_up_to_max_concurrent():
+    controller = AdmissionController(max_concurrent=2, max_queue=0)
+    with controller.admit():
+        with controller.admit():
+            assert controller.in_flight == 2
+    stats = controller.get_stats()
+    assert stats['admitted'] == 2
+    assert stats['in_flight'] == 0
+    assert stats['avg_service_ms'] is not None
+
+
+def test_rejects_when_queue_is_full():
+    controller = AdmissionController(max_concurrent=1, max_queue=0, min_retry_ms=100)
+    thread, release = start_holder(controller)
+    try:
+        with pytest.raises(AdmissionRejected) as excinfo:
+            with controller.admit():
+                pass
+        assert excinfo.value.reason == 'queue_full'
+        assert excinfo.value.retry_after_ms >= 100
+    finally:
+        release.set()
+        thread.join()
+    assert controller.get_stats()['shed_queue_full'] == 1
+
+
+def test_queued_frame_is_dropped_after_deadline():
+    controller = AdmissionController(max_concurrent=1, max_queue=1, deadline_ms=50)
+    thread, release = start_holder(controller)
+    try:
+        started_at = time.monotonic()
+        with pytest.raises(AdmissionRejected) as excinfo:
+            with controller.admit():
+                pass
+        assert excinfo.value.reason == 'deadline'
+        assert time.monotonic() - started_at >= 0.05
+    finally:
+        release.set()
+        thread.join()
+    stats = controller.get_stats()
+    assert stats['shed_deadline'] == 1
+    assert stats['queue_depth'] == 0
+    assert stats['max_queue_depth'] == 1
+
+
+def test_queued_frame_runs_when_slot_frees():
+    controller = AdmissionController(max_concurrent=1, max_queue=1, deadline_ms=2000)
+    thread, release = start_holder(controller)
+    threading.Timer(0.05, release.set).start()
+    with controller.admit():
+        assert controller.in_flight == 1
+    thread.join()
+    stats = controller.get_stats()
+    assert stats['admitted'] == 2
+    assert stats['shed_ratio'] == 0.0
+    assert stats['avg_queue_wait_ms'] > 0
+
+
+def test_slot_is_released_when_processing_fails():
+    controller = AdmissionController(max_concurrent=1, max_queue=0)
+    with pytest.raises(RuntimeError):
+        with controller.admit():
+            raise RuntimeError('fallo del modelo')
+    with controller.admit():
+        pass
+    assert controller.get_stats()['admitted'] == 2
+
+
+def test_retry_after_is_clamped():
+    controller = AdmissionController(max_concurrent=1, min_retry_ms=100, max_retry_ms=500)
+    controller.service_time_ema = 0.0
+    assert controller.retry_after() == pytest.approx(0.1)
+    controller.service_time_ema = 10.0
+    assert controller.retry_after() == pytest.approx(0.5)
+
+
+def test_shed_ratio_counts_both_reasons():
+    controller = AdmissionController(max_concurrent=1, max_queue=0)
+    thread, release = start_holder(controller)
+    try:
+        for _ in range(3):
+            with pytest.raises(AdmissionRejected):
+                with controller.admit():
+                    pass
+    finally:
+        release.set()
+        thread.join()
+    assert controller.get_stats()['shed_ratio'] == 0.75
@@ -0,0 +1,108 @@
+"""Tests del formato de captura de src/capture_format.py"""
+
+import os
+
+import cv2
+import numpy as np
+import pytest
+
+from src.capture_format import CaptureReader, CaptureWriter
+
+
+def jpeg_bytes(value, size=(48, 64)):
+    frame = np.full((size[0], size[1], 3), value, dtype=np.uint8)
+    ok, buffer = cv2.imencode('.jpg', frame)
+    assert ok
+    return buffer.tobytes()
+
+
+def landmark_points(offset=0.0):
+    return [[0.1 + offset, 0.2, 0.0]] * 21
+
+
+def test_round_trip(tmp_path):
+    path = str(tmp_path / 'capture')
+    frames = [jpeg_bytes(value) for value in (10, 120, 240)]
+    with CaptureWriter(path, class_names=['A']) as writer:
+        writer.add(frames[0], landmarks=landmark_points(), handedness='Right', label='A', session='s1')
+        writer.add(frames[1], session='s1', timestamp=0.5)
+        writer.add(frames[2], landmarks=landmark_points(0.3), handedness='Left', label='B', session='s2')
+
+    with CaptureReader(path) as reader:
+        assert len(reader) == 3
+        assert [bytes(reader.frame_bytes(i)) for i in range(3)] == frames
+        assert reader.class_names == ['A', 'B']
+        assert reader.session_names == ['s1', 's2']
+        assert [reader.label(i) for i in range(3)] == ['A', None, 'B']
+        assert [reader.handedness_name(i) for i in range(3)] == ['Right', None, 'Left']
+        assert [reader.has_hand(i) for i in range(3)] == [True, False, True]
+        assert np.allclose(reader.landmarks[2][:, 0], 0.4)
+        assert np.isnan(reader.landmarks[1]).all()
+        assert list(reader.session_indices('s1')) == [0, 1]
+        assert list(reader.timestamps[:2]) == [0.0, 0.5]
+        assert reader.decode(1).shape == (48, 64, 3)
+
+        stats = reader.get_stats()
+        assert stats['frames_with_hand'] == 2
+        assert stats['labeled_frames'] == 2
+        assert stats['frames_per_class'] == {'A': 1, 'B': 1}
+
+
+def test_frames_are_split_into_chunks(tmp_path):
+    path = str(tmp_path / 'capture')
+    frames = [jpeg_bytes(value) for value in range(0, 250, 50)]
+    with CaptureWriter(path, chunk_bytes=len(frames[0]) * 2) as writer:
+        for frame in frames:
+            writer.add(frame)
+
+    with CaptureReader(path) as reader:
+        assert reader.get_stats()['chunks'] > 1
+        assert [bytes(data) for _, data in reader.iter_frames()] == frames
+
+
+@pytest.mark.parametrize('kwargs', [
+    {'frame_bytes': b''},
+    {'landmarks': [[0.1, 0.2, 0.0]] * 20},
+    {'handedness': 'Both'},
+    {'label': 3},
+])
+def test_invalid_rows_are_rejected_without_writing(tmp_path, kwargs):
+    path = str(tmp_path / 'capture')
+    row = {'frame_bytes': jpeg_bytes(50), 'landmarks': landmark_points(), 'handedness': 'Right', 'label': 'A'}
+    row.update(kwargs)
+    with CaptureWriter(path) as writer:
+        with pytest.raises(ValueError):
+            writer.add(**row)
+        writer.add(jpeg_bytes(60))
+
+    with CaptureReader(path) as reader:
+        assert len(reader) == 1
+        assert reader.get_stats()['encoded_bytes'] == len(jpeg_bytes(60))
+
+
+def test_closed_writer_rejects_frames(tmp_path):
+    writer = CaptureWriter(str(tmp_path / 'capture'))
+    writer.close()
+    with pytest.raises(ValueError):
+        writer.add(jpeg_bytes(10))
+
+
+def test_existing_capture_is_not_overwritten(tmp_path):
+    path = str(tmp_path / 'capture')
+    with CaptureWriter(path) as writer:
+        writer.add(jpeg_bytes(10))
+    with pytest.raises(FileExistsError):
+        CaptureWriter(path)
+
+
+def test_unsupported_version_is_rejected(tmp_path):
+    path = str(tmp_path / 'capture')
+    with CaptureWriter(path) as writer:
+        writer.add(jpeg_bytes(10))
+    manifest_path = os.path.join(path, 'manifest.json')
+    with open(manifest_path) as f:
+        manifest = f.read().replace('"version": 1', '"version": 99')
+    with open(manifest_path, 'w') as f:
+        f.write(manifest)
+    with pytest.raises(ValueError):
+        CaptureReader(path)
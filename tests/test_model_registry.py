@@ -0,0 +1,106 @@
+"""Tests del registro de versiones de src/model_registry.py"""
+
+import json
+import os
+
+import pytest
+
+from src.model_registry import ModelRegistry, RegistryError, file_sha256
+
+
+@pytest.fixture
+def source(tmp_path):
+    """Modelo .h5, un artefacto hermano .tflite y su mapeo de clases"""
+    source_dir = tmp_path / 'source'
+    source_dir.mkdir()
+    (source_dir / 'asl_model.h5').write_bytes(b'keras weights')
+    (source_dir / 'asl_model.tflite').write_bytes(b'tflite flatbuffer')
+    (source_dir / 'other_model.tflite').write_bytes(b'not ours')
+    (source_dir / 'class_mapping.json').write_text(json.dumps({'0': 'A', '1': 'B'}))
+    return source_dir
+
+
+@pytest.fixture
+def registry(tmp_path):
+    return ModelRegistry(str(tmp_path / 'registry'))
+
+
+def register(registry, source, version='v1'):
+    return registry.register(str(source / 'asl_model.h5'), str(source / 'class_mapping.json'),
+                             version=version)
+
+
+def test_register_copies_artifacts_with_checksums(registry, source):
+    manifest = register(registry, source)
+    assert manifest['model_file'] == 'model.h5'
+    assert sorted(manifest['artifacts']) == ['model.h5', 'model.tflite']
+    assert manifest['checksum'] == file_sha256(str(source / 'asl_model.h5'))
+    assert manifest['class_names'] == ['A', 'B']
+    assert registry.verify('v1') == manifest
+    assert [entry['version'] for entry in registry.versions()] == ['v1']
+
+
+def test_register_rejects_duplicates_and_bad_names(registry, source):
+    register(registry, source)
+    with pytest.raises(RegistryError):
+        register(registry, source)
+    with pytest.raises(RegistryError):
+        register(registry, source, version='../escape')
+    with pytest.raises(RegistryError):
+        registry.register(str(source / 'missing.h5'), str(source / 'class_mapping.json'), version='v2')
+
+
+def test_verify_detects_modified_artifact(registry, source):
+    register(registry, source)
+    with open(os.path.join(registry.root, 'v1', 'model.tflite'), 'ab') as f:
+        f.write(b'corrupt')
+    with pytest.raises(RegistryError, match='Checksum'):
+        registry.verify('v1')
+
+
+def test_verify_detects_missing_artifact(registry, source):
+    register(registry, source)
+    os.remove(os.path.join(registry.root, 'v1', 'model.h5'))
+    with pytest.raises(RegistryError, match='Falta'):
+        registry.verify('v1')
+
+
+def test_verify_detects_class_mapping_mismatch(registry, source):
+    register(registry, source)
+    with open(os.path.join(registry.root, 'v1', 'class_mapping.json'), 'w') as f:
+        json.dump({'0': 'A', '1': 'C'}, f)
+    with pytest.raises(RegistryError, match='mapeo'):
+        registry.verify('v1')
+
+
+def test_verify_unknown_version(registry):
+    with pytest.raises(RegistryError):
+        registry.verify('v9')
+
+
+def test_set_active_keeps_previous(registry, source):
+    assert registry.active()['version'] is None
+    register(registry, source, version='v1')
+    register(registry, source, version='v2')
+    registry.set_active('v1')
+    registry.set_active('v2', previous='v1')
+    active = registry.active()
+    assert active['version'] == 'v2'
+    assert active['previous'] == 'v1'
+
+
+def test_set_active_rejects_unknown_version(registry, source):
+    register(registry, source)
+    registry.set_active('v1')
+    with pytest.raises(RegistryError):
+        registry.set_active('v9', previous='v1')
+    assert registry.active()['version'] == 'v1'
+
+
+def test_set_active_none_selects_model_path(registry, source):
+    register(registry, source)
+    registry.set_active('v1')
+    registry.set_active(None, previous='v1')
+    active = registry.active()
+    assert active['version'] is None
+    assert active['previous'] == 'v1'
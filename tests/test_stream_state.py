@@ -0,0 +1,89 @@
+"""Tests del hash perceptual y del cache por similitud de src/stream_state.py"""
+
+import numpy as np
+import pytest
+
+from src.stream_state import StreamState, generate_frame_hash, hamming_distance
+
+
+def gradient_frame(height=120, width=160):
+    """Frame BGR con un degradado horizontal (todos los bits del dHash a 1)"""
+    row = np.linspace(0, 255, width, dtype=np.uint8)
+    gray = np.tile(row, (height, 1))
+    return np.dstack([gray, gray, gray])
+
+
+def test_hash_is_64_bits_and_deterministic():
+    frame = gradient_frame()
+    frame_hash = generate_frame_hash(frame)
+    assert frame_hash == generate_frame_hash(frame.copy())
+    assert 0 <= frame_hash < 2 ** 64
+
+
+def test_hash_tolerates_sensor_noise():
+    frame = gradient_frame()
+    rng = np.random.default_rng(0)
+    noise = rng.integers(-3, 4, size=frame.shape)
+    noisy = np.clip(frame.astype(np.int16) + noise, 0, 255).astype(np.uint8)
+    assert hamming_distance(generate_frame_hash(frame), generate_frame_hash(noisy)) <= 2
+
+
+def test_hash_changes_with_content():
+    frame = gradient_frame()
+    mirrored = frame[:, ::-1].copy()
+    assert hamming_distance(generate_frame_hash(frame), generate_frame_hash(mirrored)) > 32
+
+
+def test_hash_accepts_grayscale_and_rejects_invalid():
+    assert generate_frame_hash(gradient_frame()[:, :, 0]) == generate_frame_hash(gradient_frame())
+    assert generate_frame_hash(None) is None
+
+
+def test_hamming_distance():
+    assert hamming_distance(0b1011, 0b1011) == 0
+    assert hamming_distance(0b1011, 0b0010) == 2
+
+
+@pytest.mark.parametrize('flipped_bits, valid', [(0, True), (5, True), (6, False)])
+def test_cache_valid_within_hamming_distance(flipped_bits, valid):
+    state = StreamState('s1', hash_max_distance=5)
+    cached_hash = 0
+    state.update_cache({'success': True, 'letter': 'A'}, timestamp=100.0, frame_hash=cached_hash)
+    frame_hash = (1 << flipped_bits) - 1
+    assert state.is_cache_valid(100.1, frame_hash, cache_duration=1.0) is valid
+
+
+def test_cache_expires_and_requires_hash():
+    state = StreamState('s1')
+    state.update_cache({'success': True, 'letter': 'A'}, timestamp=100.0, frame_hash=0)
+    assert not state.is_cache_valid(101.5, 0, cache_duration=1.0)
+    assert not state.is_cache_valid(100.1, None, cache_duration=1.0)
+
+
+def test_empty_cache_is_not_valid():
+    state = StreamState('s1')
+    assert not state.is_cache_valid(0.0, 0, cache_duration=1.0)
+
+
+def test_cached_result_is_a_marked_copy():
+    state = StreamState('s1')
+    result = {'success': True, 'letter': 'A'}
+    state.update_cache(result, timestamp=100.0, frame_hash=0)
+    cached = state.get_cached_result(100.25)
+    assert cached['from_cache'] is True
+    assert cached['cache_age_ms'] == 250
+    assert 'from_cache' not in result
+    assert state.get_stats()['cache_hits'] == 1
+
+
+def test_false_reuse_counts_letter_changes_on_similar_frames():
+    state = StreamState('s1', hash_max_distance=5)
+    state.update_cache({'letter': 'A'}, timestamp=1.0, frame_hash=0)
+    state.update_cache({'letter': 'A'}, timestamp=2.0, frame_hash=0b1)
+    state.update_cache({'letter': 'B'}, timestamp=3.0, frame_hash=0b11)
+    # Frame muy distinto: no cuenta como reutilización
+    state.update_cache({'letter': 'C'}, timestamp=4.0, frame_hash=2 ** 64 - 1)
+    stats = state.get_stats()
+    assert stats['reuse_checks'] == 2
+    assert stats['false_reuse'] == 1
+    assert stats['false_reuse_rate'] == 0.5